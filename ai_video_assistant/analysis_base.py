@@ -0,0 +1,309 @@
+"""
+Shared analysis logic for the AI-Powered Video Lecture Assistant.
+Everything the Ollama and API analyzers do the same way: input checks, result
+caching, map-reduce notes for long transcriptions, parsing, validating
+and re-requesting JSON answers, and generating or regenerating the sections
+of an analysis as concurrent requests. Each analyzer only provides its own
+transport call (``_call_llm`` / ``_call_llm_async``) and cache key.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache import text_hash
+from .chunking import chunk_transcript, collect_chunk_notes, collect_chunk_notes_async, estimate_tokens, map_chunks
+from .json_utils import parse_llm_json
+from .schemas import NOTES_SCHEMA, section_schema, validate_analysis, validate_section
+from .prompts import (
+    SECTION_MAX_TOKENS,
+    SECTIONS,
+    build_reduce_prompt,
+    build_section_prompt,
+    section_system_instruction
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BaseContentAnalyzer:
+    """
+    Base class of the content analyzers.
+    
+    Subclasses set ``max_chunk_tokens``, ``max_concurrency``, ``max_rerequests``,
+    ``parse_stats``, ``_stats_lock``, ``on_field``, ``cache`` and ``OUTPUT_FORMAT``,
+    and implement ``_call_llm`` / ``_call_llm_async``, ``_create_user_prompt``
+    and ``_cache_lookup_key``.
+    """
+    
+    def _call_llm(
+        self,
+        prompt: str,
+        system: str = None,
+        on_field: Callable[[str, Any], None] = None,
+        max_tokens: int = None,
+        schema: Dict = None
+    ) -> str:
+        """Send one request to the model and return the answer text."""
+        raise NotImplementedError
+    
+    async def _call_llm_async(
+        self,
+        prompt: str,
+        system: str = None,
+        on_field: Callable[[str, Any], None] = None,
+        max_tokens: int = None,
+        schema: Dict = None
+    ) -> str:
+        """Non-blocking ``_call_llm``."""
+        raise NotImplementedError
+    
+    def _generate_json(
+        self,
+        prompt: str,
+        schema: Dict,
+        validate: Callable[[Dict], None],
+        system: str = None,
+        on_field: Callable[[str, Any], None] = None,
+        max_tokens: int = None
+    ) -> Dict:
+        """
+        Request a JSON answer and validate it.
+        
+        Malformed JSON is repaired locally first; an answer that still can't be
+        parsed or fails validation is requested again, up to ``max_rerequests`` times.
+        
+        Args:
+            prompt: The user prompt
+            schema: JSON schema of the answer (sent when structured_output is on)
+            validate: Raises ValueError if the parsed answer is unusable
+            system: System instruction (default: SYSTEM_INSTRUCTION)
+            on_field: Streaming only: called as each top-level JSON field completes
+            max_tokens: Output token limit
+        
+        Returns:
+            The parsed, validated answer
+        """
+        for attempt in range(self.max_rerequests + 1):
+            response_text = ""
+            try:
+                response_text = self._call_llm(prompt, system=system, on_field=on_field, max_tokens=max_tokens, schema=schema)
+                return self._parse_answer(response_text, validate)
+            except ValueError as e:  # Includes JSONDecodeError and MalformedJSONError
+                self._retry_or_raise(attempt, e, response_text)
+    
+    async def _generate_json_async(
+        self,
+        prompt: str,
+        schema: Dict,
+        validate: Callable[[Dict], None],
+        system: str = None,
+        on_field: Callable[[str, Any], None] = None,
+        max_tokens: int = None
+    ) -> Dict:
+        """Async version of ``_generate_json``."""
+        for attempt in range(self.max_rerequests + 1):
+            response_text = ""
+            try:
+                response_text = await self._call_llm_async(
+                    prompt, system=system, on_field=on_field, max_tokens=max_tokens, schema=schema
+                )
+                return self._parse_answer(response_text, validate)
+            except ValueError as e:
+                self._retry_or_raise(attempt, e, response_text)
+    
+    def _parse_answer(self, response_text: str, validate: Callable[[Dict], None]) -> Dict:
+        """Parse (repairing if needed) and validate one answer, counting repairs."""
+        result, repaired = parse_llm_json(response_text)
+        validate(result)
+        self._count("repaired" if repaired else "clean")
+        return result
+    
+    def _retry_or_raise(self, attempt: int, error: ValueError, response_text: str):
+        """Count an unusable answer; re-raise it once the re-requests are used up."""
+        if attempt >= self.max_rerequests:
+            self._count("failed")
+            if response_text:
+                logger.error(f"Response text: {response_text[:500]}...")
+            raise error
+        self._count("rerequested")
+        logger.warning(f"⚠️  Unusable response ({error}), requesting it again ({attempt + 1}/{self.max_rerequests})...")
+    
+    def _count(self, outcome: str):
+        """Add one answer to ``parse_stats``."""
+        with self._stats_lock:
+            self.parse_stats[outcome] += 1
+    
+    def _start_analysis(self, transcription: str, auto_chunk: bool) -> Tuple[str, str, Optional[Dict]]:
+        """Validate the input and look it up in the cache: returns (cache key, transcript hash, cached result)."""
+        if not transcription or len(transcription.strip()) < 50:
+            raise ValueError("Transcription is too short or empty for meaningful analysis")
+        
+        word_count = len(transcription.split())
+        char_count = len(transcription)
+        
+        logger.info(f"Analyzing transcription ({char_count:,} characters, ~{word_count:,} words)...")
+        
+        cache_key, transcript_hash = self._cache_lookup_key(transcription, auto_chunk)
+        cached = self.cache.get(cache_key) if self.cache else None
+        if cached is not None:
+            logger.info("✅ Using cached analysis")
+        return cache_key, transcript_hash, cached
+    
+    def _needs_chunking(self, transcription: str, auto_chunk: bool) -> bool:
+        """Whether the transcription exceeds the chunk token budget."""
+        return auto_chunk and estimate_tokens(transcription) > self.max_chunk_tokens
+    
+    def _chunks(self, transcription: str, segments: List[Dict] = None) -> List[Dict]:
+        """Split a long transcription for map-reduce analysis."""
+        chunks = chunk_transcript(transcription, segments, self.max_chunk_tokens)
+        logger.info(f"Long transcription: analyzing {len(chunks)} chunks of <= ~{self.max_chunk_tokens:,} tokens")
+        return chunks
+    
+    def _collect_notes(self, transcription: str, auto_chunk: bool, segments: List[Dict] = None) -> Optional[List[str]]:
+        """Map step for transcriptions over the chunk token budget (None if the text fits one prompt)."""
+        # Long transcriptions don't fit the context window in one prompt
+        if not self._needs_chunking(transcription, auto_chunk):
+            return None
+        return collect_chunk_notes(
+            self._chunks(transcription, segments),
+            lambda prompt, system: self._call_llm(prompt, system=system, schema=NOTES_SCHEMA),
+            max_tokens=self.max_chunk_tokens,
+            max_workers=self.max_concurrency
+        )
+    
+    async def _collect_notes_async(self, transcription: str, auto_chunk: bool, segments: List[Dict] = None) -> Optional[List[str]]:
+        """Async version of ``_collect_notes``."""
+        if not self._needs_chunking(transcription, auto_chunk):
+            return None
+        return await collect_chunk_notes_async(
+            self._chunks(transcription, segments),
+            lambda prompt, system: self._call_llm_async(prompt, system=system, schema=NOTES_SCHEMA),
+            max_tokens=self.max_chunk_tokens,
+            max_workers=self.max_concurrency
+        )
+    
+    def _final_prompt(self, transcription: str, notes: Optional[List[str]]) -> str:
+        """Prompt for the complete analysis: the transcription itself, or the combined chunk notes."""
+        if not notes:
+            return self._create_user_prompt(transcription)
+        logger.info(f"Combining notes from {len(notes)} chunks...")
+        return build_reduce_prompt(notes, self.OUTPUT_FORMAT)
+    
+    def _generate_sections(self, transcription: str, notes: Optional[List[str]], sections=SECTIONS) -> Dict:
+        """Generate each section with its own request, all in flight at once."""
+        logger.info(f"🚀 Generating {', '.join(sections)} as {len(sections)} concurrent requests...")
+        
+        def generate(section: str, _index: int):
+            result = self._generate_json(
+                build_section_prompt(section, transcription, notes),
+                section_schema(section),
+                lambda result: validate_section(section, result),
+                system=section_system_instruction(section),
+                on_field=self.on_field,
+                max_tokens=SECTION_MAX_TOKENS[section]
+            )
+            return result[section]
+        
+        values = map_chunks(generate, list(sections), max_workers=len(sections))
+        return dict(zip(sections, values))
+    
+    async def _generate_sections_async(self, transcription: str, notes: Optional[List[str]], sections=SECTIONS) -> Dict:
+        """Async version of ``_generate_sections``."""
+        logger.info(f"🚀 Generating {', '.join(sections)} as {len(sections)} concurrent requests...")
+        
+        async def generate(section: str):
+            result = await self._generate_json_async(
+                build_section_prompt(section, transcription, notes),
+                section_schema(section),
+                lambda result: validate_section(section, result),
+                system=section_system_instruction(section),
+                on_field=self.on_field,
+                max_tokens=SECTION_MAX_TOKENS[section]
+            )
+            return result[section]
+        
+        values = await asyncio.gather(*(generate(section) for section in sections))
+        return dict(zip(sections, values))
+    
+    def regenerate_section(
+        self,
+        transcription: str,
+        result: Dict,
+        section: str,
+        auto_chunk: bool = True,
+        segments: List[Dict] = None
+    ) -> Dict:
+        """
+        Regenerate one section of an analysis, keeping the other two.
+        
+        Args:
+            transcription: The transcription the result was generated from
+            result: A previous ``analyze`` result
+            section: 'summary', 'insights' or 'quiz'
+            auto_chunk: As for ``analyze``
+            segments: As for ``analyze``
+        
+        Returns:
+            A copy of result with the new section (also stored in the cache)
+        """
+        if section not in SECTIONS:
+            raise ValueError(f"Unknown section: {section} (expected one of: {', '.join(SECTIONS)})")
+        if not transcription or len(transcription.strip()) < 50:
+            raise ValueError("Transcription is too short or empty for meaningful analysis")
+        
+        notes = self._collect_notes(transcription, auto_chunk, segments)
+        updated = dict(result)
+        updated.update(self._generate_sections(transcription, notes, (section,)))
+        self._validate_result(updated)
+        
+        if self.cache:
+            cache_key, transcript_hash = self._cache_lookup_key(transcription, auto_chunk)
+            self.cache.set(cache_key, {key: updated[key] for key in SECTIONS}, tag=transcript_hash)
+        
+        logger.info(f"✅ Regenerated the {section}")
+        return updated
+    
+    def _finish_analysis(self, result: Dict, cache_key: str, transcript_hash: str) -> Dict:
+        """Validate the parsed answer, and cache it."""
+        # Validate the structure
+        self._validate_result(result)
+        
+        if self.cache:
+            self.cache.set(cache_key, result, tag=transcript_hash)
+        
+        logger.info("✅ Analysis completed successfully")
+        return result
+    
+    def invalidate_cache(self, transcription: str = None) -> int:
+        """
+        Drop cached analyses.
+        
+        Args:
+            transcription: Transcript whose cached results should be removed (any
+                           provider, model or options). If None, clears the whole cache
+        
+        Returns:
+            Number of cache entries removed
+        """
+        if not self.cache:
+            return 0
+        if transcription is None:
+            return self.cache.invalidate()
+        return self.cache.invalidate(tag=text_hash(transcription))
+    
+    def _validate_result(self, result: Dict):
+        """
+        Validate that the result has the expected structure.
+        
+        Quiz options are normalized to an {'A'..'D'} dictionary and correct
+        answers to option letters (see ``schemas.normalize_question``).
+        
+        Args:
+            result: The parsed JSON result
+        
+        Raises:
+            ValueError: If the result structure is invalid
+        """
+        validate_analysis(result)
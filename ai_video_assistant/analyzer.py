@@ -4,15 +4,37 @@ Uses Ollama (local LLM) to analyze transcriptions and generate learning aids.
 """
 
 import json
+import math
+import time
+import asyncio
 import logging
-from typing import Dict
+import threading
+import itertools
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Tuple
 import requests
 
+from .cache import SQLiteCache, make_key, text_hash
+from .chunking import estimate_tokens
+from .http_transport import AsyncHTTPTransport, HTTPTransport, get_async_transport, get_transport, httpx
+from .analysis_base import BaseContentAnalyzer
+from .json_utils import MalformedJSONError
+from .ollama_manager import OllamaModelManager, get_ollama_manager
+from .schemas import ANALYSIS_SCHEMA
+from .prompts import PROMPT_VERSION
+from .streaming import aiter_ndjson, collect_json_stream, collect_json_stream_async, iter_ndjson
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Stream chunks read past the end of the JSON answer to reach Ollama's closing
+# chunk (with the timings), unless the model keeps talking longer than that
+TRAILING_CHUNKS = 32
+
+# Each retry of a timed-out request waits this much longer than the attempt before
+TIMEOUT_BACKOFF = 1.5
 
-class OllamaContentAnalyzer:
+
+class OllamaContentAnalyzer(BaseContentAnalyzer):
     """Analyzes lecture transcriptions using Ollama (local LLM)."""
     
     # System instruction for the AI model
@@ -28,78 +50,154 @@ Quiz: The quiz must contain exactly 5 multiple-choice questions.
 
 Quiz Structure: Each question must have:
   - A question text.
-  - A list of 4 options.
-  - The correct_answer (which must be one of the provided options).
+  - A list of 4 options (as a dictionary with keys A, B, C, D).
+  - The correct_answer (which must be a letter: A, B, C, or D).
 
 Relevance: All summaries, insights, and questions must be 100% derived from the provided transcription. Do not introduce external information."""
     
-    def __init__(self, model: str = "llama3.1", base_url: str = "http://localhost:11434", timeout: int = 600):
+    # Ollama generation options (part of the response cache key)
+    GENERATION_OPTIONS = {
+        "temperature": 0.3,  # Lower temperature for more consistent output
+        "top_p": 0.9,
+        "num_predict": 4096,  # Allow longer responses
+        "num_ctx": 8192  # Context window when auto_num_ctx is off, and for preloading
+    }
+    
+    # JSON schema the model is asked to follow
+    OUTPUT_FORMAT = """{
+  "summary": "A single-paragraph summary of the lecture content...",
+  "insights": [
+    "The first key insight or definition.",
+    "The second key insight or fact.",
+    "..."
+  ],
+  "quiz": [
+    {
+      "question": "What is the first question?",
+      "options": {
+        "A": "First option",
+        "B": "Second option",
+        "C": "Third option",
+        "D": "Fourth option"
+      },
+      "correct_answer": "B"
+    }
+  ]
+}"""
+    
+    def __init__(
+        self,
+        model: str = "llama3.1",
+        base_url: str = "http://localhost:11434",
+        timeout: int = 600,
+        max_chunk_tokens: int = 3000,
+        max_concurrency: int = 2,
+        transport: HTTPTransport = None,
+        async_transport: AsyncHTTPTransport = None,
+        manager: OllamaModelManager = None,
+        keep_alive: str = None,
+        auto_num_ctx: bool = True,
+        preload: bool = False,
+        stream: bool = False,
+        on_field: Callable[[str, Any], None] = None,
+        analysis_mode: str = "single",
+        structured_output: bool = False,
+        max_rerequests: int = 1,
+        cache_path: str = None,
+        cache_ttl: float = None,
+        cache_max_mb: int = 64,
+        adaptive_timeout: bool = True,
+        timeout_retries: int = 2
+    ):
         """
         Initialize the OllamaContentAnalyzer.
         
         Args:
             model: Ollama model name (e.g., 'llama3.1', 'mistral', 'llama2')
             base_url: Ollama API base URL
-            timeout: Request timeout in seconds (default: 600 = 10 minutes)
+            timeout: Request timeout in seconds (default: 600 = 10 minutes). With
+                     adaptive_timeout, only used until Ollama has reported throughput
+            max_chunk_tokens: Transcriptions longer than this (estimated tokens) are
+                              analyzed map-reduce style in chunks of this size, so they
+                              fit the 8192-token context next to the prompt and output
+            max_concurrency: Chunk requests in flight at once (Ollama only runs them
+                             in parallel when OLLAMA_NUM_PARALLEL allows it)
+            transport: Pooled HTTP transport (default: the shared process-wide one)
+            async_transport: Transport for ``analyze_async`` (default: the shared one when
+                             httpx is installed, else requests run in worker threads)
+            manager: Model manager of the Ollama server (default: the shared one for base_url),
+                     which caches the status check and tracks load / eval timings
+            keep_alive: How long Ollama keeps the model loaded after each request
+                        (default: the manager's, '30m' unless OLLAMA_KEEP_ALIVE is set)
+            auto_num_ctx: Size num_ctx to each prompt instead of GENERATION_OPTIONS['num_ctx']
+            preload: Start loading the model into Ollama in the background right away
+            stream: Stream responses and parse the JSON while it arrives, so malformed
+                    output is aborted early instead of waiting for the timeout
+            on_field: Called with (key, value) as soon as each top-level field of the
+                      final analysis (e.g. 'summary') is complete. Requires stream=True
+            analysis_mode: 'single' asks for summary, insights and quiz in one generation;
+                           'sections' generates them as three smaller concurrent requests
+                           (lower latency, and see ``regenerate_section``)
+            structured_output: Constrain generation to the result's JSON schema:
+                               send the JSON schema as Ollama's ``format`` (Ollama 0.5+)
+            max_rerequests: Times an answer that can't be parsed (even after local
+                            repair) or validated is requested again. Counts of clean,
+                            repaired, re-requested and failed answers are kept in
+                            ``parse_stats``
+            cache_path: SQLite file for caching analysis results, keyed by provider,
+                        model, prompt version, generation options and transcript hash
+                        (None disables caching). Can be shared between analyzers
+            cache_ttl: Seconds a cached analysis stays valid (None = no expiry)
+            cache_max_mb: Size cap for the response cache (least recently used
+                          entries are evicted)
+            adaptive_timeout: Estimate each request's timeout from its prompt length,
+                              output limit and the prompt-eval / eval tokens per second
+                              of recent calls, so a stuck request fails fast and a
+                              long but healthy one isn't cut off
+            timeout_retries: Times a timed-out request is retried, each attempt with
+                             a TIMEOUT_BACKOFF times longer timeout
         """
         self.model = model
         self.base_url = base_url
         self.api_url = f"{base_url}/api/generate"
         self.timeout = timeout
+        self.adaptive_timeout = adaptive_timeout
+        self.timeout_retries = timeout_retries
+        self.max_chunk_tokens = max_chunk_tokens
+        self.max_concurrency = max_concurrency
+        self.transport = transport or get_transport()
+        self.async_transport = async_transport or get_async_transport()
+        self.manager = manager or get_ollama_manager(base_url)
+        self.keep_alive = keep_alive
+        self.auto_num_ctx = auto_num_ctx
+        self.stream = stream
+        self.on_field = on_field
+        self.analysis_mode = analysis_mode
+        self.structured_output = structured_output
+        self.max_rerequests = max_rerequests
+        self.parse_stats = {"clean": 0, "repaired": 0, "rerequested": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+        self.last_call_stats: Dict = {}
+        self.cache = SQLiteCache(cache_path, max_size_mb=cache_max_mb, ttl_seconds=cache_ttl) if cache_path else None
+        
+        if analysis_mode not in ("single", "sections"):
+            raise ValueError(f"Unknown analysis mode: {analysis_mode} (expected 'single' or 'sections')")
         
         logger.info(f"OllamaContentAnalyzer initialized with model: {model}, timeout: {timeout}s")
         
         # Check Ollama connection and model availability
         self._check_ollama_status()
+        
+        if preload:
+            self.manager.preload_async(self.model, self.GENERATION_OPTIONS["num_ctx"])
     
     def _check_ollama_status(self):
         """
         Check if Ollama is running and the specified model is available.
-        Provides helpful diagnostic information.
+        Provides helpful diagnostic information. The server status is cached by the
+        manager, so only the first analyzer per server pays for the round trip.
         """
-        try:
-            # Test connection to Ollama
-            logger.info("🔍 Checking Ollama connection...")
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            
-            if response.status_code == 200:
-                logger.info("✅ Ollama is running and connected")
-                
-                # Check if the specified model is available
-                data = response.json()
-                available_models = [m['name'] for m in data.get('models', [])]
-                
-                if available_models:
-                    logger.info(f"📦 Available models: {', '.join(available_models)}")
-                else:
-                    logger.warning("⚠️  No models installed in Ollama")
-                
-                # Check if our model is available
-                model_found = False
-                for available_model in available_models:
-                    # Handle both 'llama3.1' and 'llama3.1:latest' formats
-                    if self.model in available_model or available_model.startswith(self.model + ':'):
-                        logger.info(f"✅ Model '{self.model}' is available")
-                        model_found = True
-                        break
-                
-                if not model_found:
-                    logger.warning(f"⚠️  Model '{self.model}' not found in Ollama")
-                    logger.warning(f"💡 Install it with: ollama pull {self.model}")
-                    if available_models:
-                        logger.info(f"💡 Or use one of: {', '.join(available_models)}")
-            else:
-                logger.warning(f"⚠️  Ollama responded with status code: {response.status_code}")
-                
-        except requests.exceptions.ConnectionError:
-            logger.error("❌ Cannot connect to Ollama")
-            logger.error("💡 Make sure Ollama is running:")
-            logger.error("   - Start with: ollama serve")
-            logger.error("   - Or check if it's running in the background")
-        except requests.exceptions.Timeout:
-            logger.warning("⚠️  Ollama connection timed out (might be starting up)")
-        except Exception as e:
-            logger.warning(f"⚠️  Could not check Ollama status: {str(e)}")
+        self.manager.check_model(self.model)
     
     def _create_user_prompt(self, transcription: str) -> str:
         """
@@ -122,105 +220,295 @@ Output Format:
 
 Provide your response as a single, valid JSON object using this exact schema:
 
-{{
-  "summary": "A single-paragraph summary of the lecture content...",
-  "insights": [
-    "The first key insight or definition.",
-    "The second key insight or fact.",
-    "..."
-  ],
-  "quiz": [
-    {{
-      "question": "What is the first question?",
-      "options": [
-        "Option A",
-        "Option B",
-        "Option C",
-        "Option D"
-      ],
-      "correct_answer": "Option B"
-    }},
-    {{
-      "question": "What is the second question?",
-      "options": [
-        "Option 1",
-        "Option 2",
-        "Option 3",
-        "Option 4"
-      ],
-      "correct_answer": "Option 3"
-    }}
-  ]
-}}
+{self.OUTPUT_FORMAT}
 
 IMPORTANT: Return ONLY the JSON object, nothing else."""
     
-    def _call_ollama(self, prompt: str, retry_count: int = 0) -> str:
+    def _payload(self, prompt: str, system: str = None, max_tokens: int = None, schema: Dict = None) -> Dict:
+        """Build the generate request body."""
+        full_prompt = f"{system or self.SYSTEM_INSTRUCTION}\n\n{prompt}"
+        
+        options = dict(self.GENERATION_OPTIONS)
+        if max_tokens:
+            options["num_predict"] = max_tokens
+        if self.auto_num_ctx:
+            options["num_ctx"] = self.manager.num_ctx_for(self.model, estimate_tokens(full_prompt), options["num_predict"])
+        
+        payload = {
+            "model": self.model,
+            "prompt": full_prompt,
+            "stream": self.stream,
+            "keep_alive": self.keep_alive or self.manager.keep_alive,
+            "options": options
+        }
+        if schema and self.structured_output:
+            payload["format"] = schema
+        return payload
+    
+    def _request_timeout(self, payload: Dict, attempt: int = 0) -> int:
+        """
+        Timeout in seconds for one attempt of a generate request.
+        
+        With adaptive_timeout it comes from the model's measured throughput
+        (``timeout`` until there is any). A streamed request is only given the
+        time to its first token: the timeout applies between reads, and tokens
+        keep arriving while generation is healthy.
+        """
+        timeout = self.timeout
+        if self.adaptive_timeout:
+            timeout = self.manager.timeout_for(self.model, *self._timeout_tokens(payload), self.timeout)
+        return math.ceil(timeout * TIMEOUT_BACKOFF ** attempt)
+    
+    @staticmethod
+    def _timeout_tokens(payload: Dict) -> Tuple[int, int]:
+        """(prompt tokens, output tokens) a request's timeout has to allow for."""
+        output_tokens = 0 if payload["stream"] else payload["options"]["num_predict"]
+        return estimate_tokens(payload["prompt"]), output_tokens
+    
+    def _record_timeout(self, payload: Dict, started: float):
+        """Let the manager's throughput estimate learn from a timed-out attempt."""
+        self.manager.record_timeout(self.model, *self._timeout_tokens(payload), time.perf_counter() - started)
+    
+    def _log_request(self, timeout: int, attempt: int):
+        """Log a generate request about to be sent."""
+        logger.info(f"Calling Ollama API with model: {self.model} (timeout: {timeout}s)")
+        if attempt > 0:
+            logger.info(f"Retry attempt {attempt}/{self.timeout_retries}")
+    
+    def _call_ollama(
+        self,
+        prompt: str,
+        system: str = None,
+        on_field: Callable[[str, Any], None] = None,
+        max_tokens: int = None,
+        schema: Dict = None
+    ) -> str:
         """
         Call Ollama API to generate content with retry logic.
         
         Args:
             prompt: The complete prompt
-            retry_count: Current retry attempt (for internal use)
+            system: System instruction (default: SYSTEM_INSTRUCTION)
+            on_field: Streaming only: called as each top-level JSON field completes
+            max_tokens: Output token limit (default: GENERATION_OPTIONS['num_predict'])
+            schema: JSON schema of the answer, enforced when structured_output is on
         
         Returns:
-            Generated text response
+            Generated text response. Timing is recorded in ``last_call_stats``
         """
-        full_prompt = f"{self.SYSTEM_INSTRUCTION}\n\n{prompt}"
-        
-        payload = {
-            "model": self.model,
-            "prompt": full_prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.3,  # Lower temperature for more consistent output
-                "top_p": 0.9,
-                "num_predict": 4096,  # Allow longer responses
-                "num_ctx": 8192  # Increased context window
-            }
-        }
+        payload = self._payload(prompt, system, max_tokens, schema)
         
-        try:
-            logger.info(f"Calling Ollama API with model: {self.model} (timeout: {self.timeout}s)")
-            if retry_count > 0:
-                logger.info(f"Retry attempt {retry_count}/3")
+        for attempt in range(self.timeout_retries + 1):
+            timeout = self._request_timeout(payload, attempt)
+            started = time.perf_counter()
+            try:
+                self._log_request(timeout, attempt)
+                
+                if self.stream:
+                    return self._stream_ollama(payload, on_field, started, timeout)
+                
+                response = self.transport.post(self.api_url, provider="ollama", json=payload, timeout=timeout)
+                response.raise_for_status()
+                
+                result = response.json()
+                text = result.get("response", "")
+                self._record_call(started, text)
+                self._record_timings(result)
+                return text
             
-            response = requests.post(self.api_url, json=payload, timeout=self.timeout)
+            except requests.exceptions.ConnectionError:
+                raise self._connection_error()
+            except requests.exceptions.Timeout:
+                self._record_timeout(payload, started)
+                # The longer timeout is for this call only: concurrent calls share the analyzer
+                if attempt == self.timeout_retries:
+                    raise self._timeout_error(timeout)
+                logger.warning(f"Request timed out after {timeout}s. Retrying with extended timeout...")
+            except MalformedJSONError:
+                raise  # Lets the caller request the answer again
+            except Exception as e:
+                raise Exception(f"Ollama API error: {str(e)}")
+    
+    def _stream_ollama(self, payload: Dict, on_field: Callable[[str, Any], None], started: float, timeout: int) -> str:
+        """
+        Send a streaming generate request and parse the NDJSON chunks as they arrive.
+        
+        Args:
+            payload: Request body (with "stream": True)
+            on_field: Called as each top-level JSON field completes
+            started: ``time.perf_counter()`` when the call started
+            timeout: Seconds to wait for the first chunk, and between chunks
+        
+        Returns:
+            The streamed response text
+        """
+        with self.transport.stream(
+            "POST",
+            self.api_url,
+            provider="ollama",
+            json=payload,
+            timeout=timeout
+        ) as response:
             response.raise_for_status()
+            final = {}
+            deltas = self._ollama_deltas(response, final)
+            try:
+                text, stats = collect_json_stream(deltas, on_field, started)
+            except MalformedJSONError:
+                self._record_aborted(started)
+                raise
+            for _ in itertools.islice(deltas, TRAILING_CHUNKS):
+                pass
+        
+        self._record_stream(stats)
+        self._record_timings(final)
+        return text
+    
+    async def _call_ollama_async(
+        self,
+        prompt: str,
+        system: str = None,
+        on_field: Callable[[str, Any], None] = None,
+        max_tokens: int = None,
+        schema: Dict = None
+    ) -> str:
+        """
+        Non-blocking ``_call_ollama``.
+        
+        Requests go through the async transport when httpx is installed;
+        otherwise the blocking call runs in a worker thread.
+        """
+        if self.async_transport is None:
+            return await asyncio.to_thread(self._call_ollama, prompt, system, on_field, max_tokens, schema)
+        
+        payload = self._payload(prompt, system, max_tokens, schema)
+        
+        for attempt in range(self.timeout_retries + 1):
+            timeout = self._request_timeout(payload, attempt)
+            started = time.perf_counter()
+            try:
+                self._log_request(timeout, attempt)
+                
+                request = {"provider": "ollama", "json": payload, "timeout": timeout}
+                if self.stream:
+                    async with self.async_transport.stream("POST", self.api_url, **request) as response:
+                        if response.is_error:
+                            await response.aread()
+                        response.raise_for_status()
+                        final = {}
+                        deltas = self._ollama_deltas_async(response, final)
+                        try:
+                            text, stats = await collect_json_stream_async(deltas, on_field, started)
+                        except MalformedJSONError:
+                            self._record_aborted(started)
+                            raise
+                        trailing = 0
+                        async for _ in deltas:
+                            trailing += 1
+                            if trailing >= TRAILING_CHUNKS:
+                                break
+                    self._record_stream(stats)
+                    self._record_timings(final)
+                    return text
+                
+                response = await self.async_transport.post(self.api_url, **request)
+                response.raise_for_status()
+                result = response.json()
+                text = result.get("response", "")
+                self._record_call(started, text)
+                self._record_timings(result)
+                return text
             
-            result = response.json()
-            return result.get("response", "")
-        
-        except requests.exceptions.ConnectionError:
-            raise Exception(
-                "Cannot connect to Ollama. Make sure Ollama is running.\n"
-                "Start it with: ollama serve"
-            )
-        except requests.exceptions.Timeout:
-            # Retry up to 3 times with increasing timeout
-            if retry_count < 3:
-                logger.warning(f"Request timed out after {self.timeout}s. Retrying with extended timeout...")
-                self.timeout = int(self.timeout * 1.5)  # Increase timeout by 50%
-                return self._call_ollama(prompt, retry_count + 1)
-            else:
-                raise Exception(
-                    f"Ollama request timed out after {self.timeout}s. \n\n"
-                    "Suggestions:\n"
-                    "1. Try a smaller/faster model: ollama pull llama3.2 (or mistral, phi)\n"
-                    "2. Process shorter videos (split long videos into segments)\n"
-                    "3. Increase system resources (close other applications)\n"
-                    "4. Check Ollama is responding: curl http://localhost:11434/api/tags\n"
-                )
-        except Exception as e:
-            raise Exception(f"Ollama API error: {str(e)}")
+            except httpx.ConnectError:
+                raise self._connection_error()
+            except httpx.TimeoutException:
+                self._record_timeout(payload, started)
+                if attempt == self.timeout_retries:
+                    raise self._timeout_error(timeout)
+                logger.warning(f"Request timed out after {timeout}s. Retrying with extended timeout...")
+            except MalformedJSONError:
+                raise
+            except Exception as e:
+                raise Exception(f"Ollama API error: {str(e)}")
     
-    def analyze(self, transcription: str, auto_chunk: bool = True) -> Dict:
+    # Transport hooks of BaseContentAnalyzer
+    _call_llm = _call_ollama
+    _call_llm_async = _call_ollama_async
+    
+    @staticmethod
+    def _connection_error() -> Exception:
+        return Exception(
+            "Cannot connect to Ollama. Make sure Ollama is running.\n"
+            "Start it with: ollama serve"
+        )
+    
+    @staticmethod
+    def _timeout_error(timeout: int) -> Exception:
+        return Exception(
+            f"Ollama request timed out after {timeout}s. \n\n"
+            "Suggestions:\n"
+            "1. Try a smaller/faster model: ollama pull llama3.2 (or mistral, phi)\n"
+            "2. Process shorter videos (split long videos into segments)\n"
+            "3. Increase system resources (close other applications)\n"
+            "4. Check Ollama is responding: curl http://localhost:11434/api/tags\n"
+        )
+    
+    def _record_call(self, started: float, text: str):
+        """Record the stats of a non-streaming call."""
+        self.last_call_stats = {
+            "streamed": False,
+            "ttft": None,
+            "duration": time.perf_counter() - started,
+            "chars": len(text)
+        }
+    
+    def _record_stream(self, stats: Dict):
+        """Record the stats of a completed streaming call."""
+        self.last_call_stats = dict(stats, streamed=True)
+        logger.info(f"⏱️  First token after {stats['ttft'] or 0:.1f}s, response complete after {stats['duration']:.1f}s")
+    
+    def _record_aborted(self, started: float):
+        """Record a streaming call aborted because of malformed output."""
+        self.last_call_stats = {"streamed": True, "aborted": True, "duration": time.perf_counter() - started}
+        logger.warning("⚠️  Aborted malformed streamed response")
+    
+    def _record_timings(self, response: Dict):
+        """Add Ollama's load / eval timings from a final response to ``last_call_stats``."""
+        self.last_call_stats.update(self.manager.record_timings(self.model, response))
+    
+    @staticmethod
+    def _ollama_deltas(response: requests.Response, final: Dict) -> Iterator[str]:
+        """Text deltas of an Ollama generate stream; the closing chunk (with timings) is copied into final."""
+        for chunk in iter_ndjson(response):
+            if "error" in chunk:
+                raise Exception(chunk["error"])
+            yield chunk.get("response", "")
+            if chunk.get("done"):
+                final.update(chunk)
+                return
+    
+    @staticmethod
+    async def _ollama_deltas_async(response, final: Dict) -> AsyncIterator[str]:
+        """Text deltas of an Ollama generate stream read with httpx (see ``_ollama_deltas``)."""
+        async for chunk in aiter_ndjson(response):
+            if "error" in chunk:
+                raise Exception(chunk["error"])
+            yield chunk.get("response", "")
+            if chunk.get("done"):
+                final.update(chunk)
+                return
+    
+    def analyze(self, transcription: str, auto_chunk: bool = True, segments: List[Dict] = None) -> Dict:
         """
         Analyze a lecture transcription and generate learning aids.
         
         Args:
             transcription: The full text transcription of the lecture
-            auto_chunk: If True, automatically chunk long transcriptions (default: True)
+            auto_chunk: If True, transcriptions over ``max_chunk_tokens`` are analyzed
+                        map-reduce style: notes are extracted per chunk, then combined
+                        into the final result (default: True)
+            segments: Whisper segments of the transcription, used to chunk on segment
+                      boundaries (optional; sentence boundaries are used otherwise)
         
         Returns:
             Dictionary containing:
@@ -232,147 +520,82 @@ IMPORTANT: Return ONLY the JSON object, nothing else."""
             ValueError: If the transcription is empty or too short
             Exception: If the API call fails or returns invalid JSON
         """
-        if not transcription or len(transcription.strip()) < 50:
-            raise ValueError("Transcription is too short or empty for meaningful analysis")
-        
-        # Check if transcription is very long (>10,000 words ~40,000 chars)
-        word_count = len(transcription.split())
-        char_count = len(transcription)
-        
-        logger.info(f"Analyzing transcription ({char_count:,} characters, ~{word_count:,} words)...")
-        
-        # Warn if transcription is very long
-        if word_count > 10000 and auto_chunk:
-            logger.warning(f"Long transcription detected ({word_count:,} words)")
-            logger.warning("This may take 10+ minutes. Consider:")
-            logger.warning("  1. Processing shorter video segments")
-            logger.warning("  2. Using a faster model (llama3.2, mistral)")
-            logger.warning("  3. Waiting patiently - processing continues...")
+        cache_key, transcript_hash, cached = self._start_analysis(transcription, auto_chunk)
+        if cached is not None:
+            return cached
         
         try:
-            # Create the prompt
-            prompt = self._create_user_prompt(transcription)
-            
-            # Generate content
-            response_text = self._call_ollama(prompt)
-            
-            # Try to extract JSON from the response
-            response_text = response_text.strip()
+            notes = self._collect_notes(transcription, auto_chunk, segments)
             
-            # Sometimes the model might wrap JSON in markdown code blocks
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            # Find the first { and last } to extract JSON
-            start_idx = response_text.find("{")
-            end_idx = response_text.rfind("}") + 1
-            
-            if start_idx != -1 and end_idx > start_idx:
-                response_text = response_text[start_idx:end_idx]
-            
-            # Parse JSON
-            result = json.loads(response_text)
-            
-            # Validate the structure
-            self._validate_result(result)
+            if self.analysis_mode == "sections":
+                result = self._generate_sections(transcription, notes)
+            else:
+                # Generate content
+                result = self._generate_json(
+                    self._final_prompt(transcription, notes),
+                    ANALYSIS_SCHEMA,
+                    self._validate_result,
+                    on_field=self.on_field
+                )
             
-            logger.info("Analysis completed successfully")
-            return result
+            return self._finish_analysis(result, cache_key, transcript_hash)
         
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON response: {str(e)}")
-            logger.error(f"Response text: {response_text[:500]}...")
             raise Exception(f"Invalid JSON response from Ollama: {str(e)}")
         
         except Exception as e:
             logger.error(f"Error during analysis: {str(e)}")
             raise
     
-    def _validate_result(self, result: Dict):
+    async def analyze_async(self, transcription: str, auto_chunk: bool = True, segments: List[Dict] = None) -> Dict:
         """
-        Validate that the result has the expected structure.
-        
-        Args:
-            result: The parsed JSON result
+        Async version of ``analyze`` that doesn't block the event loop.
         
-        Raises:
-            ValueError: If the result structure is invalid
+        With httpx installed, requests (including the concurrent chunk requests
+        of a long transcription) are sent on the running event loop; otherwise
+        each request runs in a worker thread.
         """
-        required_keys = ["summary", "insights", "quiz"]
-        for key in required_keys:
-            if key not in result:
-                raise ValueError(f"Missing required key in response: {key}")
-        
-        if not isinstance(result["summary"], str):
-            raise ValueError("Summary must be a string")
-        
-        if not isinstance(result["insights"], list) or len(result["insights"]) < 5:
-            raise ValueError("Insights must be a list with at least 5 items")
-        
-        if not isinstance(result["quiz"], list) or len(result["quiz"]) != 5:
-            raise ValueError("Quiz must contain exactly 5 questions")
+        cache_key, transcript_hash, cached = self._start_analysis(transcription, auto_chunk)
+        if cached is not None:
+            return cached
         
-        # Validate quiz structure
-        for i, question in enumerate(result["quiz"]):
-            if "question" not in question or "options" not in question or "correct_answer" not in question:
-                raise ValueError(f"Quiz question {i+1} is missing required fields")
-            
-            # Convert options to dict format if it's a list
-            options = question["options"]
-            if isinstance(options, list):
-                # Convert list to dict with A, B, C, D keys
-                option_dict = {}
-                for idx, opt in enumerate(options):
-                    key = chr(65 + idx)  # 65 is 'A', 66 is 'B', etc.
-                    option_dict[key] = opt
-                question["options"] = option_dict
-                options = option_dict
-                logger.warning(f"Quiz question {i+1}: Converted list options to dict format")
-            
-            if len(options) != 4:
-                raise ValueError(f"Quiz question {i+1} must have exactly 4 options")
-            
-            # Check if correct_answer is in options
-            correct_answer = question["correct_answer"]
-            
-            # If correct_answer is a letter (A/B/C/D), check if it's a valid key
-            if len(correct_answer) == 1 and correct_answer.upper() in options:
-                question["correct_answer"] = correct_answer.upper()
-                continue
+        try:
+            notes = await self._collect_notes_async(transcription, auto_chunk, segments)
             
-            # If correct_answer starts with a letter and period (e.g., "B. text"), extract the key
-            if len(correct_answer) > 2 and correct_answer[0].isalpha() and correct_answer[1] == '.':
-                key = correct_answer[0].upper()
-                if key in options:
-                    question["correct_answer"] = key
-                    logger.warning(f"Quiz question {i+1}: Extracted key '{key}' from answer")
-                    continue
+            if self.analysis_mode == "sections":
+                result = await self._generate_sections_async(transcription, notes)
+            else:
+                result = await self._generate_json_async(
+                    self._final_prompt(transcription, notes),
+                    ANALYSIS_SCHEMA,
+                    self._validate_result,
+                    on_field=self.on_field
+                )
             
-            # If correct_answer is the full text, try to match it
-            if correct_answer not in options.values():
-                # Try to find a close match (case-insensitive, strip whitespace)
-                normalized_correct = correct_answer.strip().lower()
-                
-                for key, value in options.items():
-                    # Match against full value or value without key prefix
-                    if value.strip().lower() == normalized_correct:
-                        question["correct_answer"] = key
-                        logger.warning(f"Quiz question {i+1}: Matched answer to option {key}")
-                        break
-                    # Also check if the answer text (without letter prefix) matches
-                    value_without_prefix = value.split('. ', 1)[-1].strip().lower() if '. ' in value else value.strip().lower()
-                    if value_without_prefix == normalized_correct:
-                        question["correct_answer"] = key
-                        logger.warning(f"Quiz question {i+1}: Matched answer text to option {key}")
-                        break
-                else:
-                    # Still no match found
-                    logger.error(f"Quiz question {i+1} validation failed:")
-                    logger.error(f"  Correct answer: '{correct_answer}'")
-                    logger.error(f"  Options: {options}")
-                    raise ValueError(f"Quiz question {i+1}: correct_answer must be one of the options")
+            return self._finish_analysis(result, cache_key, transcript_hash)
+        
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON response: {str(e)}")
+            raise Exception(f"Invalid JSON response from Ollama: {str(e)}")
+        
+        except Exception as e:
+            logger.error(f"Error during analysis: {str(e)}")
+            raise
+    
+    def _cache_lookup_key(self, transcription: str, auto_chunk: bool) -> Tuple[str, str]:
+        """Return (cache key, transcript hash) for an analysis request, or (None, None) without a cache."""
+        if not self.cache:
+            return None, None
+        transcript_hash = text_hash(transcription)
+        options = {
+            "generation": self.GENERATION_OPTIONS,
+            "auto_chunk": auto_chunk,
+            "analysis_mode": self.analysis_mode,
+            "max_chunk_tokens": self.max_chunk_tokens
+        }
+        key = make_key("analysis", "ollama", self.model, PROMPT_VERSION, options, transcript_hash)
+        return key, transcript_hash
     
     def analyze_and_save(self, transcription: str, output_path: str = "output.json") -> str:
         """
@@ -4,15 +4,32 @@ Uses cloud LLM APIs (OpenAI, Groq, etc.) as an alternative to local Ollama.
 """
 
 import json
+import time
+import asyncio
 import logging
-from typing import Dict
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 import requests
 
+from .cache import SQLiteCache, make_key, text_hash
+from .failover import ProviderRouter
+from .chunking import estimate_tokens
+from .http_transport import AsyncHTTPTransport, HTTPTransport, RequestCancelled, get_async_transport, get_transport, httpx
+from .rate_limit import get_rate_limiter, set_rate_limit
+from .analysis_base import BaseContentAnalyzer
+from .json_utils import MalformedJSONError
+from .schemas import ANALYSIS_SCHEMA
+from .prompts import PROMPT_VERSION
+from .streaming import aiter_sse, collect_json_stream, collect_json_stream_async, iter_sse
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Name of the structured answer (OpenAI json_schema name, Anthropic tool name)
+STRUCTURED_OUTPUT_NAME = "learning_aids"
+
 
-class APIContentAnalyzer:
+class APIContentAnalyzer(BaseContentAnalyzer):
     """Analyzes lecture transcriptions using cloud LLM APIs."""
     
     # System instruction for the AI model
@@ -33,7 +50,61 @@ Quiz Structure: Each question must have:
 
 Relevance: All summaries, insights, and questions must be 100% derived from the provided transcription. Do not introduce external information."""
     
-    def __init__(self, api_key: str, provider: str = "openai", model: str = None, timeout: int = 60):
+    # Generation options shared by every provider (part of the response cache key)
+    GENERATION_OPTIONS = {
+        "temperature": 0.3,
+        "max_tokens": 4096
+    }
+    
+    # JSON schema the model is asked to follow
+    OUTPUT_FORMAT = """{
+  "summary": "A single-paragraph summary of the lecture content...",
+  "insights": [
+    "The first key insight or definition.",
+    "The second key insight or fact.",
+    "..."
+  ],
+  "quiz": [
+    {
+      "question": "What is the first question?",
+      "options": {
+        "A": "First option",
+        "B": "Second option",
+        "C": "Third option",
+        "D": "Fourth option"
+      },
+      "correct_answer": "B"
+    }
+  ]
+}"""
+    
+    def __init__(
+        self,
+        api_key: str,
+        provider: str = "openai",
+        model: str = None,
+        timeout: int = 60,
+        max_chunk_tokens: int = 10000,
+        max_concurrency: int = 4,
+        transport: HTTPTransport = None,
+        async_transport: AsyncHTTPTransport = None,
+        stream: bool = False,
+        on_field: Callable[[str, Any], None] = None,
+        analysis_mode: str = "single",
+        structured_output: bool = False,
+        max_rerequests: int = 1,
+        api_url: str = None,
+        fallbacks: List[Dict] = None,
+        hedge: bool = True,
+        hedge_delay: float = None,
+        circuit_failures: int = 3,
+        circuit_cooldown: float = 60.0,
+        rpm: float = None,
+        tpm: float = None,
+        cache_path: str = None,
+        cache_ttl: float = None,
+        cache_max_mb: int = 64
+    ):
         """
         Initialize the APIContentAnalyzer.
         
@@ -42,10 +113,71 @@ Relevance: All summaries, insights, and questions must be 100% derived from the
             provider: API provider ('openai', 'groq', 'anthropic')
             model: Model name (if None, uses provider default)
             timeout: Request timeout in seconds (default: 60)
+            max_chunk_tokens: Transcriptions longer than this (estimated tokens) are
+                              analyzed map-reduce style in chunks of this size
+                              (the default fits the smallest default model context)
+            max_concurrency: Chunk requests in flight at once
+            transport: Pooled HTTP transport (default: the shared process-wide one)
+            async_transport: Transport for ``analyze_async`` (default: the shared one when
+                             httpx is installed, else requests run in worker threads)
+            stream: Stream responses and parse the JSON while it arrives, so malformed
+                    output is aborted early instead of waiting for the full body
+            on_field: Called with (key, value) as soon as each top-level field of the
+                      final analysis (e.g. 'summary') is complete. Requires stream=True
+            analysis_mode: 'single' asks for summary, insights and quiz in one generation;
+                           'sections' generates them as three smaller concurrent requests
+                           (lower latency, and see ``regenerate_section``)
+            structured_output: Constrain generation to the result's JSON schema:
+                               use the provider's JSON / response-format feature (JSON schema for
+                               OpenAI and xAI, JSON mode for Groq, a forced tool call for
+                               Anthropic, responseSchema for Google)
+            max_rerequests: Times an answer that can't be parsed (even after local
+                            repair) or validated is requested again. Counts of clean,
+                            repaired, re-requested and failed answers are kept in
+                            ``parse_stats``
+            api_url: Override the provider's endpoint (e.g. a proxy, a self-hosted
+                     OpenAI-compatible server or a local stub server)
+            fallbacks: Further providers to use when this one fails or is slow, in
+                       order: dicts with 'provider' and 'api_key', and optionally
+                       'model', 'api_url', 'rpm' and 'tpm'. Counters are in ``router.stats()``
+            hedge: With fallbacks, send a request that is slower than the provider's
+                   recent p95 latency to the next provider too, and take whichever
+                   answer comes first
+            hedge_delay: Fixed hedge delay in seconds instead of the measured p95
+            circuit_failures: Consecutive failures after which a provider is skipped
+            circuit_cooldown: Seconds a failing provider is skipped before it is
+                              tried again
+            rpm: Requests-per-minute budget for this provider, shared by every
+                 analyzer in the process (default: <PROVIDER>_RPM env var, else none)
+            tpm: Tokens-per-minute budget (prompt estimate plus output token limit;
+                 default: <PROVIDER>_TPM env var, else none). Requests over
+                 budget wait in a queue; see ``rate_limiter.metrics()``
+            cache_path: SQLite file for caching analysis results, keyed by provider,
+                        model, prompt version, generation options and transcript hash
+                        (None disables caching). Can be shared between analyzers
+            cache_ttl: Seconds a cached analysis stays valid (None = no expiry)
+            cache_max_mb: Size cap for the response cache (least recently used
+                          entries are evicted)
         """
         self.api_key = api_key
         self.provider = provider.lower()
         self.timeout = timeout
+        self.max_chunk_tokens = max_chunk_tokens
+        self.max_concurrency = max_concurrency
+        self.transport = transport or get_transport()
+        self.async_transport = async_transport or get_async_transport()
+        self.stream = stream
+        self.on_field = on_field
+        self.analysis_mode = analysis_mode
+        self.structured_output = structured_output
+        self.max_rerequests = max_rerequests
+        self.parse_stats = {"clean": 0, "repaired": 0, "rerequested": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+        self.last_call_stats: Dict = {}
+        self.cache = SQLiteCache(cache_path, max_size_mb=cache_max_mb, ttl_seconds=cache_ttl) if cache_path else None
+        
+        if analysis_mode not in ("single", "sections"):
+            raise ValueError(f"Unknown analysis mode: {analysis_mode} (expected 'single' or 'sections')")
         
         # Set default models and endpoints based on provider
         if self.provider == "openai":
@@ -88,7 +220,50 @@ Relevance: All summaries, insights, and questions must be 100% derived from the
         else:
             raise ValueError(f"Unsupported provider: {provider}. Use 'openai', 'groq', 'anthropic', 'xai', or 'google'")
         
+        if api_url:
+            self.api_url = api_url
+        
+        if rpm or tpm:
+            self.rate_limiter = set_rate_limit(self.provider, rpm, tpm)
+        else:
+            self.rate_limiter = get_rate_limiter(self.provider)
+        
         logger.info(f"✅ API Analyzer initialized with {self.provider.upper()} ({self.model})")
+        
+        # Transport retries (None = the transport's default)
+        self.http_retries = None
+        self.fallbacks = [
+            APIContentAnalyzer(
+                api_key=fallback["api_key"],
+                provider=fallback["provider"],
+                model=fallback.get("model"),
+                api_url=fallback.get("api_url"),
+                timeout=timeout,
+                transport=self.transport,
+                async_transport=self.async_transport,
+                stream=stream,
+                structured_output=structured_output,
+                rpm=fallback.get("rpm"),
+                tpm=fallback.get("tpm")
+            )
+            for fallback in fallbacks or []
+        ]
+        self.router = None
+        if self.fallbacks:
+            routes = [self] + self.fallbacks
+            for route in routes:
+                # Fail over at once instead of backing off on a rate-limited or failing provider
+                route.http_retries = 0
+            self.router = ProviderRouter(
+                routes,
+                [f"{route.provider}/{route.model}" for route in routes],
+                hedge=hedge,
+                hedge_delay=hedge_delay,
+                max_hedge_delay=timeout,
+                failure_threshold=circuit_failures,
+                cooldown=circuit_cooldown
+            )
+            logger.info(f"🔀 Failover order: {' → '.join(state.name for state in self.router.states)}")
     
     def _create_user_prompt(self, transcription: str) -> str:
         """Create the user prompt for the LLM."""
@@ -103,121 +278,497 @@ Output Format:
 
 Provide your response as a single, valid JSON object using this exact schema:
 
-{{
-  "summary": "A single-paragraph summary of the lecture content...",
-  "insights": [
-    "The first key insight or definition.",
-    "The second key insight or fact.",
-    "..."
-  ],
-  "quiz": [
-    {{
-      "question": "What is the first question?",
-      "options": {{
-        "A": "First option",
-        "B": "Second option",
-        "C": "Third option",
-        "D": "Fourth option"
-      }},
-      "correct_answer": "B"
-    }}
-  ]
-}}
+{self.OUTPUT_FORMAT}
 
 IMPORTANT: Return ONLY the JSON object, nothing else."""
     
-    def _call_api(self, prompt: str) -> str:
-        """Call the LLM API to generate content."""
+    def _build_request(self, prompt: str, system: str, max_tokens: int = None, schema: Dict = None) -> Tuple[str, Dict]:
+        """Build the (url, payload) of a non-streaming request in the provider's format."""
+        max_tokens = max_tokens or self.GENERATION_OPTIONS["max_tokens"]
+        schema = schema if self.structured_output else None
+        if self.provider in ["openai", "groq", "xai"]:
+            # OpenAI-compatible API format (OpenAI, Groq, xAI)
+            payload = {
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": self.GENERATION_OPTIONS["temperature"],
+                "max_tokens": max_tokens
+            }
+            if schema and self.provider == "groq":
+                payload["response_format"] = {"type": "json_object"}
+            elif schema:
+                payload["response_format"] = {
+                    "type": "json_schema",
+                    "json_schema": {"name": STRUCTURED_OUTPUT_NAME, "schema": schema, "strict": True}
+                }
+            return self.api_url, payload
+        
+        elif self.provider == "anthropic":
+            # Anthropic Claude API format
+            payload = {
+                "model": self.model,
+                "max_tokens": max_tokens,
+                "system": system,
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": self.GENERATION_OPTIONS["temperature"]
+            }
+            if schema:
+                # Anthropic has no JSON mode: force a tool call whose input is the answer
+                payload["tools"] = [{
+                    "name": STRUCTURED_OUTPUT_NAME,
+                    "description": "Record the requested learning aids.",
+                    "input_schema": schema
+                }]
+                payload["tool_choice"] = {"type": "tool", "name": STRUCTURED_OUTPUT_NAME}
+            return self.api_url, payload
+        
+        # Google Gemini API format
+        full_prompt = f"{system}\n\n{prompt}"
+        payload = {
+            "contents": [{
+                "parts": [{
+                    "text": full_prompt
+                }]
+            }],
+            "generationConfig": {
+                "temperature": self.GENERATION_OPTIONS["temperature"],
+                "maxOutputTokens": max_tokens
+            }
+        }
+        if schema:
+            payload["generationConfig"]["responseMimeType"] = "application/json"
+            payload["generationConfig"]["responseSchema"] = self._gemini_schema(schema)
+        return f"{self.api_url}?key={self.api_key}", payload
+    
+    @classmethod
+    def _gemini_schema(cls, schema: Dict) -> Dict:
+        """Convert a JSON schema to Gemini's OpenAPI subset (upper-case types, no additionalProperties)."""
+        converted = {}
+        for key, value in schema.items():
+            if key == "additionalProperties":
+                continue
+            if key == "type":
+                value = value.upper()
+            elif key == "properties":
+                value = {name: cls._gemini_schema(prop) for name, prop in value.items()}
+            elif key == "items":
+                value = cls._gemini_schema(value)
+            converted[key] = value
+        return converted
+    
+    def _response_text(self, result: Dict) -> str:
+        """Extract the generated text from a non-streaming response body."""
+        if self.provider in ["openai", "groq", "xai"]:
+            return result['choices'][0]['message']['content']
+        elif self.provider == "anthropic":
+            for block in result['content']:
+                if block.get('type') == 'tool_use':
+                    return json.dumps(block['input'])  # Structured output
+            return result['content'][0]['text']
+        return result['candidates'][0]['content']['parts'][0]['text']
+    
+    def _estimate_tokens(self, prompt: str, system: str, max_tokens: int = None) -> int:
+        """Tokens a request counts against the provider's budget: the prompt plus the output limit."""
+        return estimate_tokens(system) + estimate_tokens(prompt) + (max_tokens or self.GENERATION_OPTIONS["max_tokens"])
+    
+    def _usage_tokens(self, result: Dict) -> int:
+        """Total tokens the provider reports for a response (0 if it doesn't)."""
+        if self.provider == "anthropic":
+            usage = result.get('usage') or {}
+            return usage.get('input_tokens', 0) + usage.get('output_tokens', 0)
+        if self.provider == "google":
+            return (result.get('usageMetadata') or {}).get('totalTokenCount', 0)
+        return (result.get('usage') or {}).get('total_tokens', 0)
+    
+    def _streaming_request(self, url: str, payload: Dict) -> Tuple[str, Callable[[Dict], str]]:
+        """Switch a request to streaming; returns the (url, event delta extractor) to use."""
+        if self.provider == "google":
+            return url.replace(":generateContent?", ":streamGenerateContent?alt=sse&"), self._google_delta
+        
+        payload["stream"] = True
+        if self.provider == "anthropic":
+            return url, self._anthropic_delta
+        # Without this, OpenAI-compatible streams don't report token usage
+        payload["stream_options"] = {"include_usage": True}
+        return url, self._openai_delta
+    
+    def _note_usage(self, event: Dict, usage: Dict):
+        """
+        Collect the token usage reported by one stream event.
+        
+        ``usage`` is filled in the shape of a non-streaming response body, so
+        ``_usage_tokens(usage)`` gives the total once the stream has ended.
+        OpenAI-compatible APIs report usage in the last chunk (Groq under
+        'x_groq'), Gemini in each chunk's 'usageMetadata', and Anthropic splits
+        it between 'message_start' (input) and 'message_delta' (output).
+        """
+        if self.provider == "anthropic":
+            if event.get("type") == "message_start":
+                reported = (event.get("message") or {}).get("usage")
+            else:
+                reported = event.get("usage") if event.get("type") == "message_delta" else None
+            if reported:
+                usage.setdefault("usage", {}).update(
+                    (field, count) for field, count in reported.items() if count is not None
+                )
+        elif self.provider == "google":
+            if event.get("usageMetadata"):
+                usage["usageMetadata"] = event["usageMetadata"]
+        else:
+            reported = event.get("usage") or (event.get("x_groq") or {}).get("usage")
+            if reported:
+                usage["usage"] = reported
+    
+    def _tally_usage(self, events: Iterator[Dict], usage: Dict) -> Iterator[Dict]:
+        """Pass stream events through, collecting their token usage (see ``_note_usage``)."""
+        for event in events:
+            self._note_usage(event, usage)
+            yield event
+    
+    async def _tally_usage_async(self, events: AsyncIterator[Dict], usage: Dict) -> AsyncIterator[Dict]:
+        """Async ``_tally_usage``."""
+        async for event in events:
+            self._note_usage(event, usage)
+            yield event
+    
+    def _api_error(self, status_code: int, body: str) -> Exception:
+        """Turn an HTTP error response into the exception raised to callers."""
+        if status_code == 401:
+            return Exception(f"Invalid API key for {self.provider.upper()}. Please check your API key.")
+        elif status_code == 429:
+            return Exception(f"{self.provider.upper()} API rate limit exceeded. Try again later.")
+        return Exception(f"{self.provider.upper()} API error: {status_code} - {body}")
+    
+    def _call_api(
+        self,
+        prompt: str,
+        system: str = None,
+        on_field: Callable[[str, Any], None] = None,
+        max_tokens: int = None,
+        schema: Dict = None
+    ) -> str:
+        """
+        Call the LLM to generate content, failing over / hedging across the
+        fallback providers if there are any (arguments as for ``_request``).
+        """
+        if not self.router:
+            return self._request(prompt, system, on_field, max_tokens, schema)
+        
+        def attempt(route: "APIContentAnalyzer", cancelled: threading.Event) -> Tuple[str, Dict]:
+            # Each attempt keeps its own stats: a losing hedge may finish after the winner
+            stats = {}
+            return route._request(prompt, system, on_field, max_tokens, schema, stats, cancelled), stats
+        
+        (text, stats), _, name = self.router.call(
+            attempt,
+            kind=max_tokens,
+            # Two streams would report every field twice
+            hedge=on_field is None
+        )
+        self.last_call_stats = dict(stats, provider=name)
+        return text
+    
+    async def _call_api_async(
+        self,
+        prompt: str,
+        system: str = None,
+        on_field: Callable[[str, Any], None] = None,
+        max_tokens: int = None,
+        schema: Dict = None
+    ) -> str:
+        """Non-blocking ``_call_api``."""
+        if not self.router:
+            return await self._request_async(prompt, system, on_field, max_tokens, schema)
+        
+        async def attempt(route: "APIContentAnalyzer") -> Tuple[str, Dict]:
+            stats = {}
+            return await route._request_async(prompt, system, on_field, max_tokens, schema, stats), stats
+        
+        (text, stats), _, name = await self.router.call_async(
+            attempt,
+            kind=max_tokens,
+            hedge=on_field is None
+        )
+        self.last_call_stats = dict(stats, provider=name)
+        return text
+    
+    # Transport hooks of BaseContentAnalyzer
+    _call_llm = _call_api
+    _call_llm_async = _call_api_async
+    
+    def _request(
+        self,
+        prompt: str,
+        system: str = None,
+        on_field: Callable[[str, Any], None] = None,
+        max_tokens: int = None,
+        schema: Dict = None,
+        stats: Dict = None,
+        cancelled: threading.Event = None
+    ) -> str:
+        """
+        Call this analyzer's LLM API to generate content.
+        
+        Args:
+            prompt: The user prompt
+            system: System instruction (default: SYSTEM_INSTRUCTION)
+            on_field: Streaming only: called as each top-level JSON field completes
+            max_tokens: Output token limit (default: GENERATION_OPTIONS['max_tokens'])
+            schema: JSON schema of the answer, enforced when structured_output is on
+            stats: Dict to record the call's timing in (default: ``last_call_stats``)
+            cancelled: Abandon the request once this event is set (raises RequestCancelled)
+        
+        Returns:
+            Generated text response
+        """
+        started = time.perf_counter()
         try:
             logger.info(f"🌐 Calling {self.provider.upper()} API with model: {self.model}")
             
-            if self.provider in ["openai", "groq", "xai"]:
-                # OpenAI-compatible API format (OpenAI, Groq, xAI)
-                payload = {
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": self.SYSTEM_INSTRUCTION},
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": 0.3,
-                    "max_tokens": 4096
-                }
-                
-                response = requests.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                result = response.json()
-                return result['choices'][0]['message']['content']
+            system = system or self.SYSTEM_INSTRUCTION
+            url, payload = self._build_request(prompt, system, max_tokens, schema)
+            tokens = self._estimate_tokens(prompt, system, max_tokens)
             
-            elif self.provider == "anthropic":
-                # Anthropic Claude API format
-                payload = {
-                    "model": self.model,
-                    "max_tokens": 4096,
-                    "system": self.SYSTEM_INSTRUCTION,
-                    "messages": [
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": 0.3
-                }
-                
-                response = requests.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                result = response.json()
-                return result['content'][0]['text']
+            if self.stream:
+                url, extract_delta = self._streaming_request(url, payload)
+                return self._stream_api(url, payload, extract_delta, on_field, started, tokens, stats, cancelled)
             
-            elif self.provider == "google":
-                # Google Gemini API format
-                full_prompt = f"{self.SYSTEM_INSTRUCTION}\n\n{prompt}"
-                payload = {
-                    "contents": [{
-                        "parts": [{
-                            "text": full_prompt
-                        }]
-                    }],
-                    "generationConfig": {
-                        "temperature": 0.3,
-                        "maxOutputTokens": 4096
-                    }
-                }
-                
-                response = requests.post(
-                    f"{self.api_url}?key={self.api_key}",
-                    headers=self.headers,
-                    json=payload,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                result = response.json()
-                return result['candidates'][0]['content']['parts'][0]['text']
+            response = self.transport.post(
+                url,
+                provider=self.provider,
+                max_retries=self.http_retries,
+                tokens=tokens,
+                cancelled=cancelled,
+                headers=self.headers,
+                json=payload,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            result = response.json()
+            self.rate_limiter.settle(tokens, self._usage_tokens(result))
+            text = self._response_text(result)
+            self._record_call(started, text, stats)
+            return text
         
+        except RequestCancelled:
+            raise
         except requests.exceptions.Timeout:
             raise Exception(f"{self.provider.upper()} API request timed out after {self.timeout}s")
         except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 401:
-                raise Exception(f"Invalid API key for {self.provider.upper()}. Please check your API key.")
-            elif e.response.status_code == 429:
-                raise Exception(f"{self.provider.upper()} API rate limit exceeded. Try again later.")
-            else:
-                raise Exception(f"{self.provider.upper()} API error: {e.response.status_code} - {e.response.text}")
+            raise self._api_error(e.response.status_code, e.response.text)
+        except MalformedJSONError:
+            raise  # Lets the caller request the answer again
+        except Exception as e:
+            raise Exception(f"{self.provider.upper()} API error: {str(e)}")
+    
+    def _stream_api(
+        self,
+        url: str,
+        payload: Dict,
+        extract_delta: Callable[[Dict], str],
+        on_field: Callable[[str, Any], None],
+        started: float,
+        tokens: int = 0,
+        stats: Dict = None,
+        cancelled: threading.Event = None
+    ) -> str:
+        """
+        Send a streaming request and parse the server-sent events as they arrive.
+        
+        Args:
+            url: Request URL
+            payload: Request body (with streaming enabled)
+            extract_delta: Returns the text delta carried by one decoded event
+            on_field: Called as each top-level JSON field completes
+            started: ``time.perf_counter()`` when the call started
+            tokens: Estimated tokens of the request (for the rate limit)
+            stats: Dict to record the call's timing in (default: ``last_call_stats``)
+            cancelled: Stop reading (closing the stream) once this event is set
+        
+        Returns:
+            The streamed response text
+        """
+        with self.transport.stream(
+            "POST",
+            url,
+            provider=self.provider,
+            max_retries=self.http_retries,
+            tokens=tokens,
+            cancelled=cancelled,
+            headers=self.headers,
+            json=payload,
+            timeout=self.timeout
+        ) as response:
+            response.raise_for_status()
+            usage = {}
+            events = self._tally_usage(iter_sse(response), usage)
+            if cancelled is not None:
+                events = self._unless_cancelled(events, cancelled)
+            deltas = (extract_delta(event) for event in events)
+            try:
+                text, stream_stats = collect_json_stream(deltas, on_field, started)
+            except MalformedJSONError:
+                self._record_aborted(started, stats)
+                raise
+            if self.rate_limiter.tpm:
+                # Usage is reported after the answer: read the rest of the stream for it
+                for _ in events:
+                    pass
+        
+        self.rate_limiter.settle(tokens, self._usage_tokens(usage))
+        self._record_stream(stream_stats, stats)
+        return text
+    
+    def _unless_cancelled(self, events: Iterator[Dict], cancelled: threading.Event) -> Iterator[Dict]:
+        """Pass stream events through until the request is cancelled."""
+        for event in events:
+            if cancelled.is_set():
+                raise RequestCancelled(f"{self.provider} request abandoned")
+            yield event
+    
+    async def _request_async(
+        self,
+        prompt: str,
+        system: str = None,
+        on_field: Callable[[str, Any], None] = None,
+        max_tokens: int = None,
+        schema: Dict = None,
+        stats: Dict = None
+    ) -> str:
+        """
+        Non-blocking ``_request``.
+        
+        Requests go through the async transport when httpx is installed;
+        otherwise the blocking call runs in a worker thread. The request is
+        abandoned by cancelling the task.
+        """
+        if self.async_transport is None:
+            return await asyncio.to_thread(self._request, prompt, system, on_field, max_tokens, schema, stats)
+        
+        started = time.perf_counter()
+        try:
+            logger.info(f"🌐 Calling {self.provider.upper()} API with model: {self.model}")
+            
+            system = system or self.SYSTEM_INSTRUCTION
+            url, payload = self._build_request(prompt, system, max_tokens, schema)
+            tokens = self._estimate_tokens(prompt, system, max_tokens)
+            request = {
+                "provider": self.provider,
+                "max_retries": self.http_retries,
+                "tokens": tokens,
+                "headers": self.headers,
+                "json": payload,
+                "timeout": self.timeout
+            }
+            
+            if self.stream:
+                url, extract_delta = self._streaming_request(url, payload)
+                async with self.async_transport.stream("POST", url, **request) as response:
+                    if response.is_error:
+                        await response.aread()
+                    response.raise_for_status()
+                    usage = {}
+                    events = self._tally_usage_async(aiter_sse(response), usage)
+                    deltas = (extract_delta(event) async for event in events)
+                    try:
+                        text, stream_stats = await collect_json_stream_async(deltas, on_field, started)
+                    except MalformedJSONError:
+                        self._record_aborted(started, stats)
+                        raise
+                    if self.rate_limiter.tpm:
+                        # Usage is reported after the answer: read the rest of the stream for it
+                        async for _ in events:
+                            pass
+                self.rate_limiter.settle(tokens, self._usage_tokens(usage))
+                self._record_stream(stream_stats, stats)
+                return text
+            
+            response = await self.async_transport.post(url, **request)
+            response.raise_for_status()
+            result = response.json()
+            self.rate_limiter.settle(tokens, self._usage_tokens(result))
+            text = self._response_text(result)
+            self._record_call(started, text, stats)
+            return text
+        
+        except httpx.TimeoutException:
+            raise Exception(f"{self.provider.upper()} API request timed out after {self.timeout}s")
+        except httpx.HTTPStatusError as e:
+            raise self._api_error(e.response.status_code, e.response.text)
+        except MalformedJSONError:
+            raise  # Lets the caller request the answer again
         except Exception as e:
             raise Exception(f"{self.provider.upper()} API error: {str(e)}")
     
-    def analyze(self, transcription: str) -> Dict:
+    def _set_stats(self, stats: Optional[Dict], values: Dict):
+        """Record a call's stats in ``stats`` if given, else as ``last_call_stats``."""
+        if stats is None:
+            self.last_call_stats = values
+        else:
+            stats.clear()
+            stats.update(values)
+    
+    def _record_call(self, started: float, text: str, stats: Dict = None):
+        """Record the stats of a non-streaming call."""
+        self._set_stats(stats, {
+            "streamed": False,
+            "ttft": None,
+            "duration": time.perf_counter() - started,
+            "chars": len(text)
+        })
+    
+    def _record_stream(self, stream_stats: Dict, stats: Dict = None):
+        """Record the stats of a completed streaming call."""
+        self._set_stats(stats, dict(stream_stats, streamed=True))
+        logger.info(
+            f"⏱️  First token after {stream_stats['ttft'] or 0:.1f}s, "
+            f"response complete after {stream_stats['duration']:.1f}s"
+        )
+    
+    def _record_aborted(self, started: float, stats: Dict = None):
+        """Record a streaming call aborted because of malformed output."""
+        self._set_stats(stats, {"streamed": True, "aborted": True, "duration": time.perf_counter() - started})
+        logger.warning("⚠️  Aborted malformed streamed response")
+    
+    @staticmethod
+    def _openai_delta(event: Dict) -> str:
+        """Text delta of an OpenAI-compatible chat completion chunk."""
+        choices = event.get("choices") or [{}]
+        return choices[0].get("delta", {}).get("content") or ""
+    
+    @staticmethod
+    def _anthropic_delta(event: Dict) -> str:
+        """Text delta of an Anthropic messages stream event."""
+        if event.get("type") == "error":
+            raise Exception(event.get("error", {}).get("message", "stream error"))
+        if event.get("type") == "content_block_delta":
+            # Plain text, or the streamed input of a structured output tool call
+            return event["delta"].get("text") or event["delta"].get("partial_json", "")
+        return ""
+    
+    @staticmethod
+    def _google_delta(event: Dict) -> str:
+        """Text delta of a Gemini streamGenerateContent event."""
+        candidates = event.get("candidates") or [{}]
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+    
+    def analyze(self, transcription: str, auto_chunk: bool = True, segments: List[Dict] = None) -> Dict:
         """
         Analyze a lecture transcription and generate learning aids using API.
         
         Args:
             transcription: The full text transcription of the lecture
+            auto_chunk: If True, transcriptions over ``max_chunk_tokens`` are analyzed
+                        map-reduce style: notes are extracted per chunk, then combined
+                        into the final result (default: True)
+            segments: Whisper segments of the transcription, used to chunk on segment
+                      boundaries (optional; sentence boundaries are used otherwise)
         
         Returns:
             Dictionary containing:
@@ -225,96 +776,85 @@ IMPORTANT: Return ONLY the JSON object, nothing else."""
                 - insights: List of key takeaways (5-7 items)
                 - quiz: List of 5 multiple-choice questions
         """
-        if not transcription or len(transcription.strip()) < 50:
-            raise ValueError("Transcription is too short or empty for meaningful analysis")
-        
-        word_count = len(transcription.split())
-        char_count = len(transcription)
-        
-        logger.info(f"Analyzing transcription ({char_count:,} characters, ~{word_count:,} words)...")
+        cache_key, transcript_hash, cached = self._start_analysis(transcription, auto_chunk)
+        if cached is not None:
+            return cached
         
         try:
-            # Create the prompt
-            prompt = self._create_user_prompt(transcription)
-            
-            # Generate content via API
-            response_text = self._call_api(prompt)
-            
-            # Extract JSON from response
-            response_text = response_text.strip()
-            
-            # Sometimes the model might wrap JSON in markdown code blocks
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
+            notes = self._collect_notes(transcription, auto_chunk, segments)
             
-            # Find the first { and last } to extract JSON
-            start_idx = response_text.find("{")
-            end_idx = response_text.rfind("}") + 1
-            
-            if start_idx != -1 and end_idx > start_idx:
-                response_text = response_text[start_idx:end_idx]
-            
-            # Parse JSON
-            result = json.loads(response_text)
-            
-            # Validate the structure
-            self._validate_result(result)
+            if self.analysis_mode == "sections":
+                result = self._generate_sections(transcription, notes)
+            else:
+                # Generate content via API
+                result = self._generate_json(
+                    self._final_prompt(transcription, notes),
+                    ANALYSIS_SCHEMA,
+                    self._validate_result,
+                    on_field=self.on_field
+                )
             
-            logger.info("✅ Analysis completed successfully")
-            return result
+            return self._finish_analysis(result, cache_key, transcript_hash)
         
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON response: {str(e)}")
-            logger.error(f"Response text: {response_text[:500]}...")
             raise Exception(f"Invalid JSON response from API: {str(e)}")
         
         except Exception as e:
             logger.error(f"Error during analysis: {str(e)}")
             raise
     
-    def _validate_result(self, result: Dict):
-        """Validate that the result has the expected structure."""
-        required_keys = ["summary", "insights", "quiz"]
-        for key in required_keys:
-            if key not in result:
-                raise ValueError(f"Missing required key in response: {key}")
-        
-        if not isinstance(result["summary"], str):
-            raise ValueError("Summary must be a string")
-        
-        if not isinstance(result["insights"], list) or len(result["insights"]) < 5:
-            raise ValueError("Insights must be a list with at least 5 items")
+    async def analyze_async(self, transcription: str, auto_chunk: bool = True, segments: List[Dict] = None) -> Dict:
+        """
+        Async version of ``analyze`` that doesn't block the event loop.
         
-        if not isinstance(result["quiz"], list) or len(result["quiz"]) != 5:
-            raise ValueError("Quiz must contain exactly 5 questions")
+        With httpx installed, requests (including the concurrent chunk requests
+        of a long transcription) are sent on the running event loop; otherwise
+        each request runs in a worker thread.
+        """
+        cache_key, transcript_hash, cached = self._start_analysis(transcription, auto_chunk)
+        if cached is not None:
+            return cached
         
-        # Validate quiz structure
-        for i, question in enumerate(result["quiz"]):
-            if "question" not in question or "options" not in question or "correct_answer" not in question:
-                raise ValueError(f"Quiz question {i+1} is missing required fields")
-            
-            options = question["options"]
-            if isinstance(options, list):
-                # Convert list to dict
-                option_dict = {chr(65 + idx): opt for idx, opt in enumerate(options)}
-                question["options"] = option_dict
-                options = option_dict
+        try:
+            notes = await self._collect_notes_async(transcription, auto_chunk, segments)
             
-            if not isinstance(options, dict) or len(options) != 4:
-                raise ValueError(f"Quiz question {i+1} must have exactly 4 options as a dictionary")
+            if self.analysis_mode == "sections":
+                result = await self._generate_sections_async(transcription, notes)
+            else:
+                result = await self._generate_json_async(
+                    self._final_prompt(transcription, notes),
+                    ANALYSIS_SCHEMA,
+                    self._validate_result,
+                    on_field=self.on_field
+                )
             
-            # Normalize correct_answer to just be the key
-            correct_answer = question["correct_answer"]
-            if len(correct_answer) == 1 and correct_answer.upper() in options:
-                question["correct_answer"] = correct_answer.upper()
-            elif correct_answer in options.values():
-                # Find the key for this value
-                for key, value in options.items():
-                    if value == correct_answer:
-                        question["correct_answer"] = key
-                        break
+            return self._finish_analysis(result, cache_key, transcript_hash)
+        
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON response: {str(e)}")
+            raise Exception(f"Invalid JSON response from API: {str(e)}")
+        
+        except Exception as e:
+            logger.error(f"Error during analysis: {str(e)}")
+            raise
+    
+    def _cache_lookup_key(self, transcription: str, auto_chunk: bool) -> Tuple[str, str]:
+        """Return (cache key, transcript hash) for an analysis request, or (None, None) without a cache."""
+        if not self.cache:
+            return None, None
+        transcript_hash = text_hash(transcription)
+        options = {
+            "generation": self.GENERATION_OPTIONS,
+            "auto_chunk": auto_chunk,
+            "analysis_mode": self.analysis_mode,
+            "max_chunk_tokens": self.max_chunk_tokens
+        }
+        if self.router:
+            # Answers may come from any of the providers
+            options["routes"] = [state.name for state in self.router.states]
+        key = make_key("analysis", self.provider, self.model, PROMPT_VERSION, options, transcript_hash)
+        return key, transcript_hash
 
 
 if __name__ == "__main__":
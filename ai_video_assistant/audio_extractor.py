@@ -1,29 +1,141 @@
 """
 Audio extraction module for the AI-Powered Video Lecture Assistant.
-Extracts audio from video files using moviepy.
+Extracts audio from video files using moviepy, or decodes it straight into
+memory through an ffmpeg pipe.
 """
 
 import os
+import json
+import time
+import hashlib
+import tempfile
+import subprocess
 from pathlib import Path
-from moviepy import VideoFileClip
 import logging
+from typing import Iterator, Tuple
+import numpy as np
+from .ffmpeg_utils import get_ffmpeg_exe
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Whisper works on 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+# Bytes read from the head, middle and tail of a file when hashing it
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Cache entries used this recently are never evicted, since another job may
+# have just found them in the cache and not opened them yet
+EVICTION_GRACE_SECONDS = 60
+
+# Partial files this old were left behind by a crashed job and are removed on eviction
+STALE_PARTIAL_SECONDS = 24 * 3600
+
 
 class AudioExtractor:
     """Extracts audio from video files."""
     
-    def __init__(self, temp_dir: str = "temp_audio"):
+    def __init__(self, temp_dir: str = "temp_audio", max_cache_mb: int = 2048):
         """
         Initialize the AudioExtractor.
         
+        Extracted audio is cached in temp_dir under a content-addressed name, so
+        re-processing the same video skips decoding entirely.
+        
         Args:
             temp_dir: Directory to store temporary audio files
+            max_cache_mb: Size cap for cached audio in temp_dir. Least recently
+                          used entries are evicted once it is exceeded
         """
         self.temp_dir = Path(temp_dir)
         self.temp_dir.mkdir(exist_ok=True)
+        self.max_cache_bytes = max_cache_mb * 1024 * 1024
+    
+    def cache_key(self, video_path: str, **params) -> str:
+        """
+        Compute the content-addressed cache key for a video.
+        
+        Hashes the size, modification time and sampled head/middle/tail blocks
+        of the file together with the extraction parameters, so it stays fast
+        for multi-GB recordings while different uploads with the same name
+        never collide.
+        
+        Args:
+            video_path: Path to the input video file
+            **params: Extraction parameters that affect the output
+        
+        Returns:
+            Hex digest identifying this (input, parameters) pair
+        """
+        video_path = Path(video_path)
+        if not video_path.exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        stat = video_path.stat()
+        
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        
+        with open(video_path, 'rb') as f:
+            for offset in (0, stat.st_size // 2, max(0, stat.st_size - HASH_BLOCK_SIZE)):
+                f.seek(offset)
+                digest.update(f.read(HASH_BLOCK_SIZE))
+        
+        return digest.hexdigest()
+    
+    def _cache_hit(self, cache_path: Path) -> bool:
+        """Check for a cached entry and mark it as recently used."""
+        if not cache_path.exists():
+            return False
+        os.utime(cache_path)
+        return True
+    
+    def _partial_path(self, suffix: str = "") -> Path:
+        """
+        Create a uniquely named file to write a cache entry to before renaming it
+        into place, so concurrent jobs for the same key never share one.
+        
+        Args:
+            suffix: Extension to keep after '.partial' (writers that pick the
+                    format from the file name need it)
+        """
+        fd, path = tempfile.mkstemp(dir=self.temp_dir, suffix=f".partial{suffix}")
+        os.close(fd)
+        return Path(path)
+    
+    def _evict(self, keep: Path = None):
+        """
+        Evict least recently used cache entries until the cache fits its size cap.
+        
+        Entries used in the last EVICTION_GRACE_SECONDS are kept even over the
+        cap, and partial files abandoned by crashed jobs are removed.
+        
+        Args:
+            keep: Entry that must survive eviction (the one just written)
+        """
+        now = time.time()
+        entries = []
+        for f in self.temp_dir.glob("*"):
+            try:
+                stat = f.stat()
+            except FileNotFoundError:  # Renamed or evicted by another job meanwhile
+                continue
+            if '.partial' in f.name:
+                if now - stat.st_mtime > STALE_PARTIAL_SECONDS:
+                    f.unlink(missing_ok=True)
+            elif f.is_file() and len(f.name.split('.')[0]) == 32 and f.suffix != '.journal':
+                entries.append((stat.st_mtime, stat.st_size, f))
+        total = sum(size for _, size, _ in entries)
+        
+        for mtime, size, f in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_cache_bytes:
+                break
+            if (keep is not None and f == keep) or now - mtime < EVICTION_GRACE_SECONDS:
+                continue
+            f.unlink(missing_ok=True)
+            total -= size
+            logger.info(f"Evicted cached audio: {f.name}")
     
     def extract_audio(self, video_path: str, output_format: str = "wav") -> str:
         """
@@ -48,20 +160,31 @@ class AudioExtractor:
         if output_format not in ["wav", "mp3"]:
             raise ValueError(f"Unsupported audio format: {output_format}")
         
-        # Create output audio path
-        audio_filename = f"{video_path.stem}_audio.{output_format}"
-        audio_path = self.temp_dir / audio_filename
+        # Content-addressed output path
+        key = self.cache_key(video_path, mode="moviepy", format=output_format)
+        audio_path = self.temp_dir / f"{key}.{output_format}"
+        
+        if self._cache_hit(audio_path):
+            logger.info(f"Using cached audio for {video_path.name}: {audio_path}")
+            return str(audio_path)
         
         logger.info(f"Extracting audio from {video_path.name}...")
         
+        # Write to a temporary name first so an interrupted run never leaves a
+        # truncated file behind under the cache key
+        partial_path = self._partial_path(f".{output_format}")
+        
         try:
+            # Imported lazily so the in-memory path never pays for moviepy
+            from moviepy import VideoFileClip
+            
             # Load video and extract audio
             video = VideoFileClip(str(video_path))
             audio = video.audio
             
             # Write audio to file
             audio.write_audiofile(
-                str(audio_path),
+                str(partial_path),
                 codec='pcm_s16le' if output_format == 'wav' else 'libmp3lame',
                 logger=None  # Suppress moviepy's verbose output
             )
@@ -70,13 +193,237 @@ class AudioExtractor:
             audio.close()
             video.close()
             
+            os.replace(partial_path, audio_path)
+            self._evict(keep=audio_path)
+            
             logger.info(f"Audio extracted successfully: {audio_path}")
             return str(audio_path)
         
         except Exception as e:
+            partial_path.unlink(missing_ok=True)
             logger.error(f"Error extracting audio: {str(e)}")
             raise
     
+    def load_audio(self, video_path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+        """
+        Decode the audio track of a video straight into memory.
+        
+        Runs a single ffmpeg process that skips the video stream, downmixes to
+        mono and resamples to ``sample_rate``. The result can be passed directly
+        to ``AudioTranscriber.transcribe`` without writing a temporary file.
+        
+        Args:
+            video_path: Path to the input video file
+            sample_rate: Output sample rate in Hz (default: 16000, Whisper's rate)
+        
+        Returns:
+            1-D float32 NumPy array with samples in [-1.0, 1.0]
+        
+        Raises:
+            FileNotFoundError: If the video file doesn't exist
+            RuntimeError: If ffmpeg fails to decode the audio
+        """
+        video_path = Path(video_path)
+        
+        if not video_path.exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        
+        key = self.cache_key(video_path, mode="pcm", sample_rate=sample_rate)
+        cache_path = self.temp_dir / f"{key}.s16le"
+        
+        if self._cache_hit(cache_path):
+            logger.info(f"Using cached audio for {video_path.name}: {cache_path}")
+            return self._pcm_to_float(np.fromfile(cache_path, np.int16))
+        
+        logger.info(f"Decoding audio from {video_path.name} ({sample_rate} Hz mono)...")
+        
+        cmd = self._pcm_command(video_path, sample_rate)
+        
+        try:
+            out = subprocess.run(cmd, capture_output=True, check=True).stdout
+        except subprocess.CalledProcessError as e:
+            error = e.stderr.decode(errors='ignore').strip().splitlines()
+            message = error[-1] if error else str(e)
+            logger.error(f"Error decoding audio: {message}")
+            raise RuntimeError(f"Failed to decode audio from {video_path.name}: {message}") from e
+        
+        partial_path = self._partial_path()
+        try:
+            partial_path.write_bytes(out)
+            os.replace(partial_path, cache_path)
+        except OSError:
+            partial_path.unlink(missing_ok=True)
+            raise
+        self._evict(keep=cache_path)
+        
+        # View the raw PCM bytes without copying, then convert once to float32
+        audio = self._pcm_to_float(np.frombuffer(out, np.int16))
+        
+        logger.info(f"Audio decoded successfully: {len(audio) / sample_rate:.1f}s")
+        return audio
+    
+    def stream_audio(
+        self,
+        video_path: str,
+        window_seconds: float = 30.0,
+        overlap_seconds: float = 5.0,
+        sample_rate: int = SAMPLE_RATE
+    ) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Stream the audio of a video as fixed-length overlapping windows.
+        
+        Samples are read incrementally from ffmpeg's stdout (or from the cached
+        PCM file via a memory map), so peak memory is bounded by one window no
+        matter how long the recording is. The decoded PCM is written through to
+        the cache as it streams, so a later call can reuse it.
+        
+        Args:
+            video_path: Path to the input video file
+            window_seconds: Length of each window in seconds (default: 30, Whisper's window)
+            overlap_seconds: Overlap between consecutive windows in seconds
+            sample_rate: Output sample rate in Hz (default: 16000)
+        
+        Yields:
+            (offset_seconds, samples) tuples, where samples is a float32 array of
+            at most window_seconds of audio starting at offset_seconds
+        
+        Raises:
+            FileNotFoundError: If the video file doesn't exist
+            ValueError: If the overlap is not shorter than the window
+            RuntimeError: If ffmpeg fails to decode the audio
+        """
+        video_path = Path(video_path)
+        
+        if not video_path.exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        
+        if not 0 <= overlap_seconds < window_seconds:
+            raise ValueError("overlap_seconds must be >= 0 and shorter than window_seconds")
+        
+        window = int(window_seconds * sample_rate)
+        overlap = int(overlap_seconds * sample_rate)
+        hop = window - overlap
+        
+        key = self.cache_key(video_path, mode="pcm", sample_rate=sample_rate)
+        cache_path = self.temp_dir / f"{key}.s16le"
+        
+        if self._cache_hit(cache_path):
+            logger.info(f"Streaming cached audio for {video_path.name}: {cache_path}")
+            blocks = self._memmap_blocks(cache_path, hop)
+        else:
+            logger.info(f"Streaming audio from {video_path.name} ({sample_rate} Hz mono)...")
+            blocks = self._ffmpeg_blocks(video_path, sample_rate, hop, key)
+        
+        buffer = np.empty(0, np.int16)
+        start = 0  # Sample index of buffer[0]
+        emitted = False
+        
+        try:
+            for block in blocks:
+                buffer = np.concatenate([buffer, block])
+                while len(buffer) >= window:
+                    yield start / sample_rate, self._pcm_to_float(buffer[:window])
+                    emitted = True
+                    buffer = buffer[hop:]
+                    start += hop
+            
+            # Emit the tail unless it's entirely covered by the previous window
+            if len(buffer) > (overlap if emitted else 0):
+                yield start / sample_rate, self._pcm_to_float(buffer)
+        finally:
+            blocks.close()
+    
+    def checkpoint_path(self, video_path: str, sample_rate: int = SAMPLE_RATE) -> str:
+        """
+        Path of the transcription checkpoint journal for a video.
+        
+        The journal sits next to the cached audio and shares its content key, so
+        it is found again for the same input and never for a changed one.
+        
+        Args:
+            video_path: Path to the video file
+            sample_rate: Sample rate the audio is decoded at
+        
+        Returns:
+            Path to the (possibly not yet existing) journal file
+        """
+        key = self.cache_key(Path(video_path), mode="pcm", sample_rate=sample_rate)
+        return str(self.temp_dir / f"{key}.journal")
+    
+    def _pcm_command(self, video_path: Path, sample_rate: int) -> list:
+        """Build the ffmpeg command that writes 16-bit mono PCM to stdout."""
+        return [
+            get_ffmpeg_exe(),
+            '-nostdin',
+            '-loglevel', 'error',
+            '-threads', '0',
+            '-i', str(video_path),
+            '-vn', '-sn', '-dn',  # Don't decode video/subtitle/data streams
+            '-f', 's16le',
+            '-ac', '1',
+            '-acodec', 'pcm_s16le',
+            '-ar', str(sample_rate),
+            '-'
+        ]
+    
+    def _ffmpeg_blocks(self, video_path: Path, sample_rate: int, block_samples: int, key: str):
+        """Yield int16 blocks from a running ffmpeg process, writing them through to the cache."""
+        cache_path = self.temp_dir / f"{key}.s16le"
+        # Each call writes its own partial file: two streams of the same video
+        # would otherwise interleave their writes and race on the rename
+        partial_path = self._partial_path()
+        block_bytes = block_samples * 2
+        
+        process = subprocess.Popen(
+            self._pcm_command(video_path, sample_rate),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        completed = False
+        
+        try:
+            with open(partial_path, 'wb') as cache_file:
+                while True:
+                    data = process.stdout.read(block_bytes)
+                    if not data:
+                        break
+                    data = data[:len(data) - len(data) % 2]
+                    cache_file.write(data)
+                    yield np.frombuffer(data, np.int16)
+            
+            process.wait()
+            if process.returncode != 0:
+                error = process.stderr.read().decode(errors='ignore').strip().splitlines()
+                message = error[-1] if error else f"ffmpeg exited with code {process.returncode}"
+                logger.error(f"Error decoding audio: {message}")
+                raise RuntimeError(f"Failed to decode audio from {video_path.name}: {message}")
+            
+            os.replace(partial_path, cache_path)
+            self._evict(keep=cache_path)
+            completed = True
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+            if not completed:
+                partial_path.unlink(missing_ok=True)
+    
+    @staticmethod
+    def _memmap_blocks(cache_path: Path, block_samples: int):
+        """Yield int16 blocks from a cached PCM file without loading it into memory."""
+        pcm = np.memmap(cache_path, np.int16, mode='r')
+        for i in range(0, len(pcm), block_samples):
+            yield np.asarray(pcm[i:i + block_samples])
+    
+    @staticmethod
+    def _pcm_to_float(pcm: np.ndarray) -> np.ndarray:
+        """Convert signed 16-bit PCM samples to float32 in [-1.0, 1.0]."""
+        audio = pcm.astype(np.float32)
+        audio *= 1.0 / 32768.0
+        return audio
+    
     def cleanup(self, audio_path: str = None):
         """
         Clean up temporary audio files.
@@ -0,0 +1,182 @@
+"""
+Persistent result cache for the AI-Powered Video Lecture Assistant.
+A small SQLite-backed key/value store with a size cap, LRU eviction and optional
+TTL, used to avoid re-running expensive stages (Whisper, LLM analysis) on inputs
+already processed.
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def make_key(*parts) -> str:
+    """Build a cache key by hashing JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def text_hash(text: str) -> str:
+    """Content hash of a text (e.g. a transcript), usable as a cache tag."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SQLiteCache:
+    """
+    Disk-backed JSON cache with a size cap and least-recently-used eviction.
+    
+    Each entry can carry a tag (e.g. the audio content hash) so every entry
+    derived from the same input can be invalidated at once, and an expiry time
+    after which it is treated as missing. Hits and misses are counted.
+    """
+    
+    def __init__(self, path: str, max_size_mb: int = 512, ttl_seconds: float = None):
+        """
+        Initialize the SQLiteCache.
+        
+        Args:
+            path: SQLite database file (created if missing)
+            max_size_mb: Total size of stored values to keep. Least recently used
+                         entries are evicted once it is exceeded
+            ttl_seconds: Default lifetime of new entries (None = never expire)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                tag TEXT,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                expires REAL
+            )"""
+        )
+        # Databases created before entries could expire lack the column
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(entries)")]
+        if "expires" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN expires REAL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_tag ON entries (tag)")
+        self._conn.commit()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up an entry and mark it as recently used.
+        
+        Returns:
+            The stored value, or None if the key is not cached
+        """
+        now = time.time()
+        
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] is not None and row[1] <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+    
+    def set(self, key: str, value: Any, tag: str = None, ttl_seconds: float = None):
+        """
+        Store a JSON-serializable value, evicting old entries if over the size cap.
+        
+        Args:
+            key: Cache key (see ``make_key``)
+            value: Value to store
+            tag: Optional tag for grouped invalidation
+            ttl_seconds: Lifetime of this entry (default: the cache's ttl_seconds)
+        """
+        payload = json.dumps(value, ensure_ascii=False, default=float)
+        now = time.time()
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires = now + ttl_seconds if ttl_seconds is not None else None
+        
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, tag, value, size, created, accessed, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, tag, payload, len(payload), now, now, expires)
+            )
+            self._evict()
+            self._conn.commit()
+    
+    def invalidate(self, key: str = None, tag: str = None) -> int:
+        """
+        Remove entries by key or by tag. With neither, clears the whole cache.
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if key is not None:
+                cursor = self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            elif tag is not None:
+                cursor = self._conn.execute("DELETE FROM entries WHERE tag = ?", (tag,))
+            else:
+                cursor = self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+        return cursor.rowcount
+    
+    def stats(self) -> Dict:
+        """
+        Describe the cache.
+        
+        Returns:
+            Dictionary with 'hits', 'misses' and 'hit_rate' (since this instance
+            was created), plus the stored 'entries' and their total 'bytes'
+        """
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size
+        }
+    
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until the cache fits its size cap."""
+        self._conn.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+        
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+        
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_size_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            logger.info(f"Evicted cache entry {key[:12]}... from {self.path.name}")
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,223 @@
+"""
+Transcript chunking for the AI-Powered Video Lecture Assistant.
+Splits long transcriptions into token-budgeted chunks on Whisper segment
+boundaries and runs per-chunk LLM calls with bounded concurrency, so long
+lectures can be analyzed map-reduce style without overflowing the context window.
+"""
+
+import re
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .json_utils import parse_llm_json
+from .prompts import MAP_SYSTEM_INSTRUCTION, build_map_prompt, format_notes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rough characters per token for English text with common LLM tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer dependency)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _format_time(seconds: float) -> str:
+    """Format seconds as H:MM:SS or M:SS."""
+    seconds = int(seconds)
+    hours, minutes = divmod(seconds // 60, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds % 60:02d}"
+    return f"{minutes}:{seconds % 60:02d}"
+
+
+def _text_segments(text: str) -> List[Dict]:
+    """Split plain text into sentence 'segments' when no Whisper segments are available."""
+    sentences = re.split(r"(?<=[.!?])\s+", text.strip())
+    return [{"text": sentence} for sentence in sentences if sentence]
+
+
+def chunk_transcript(text: str, segments: Optional[List[Dict]] = None, max_tokens: int = 3000) -> List[Dict]:
+    """
+    Split a transcript into chunks of at most ``max_tokens`` (estimated).
+    
+    Chunks break on Whisper segment boundaries, or on sentence boundaries when
+    only plain text is available. A single segment longer than the budget is
+    split on whitespace.
+    
+    Args:
+        text: Full transcription text (used when segments is empty)
+        segments: Whisper segments ({'start', 'end', 'text'})
+        max_tokens: Token budget per chunk
+    
+    Returns:
+        List of chunk dicts with 'text', 'tokens' and, when timestamps are
+        known, 'start' / 'end' seconds
+    """
+    pieces = [s for s in (segments or []) if s.get("text", "").strip()] or _text_segments(text)
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    
+    chunks = []
+    current = []
+    current_chars = 0
+    
+    def flush():
+        nonlocal current, current_chars
+        if not current:
+            return
+        chunk_text = " ".join(piece["text"].strip() for piece in current)
+        chunk = {"text": chunk_text, "tokens": estimate_tokens(chunk_text)}
+        if "start" in current[0] and "end" in current[-1]:
+            chunk["start"] = current[0]["start"]
+            chunk["end"] = current[-1]["end"]
+        chunks.append(chunk)
+        current = []
+        current_chars = 0
+    
+    for piece in pieces:
+        piece_chars = len(piece["text"].strip()) + 1
+        
+        if piece_chars > max_chars:
+            # Oversized segment: break it up on whitespace
+            flush()
+            part = []
+            part_chars = 0
+            for word in piece["text"].split():
+                if part and part_chars + len(word) > max_chars:
+                    current = [dict(piece, text=" ".join(part))]
+                    flush()
+                    part = []
+                    part_chars = 0
+                part.append(word)
+                part_chars += len(word) + 1
+            current = [dict(piece, text=" ".join(part))]
+            current_chars = len(current[0]["text"]) + 1
+            continue
+        
+        if current_chars + piece_chars > max_chars:
+            flush()
+        current.append(piece)
+        current_chars += piece_chars
+    
+    flush()
+    return chunks
+
+
+def chunk_label(chunk: Dict, index: int, total: int) -> str:
+    """Human-readable label for a chunk, e.g. 'Part 2/5 (12:30-25:10)'."""
+    label = f"Part {index + 1}/{total}"
+    if "start" in chunk:
+        label += f" ({_format_time(chunk['start'])}-{_format_time(chunk['end'])})"
+    return label
+
+
+def map_chunks(func: Callable[[Dict, int], Any], chunks: List[Dict], max_workers: int = 2) -> List[Any]:
+    """
+    Run ``func(chunk, index)`` over every chunk with bounded concurrency.
+    
+    Args:
+        func: Per-chunk call (typically one LLM request)
+        chunks: Chunks from ``chunk_transcript``
+        max_workers: Maximum number of calls in flight
+    
+    Returns:
+        Results in chunk order
+    
+    Raises:
+        Exception: The first per-chunk failure
+    """
+    if max_workers <= 1 or len(chunks) == 1:
+        return [func(chunk, i) for i, chunk in enumerate(chunks)]
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)), thread_name_prefix="map-chunk") as pool:
+        futures = [pool.submit(func, chunk, i) for i, chunk in enumerate(chunks)]
+        return [future.result() for future in futures]
+
+
+def collect_chunk_notes(
+    chunks: List[Dict],
+    call: Callable[[str, str], str],
+    max_tokens: int = 3000,
+    max_workers: int = 2
+) -> List[str]:
+    """
+    Map step of map-reduce analysis: extract study notes from every chunk.
+    
+    If the combined notes are still over the token budget, they are grouped
+    and condensed again until they fit in a single reduce prompt.
+    
+    Args:
+        chunks: Chunks from ``chunk_transcript``
+        call: ``call(prompt, system_instruction) -> response text`` (one LLM request)
+        max_tokens: Token budget per request
+        max_workers: Maximum number of requests in flight
+    
+    Returns:
+        Formatted notes, one per (possibly condensed) chunk, in lecture order
+    """
+    def extract(chunk: Dict, index: int) -> str:
+        label = chunk_label(chunk, index, len(chunks))
+        response = call(build_map_prompt(label, chunk["text"]), MAP_SYSTEM_INSTRUCTION)
+        return _chunk_notes(label, response)
+    
+    logger.info(f"🧩 Extracting notes from {len(chunks)} chunks ({max_workers} at a time)...")
+    notes = map_chunks(extract, chunks, max_workers)
+    
+    while True:
+        groups = _condense_groups(notes, max_tokens)
+        if groups is None:
+            return notes
+        logger.info(f"🧩 Condensing {len(notes)} notes into {len(groups)}...")
+        chunks = groups
+        notes = map_chunks(extract, chunks, max_workers)
+
+
+async def collect_chunk_notes_async(
+    chunks: List[Dict],
+    call: Callable[[str, str], Awaitable[str]],
+    max_tokens: int = 3000,
+    max_workers: int = 2
+) -> List[str]:
+    """Async version of ``collect_chunk_notes``; ``call`` is a coroutine function."""
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+    
+    async def extract(chunk: Dict, index: int, total: int) -> str:
+        label = chunk_label(chunk, index, total)
+        async with semaphore:
+            response = await call(build_map_prompt(label, chunk["text"]), MAP_SYSTEM_INSTRUCTION)
+        return _chunk_notes(label, response)
+    
+    async def extract_all(chunks: List[Dict]) -> List[str]:
+        return list(await asyncio.gather(*(extract(chunk, i, len(chunks)) for i, chunk in enumerate(chunks))))
+    
+    logger.info(f"🧩 Extracting notes from {len(chunks)} chunks ({max_workers} at a time)...")
+    notes = await extract_all(chunks)
+    
+    while True:
+        groups = _condense_groups(notes, max_tokens)
+        if groups is None:
+            return notes
+        logger.info(f"🧩 Condensing {len(notes)} notes into {len(groups)}...")
+        notes = await extract_all(groups)
+
+
+def _chunk_notes(label: str, response: str) -> str:
+    """Format one chunk's extraction response as notes."""
+    logger.info(f"✅ Extracted notes from {label}")
+    notes, _ = parse_llm_json(response)
+    return format_notes(label, notes)
+
+
+def _condense_groups(notes: List[str], max_tokens: int) -> Optional[List[Dict]]:
+    """Group notes for another condensing pass, or None if they already fit (or can't shrink)."""
+    if len(notes) <= 1 or estimate_tokens("\n\n".join(notes)) <= max_tokens:
+        return None
+    
+    groups = chunk_transcript("", [{"text": note} for note in notes], max_tokens)
+    if len(groups) >= len(notes):
+        return None  # Each note alone fills the budget; condensing can't help
+    return groups
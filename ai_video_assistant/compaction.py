@@ -0,0 +1,297 @@
+"""
+Transcript compaction for the AI-Powered Video Lecture Assistant.
+Strips spoken disfluencies, collapses repeated word runs (restarts and Whisper
+hallucination loops) and merges near-identical adjacent segments before a
+transcript is sent to the LLM, so fewer prompt tokens are paid for.
+"""
+
+import re
+import logging
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .chunking import _text_segments, estimate_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Hesitation sounds: never carry meaning
+HESITATIONS = ("um+", "uh+", "uhm+", "erm+", "ah+", "hmm+", "mhm")
+
+# Hesitations that double as words or units ("5 mm"), removed only where commas /
+# sentence breaks set them apart or they make up the whole segment
+AMBIGUOUS_HESITATIONS = ("er", "mm+")
+
+# Discourse markers, removed only where commas / sentence breaks set them apart
+DISCOURSE_MARKERS = ("you know", "i mean", "you see", "like", "so", "okay", "ok", "right", "well")
+
+# Hedges removed anywhere at the aggressive level (this can drop some nuance)
+HEDGES = ("basically", "actually", "literally", "essentially", "sort of", "kind of", "just")
+
+# Words whose doubling is often grammatical ("I know that that works")
+LEGITIMATE_DOUBLES = {"that", "had", "is", "do", "very", "really", "no", "bye"}
+
+# Per-level settings:
+#   markers/hedges: which filler classes are removed besides hesitations
+#   max_ngram: longest repeated phrase collapsed
+#   min_repeats: how many back-to-back copies make a run (loops vs. single restarts)
+#   similarity: word-sequence similarity at which adjacent segments count as duplicates
+LEVELS = {
+    "light": {"markers": False, "hedges": False, "max_ngram": 4, "min_repeats": 3, "similarity": 0.95},
+    "moderate": {"markers": True, "hedges": False, "max_ngram": 8, "min_repeats": 2, "similarity": 0.9},
+    "aggressive": {"markers": True, "hedges": True, "max_ngram": 16, "min_repeats": 2, "similarity": 0.8},
+}
+
+
+def _spoken_forms(patterns: Tuple[str, ...]) -> str:
+    """Alternation matching each pattern in lower case or capitalized, but not in capitals (UM, ER)."""
+    return "|".join(f"[{p[0].upper()}{p[0]}]{p[1:]}" for p in patterns)
+
+
+_HESITATION_RE = re.compile(r"(?:,\s*)?\b(?:%s)\b,?\s*" % _spoken_forms(HESITATIONS))
+
+# "the visit, er, was short" / "Mm, right." / "mm." -- never "5 mm thick"
+_AMBIGUOUS_RE = re.compile(
+    r"(?:^|(?<=[.!?])\s+|,\s*)(?:%s)\b(?:\s*,\s*|(?=\s*[.!?])|\s*$)" % _spoken_forms(AMBIGUOUS_HESITATIONS)
+)
+
+_MARKERS = "|".join(re.escape(marker) for marker in DISCOURSE_MARKERS)
+_MARKER_RES = (
+    # "So, the proof..." -> "the proof..."
+    (re.compile(r"(^|[.!?]\s+)(?:%s),\s*" % _MARKERS, re.IGNORECASE), r"\1"),
+    # "it's, you know, simple" -> "it's simple"
+    (re.compile(r",\s*(?:%s),\s*" % _MARKERS, re.IGNORECASE), " "),
+    # "it's hard, you know." -> "it's hard."
+    (re.compile(r",\s*(?:%s)(?=\s*[.!?]|\s*$)" % _MARKERS, re.IGNORECASE), ""),
+)
+
+_HEDGE_RE = re.compile(
+    r"\b(?:%s)\b,?\s*" % "|".join(re.escape(hedge) for hedge in HEDGES),
+    re.IGNORECASE
+)
+
+_WORD_RE = re.compile(r"[^\w']+")
+
+
+def _norm(word: str) -> str:
+    """Lower-case a word and strip its punctuation, for comparisons."""
+    return _WORD_RE.sub("", word.lower())
+
+
+def _tidy(text: str) -> str:
+    """Fix the spacing and punctuation left behind by removals."""
+    text = re.sub(r"\s+([,.!?;:])", r"\1", text)
+    text = re.sub(r"([,;:])(?:\s*[,;:])+", r"\1", text)
+    text = re.sub(r",(\s*[.!?])", r"\1", text)
+    text = re.sub(r"\s{2,}", " ", text)
+    return text.strip().lstrip(",;: ")
+
+
+def strip_fillers(text: str, level: str = "moderate") -> Tuple[str, int]:
+    """
+    Remove filler words from a piece of transcript.
+    
+    Args:
+        text: Transcript text
+        level: Compaction level (see ``LEVELS``)
+    
+    Returns:
+        (text without fillers, number of fillers removed)
+    """
+    settings = LEVELS[level]
+    text, removed = _HESITATION_RE.subn(" ", text)
+    text, count = _AMBIGUOUS_RE.subn(" ", text)
+    removed += count
+    
+    # Repeat until stable: removing one marker can expose another ("So, you know, ...")
+    while settings["markers"]:
+        found = 0
+        for pattern, replacement in _MARKER_RES:
+            text, count = pattern.subn(replacement, text.strip())
+            found += count
+        removed += found
+        if not found:
+            break
+    
+    if settings["hedges"]:
+        text, count = _HEDGE_RE.subn("", text)
+        removed += count
+    
+    return _tidy(text), removed
+
+
+def collapse_repeats(text: str, max_ngram: int = 8, min_repeats: int = 2, keep_doubles: bool = True) -> Tuple[str, int]:
+    """
+    Collapse back-to-back repetitions of a phrase to a single copy.
+    
+    "we can we can we can see" becomes "we can see". Words are compared without
+    case or punctuation; the first copy is kept as spoken.
+    
+    Args:
+        text: Transcript text
+        max_ngram: Longest phrase (in words) that is checked for repetition
+        min_repeats: Copies needed before a run is collapsed
+        keep_doubles: Leave single-word doubles that are often grammatical
+                      ("that that") alone
+    
+    Returns:
+        (collapsed text, number of words removed)
+    """
+    words = text.split()
+    keys = [_norm(word) for word in words]
+    kept = []
+    removed = 0
+    i = 0
+    
+    while i < len(words):
+        # Phrases up to max_ngram words that fit twice in what's left
+        for n in range(1, min(max_ngram, (len(words) - i) // 2) + 1):
+            phrase = keys[i:i + n]
+            if not all(phrase):
+                continue
+            
+            copies = 1
+            while keys[i + copies * n:i + (copies + 1) * n] == phrase:
+                copies += 1
+            
+            if copies < min_repeats:
+                continue
+            if n == 1 and copies == 2 and keep_doubles and phrase[0] in LEGITIMATE_DOUBLES:
+                continue
+            
+            kept.extend(words[i:i + n])
+            removed += (copies - 1) * n
+            i += copies * n
+            break
+        else:
+            kept.append(words[i])
+            i += 1
+    
+    return " ".join(kept), removed
+
+
+def _similar(a: str, b: str, threshold: float) -> bool:
+    """Whether two segments say (nearly) the same words."""
+    a_words, b_words = a.lower().split(), b.lower().split()
+    if not a_words or not b_words:
+        return False
+    if a_words == b_words:
+        return True
+    # Cheap upper bound first: the ratio can't beat the relative length difference
+    shorter, longer = sorted((len(a_words), len(b_words)))
+    if 2 * shorter / (shorter + longer) < threshold:
+        return False
+    return SequenceMatcher(None, a_words, b_words, autojunk=False).ratio() >= threshold
+
+
+def compact_transcript(text: str, segments: Optional[List[Dict]] = None, level: str = "moderate") -> Dict:
+    """
+    Compact a transcript before LLM analysis.
+    
+    Fillers are stripped and repeated phrases collapsed within each segment, then
+    segments that repeat the previous one (near-)verbatim are merged into it,
+    extending its end time.
+    
+    Args:
+        text: Full transcription text (used when segments is empty)
+        segments: Whisper segments ({'start', 'end', 'text'}); sentences of the
+                  text are used when not given
+        level: 'light' (hesitations and obvious loops only), 'moderate' or
+               'aggressive' (also hedges such as "basically"; may lose nuance)
+    
+    Returns:
+        {
+            'text': str,
+            'segments': list (compacted copies; the input is not modified),
+            'report': {
+                'level', 'original_tokens', 'compacted_tokens', 'reduction',
+                'fillers_removed', 'repeated_words_removed', 'segments_merged'
+            }
+        }
+    """
+    if level not in LEVELS:
+        raise ValueError(f"Unknown compaction level: {level}. Use one of: {', '.join(LEVELS)}")
+    settings = LEVELS[level]
+    
+    has_segments = bool(segments)
+    pieces = segments if has_segments else _text_segments(text)
+    original_tokens = estimate_tokens(text) if text else estimate_tokens(" ".join(p["text"] for p in pieces))
+    
+    fillers = repeated = merged = 0
+    compacted: List[Dict] = []
+    
+    for piece in pieces:
+        piece_text, count = strip_fillers(piece.get("text", ""), level)
+        fillers += count
+        piece_text, count = collapse_repeats(
+            piece_text,
+            max_ngram=settings["max_ngram"],
+            min_repeats=settings["min_repeats"],
+            keep_doubles=level != "aggressive"
+        )
+        repeated += count
+        
+        if not _norm(piece_text):
+            continue
+        
+        if compacted and _similar(compacted[-1]["text"], piece_text, settings["similarity"]):
+            merged += 1
+            if "end" in piece:
+                compacted[-1]["end"] = piece["end"]
+            continue
+        
+        compacted.append(dict(piece, text=piece_text))
+    
+    compacted_text = " ".join(piece["text"] for piece in compacted)
+    compacted_tokens = estimate_tokens(compacted_text)
+    report = {
+        "level": level,
+        "original_tokens": original_tokens,
+        "compacted_tokens": compacted_tokens,
+        "reduction": 1 - compacted_tokens / original_tokens if original_tokens else 0.0,
+        "fillers_removed": fillers,
+        "repeated_words_removed": repeated,
+        "segments_merged": merged
+    }
+    
+    logger.info(
+        f"✂️  Compacted transcript ({level}): {original_tokens:,} → {compacted_tokens:,} tokens "
+        f"(-{report['reduction']:.1%}; {fillers} fillers, {repeated} repeated words, {merged} duplicate segments)"
+    )
+    
+    return {
+        "text": compacted_text,
+        "segments": compacted if has_segments else [],
+        "report": report
+    }
+
+
+def corpus_reduction(transcripts: Iterable[Dict], levels: Iterable[str] = tuple(LEVELS)) -> Dict[str, Dict]:
+    """
+    Measure what compaction saves over a set of transcripts.
+    
+    Args:
+        transcripts: Dicts with 'text' and optionally 'segments' (e.g. cached
+                     ``transcribe_only`` results)
+        levels: Levels to measure
+    
+    Returns:
+        {level: {'transcripts', 'original_tokens', 'compacted_tokens', 'reduction'}}
+    """
+    transcripts = list(transcripts)
+    totals = {}
+    
+    for level in levels:
+        original = compacted = 0
+        for transcript in transcripts:
+            report = compact_transcript(transcript["text"], transcript.get("segments"), level)["report"]
+            original += report["original_tokens"]
+            compacted += report["compacted_tokens"]
+        
+        totals[level] = {
+            "transcripts": len(transcripts),
+            "original_tokens": original,
+            "compacted_tokens": compacted,
+            "reduction": 1 - compacted / original if original else 0.0
+        }
+    return totals
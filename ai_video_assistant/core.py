@@ -4,16 +4,24 @@ Simple, clean interface for developers
 """
 
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor
 import subprocess
+import asyncio
+import time
+import logging
 
 # Use relative imports for package modules
-from .audio_extractor import AudioExtractor
+from .audio_extractor import SAMPLE_RATE, AudioExtractor
 from .transcriber import AudioTranscriber
 from .analyzer import OllamaContentAnalyzer
 from .api_analyzer import APIContentAnalyzer
+from .compaction import LEVELS as COMPACTION_LEVELS, compact_transcript
+from .extractive import extract_digest
 from .word_generator import generate_word_document
-from .subtitle_generator import generate_srt
+from .subtitle_generator import generate_srt, write_srt_stream
+
+logger = logging.getLogger(__name__)
 
 
 class VideoAssistant:
@@ -32,11 +40,31 @@ class VideoAssistant:
         ollama_model: str = "llama3.1",
         output_dir: str = "outputs",
         ollama_timeout: int = 600,
+        ollama_keep_alive: Optional[str] = None,
         # API-based analysis options
         use_api: bool = False,
         api_key: str = None,
         api_provider: str = "openai",
-        api_model: str = None
+        api_model: str = None,
+        api_fallbacks: Optional[List[Dict]] = None,
+        api_rpm: Optional[float] = None,
+        api_tpm: Optional[float] = None,
+        stream_llm: bool = False,
+        analysis_mode: str = "single",
+        structured_output: bool = False,
+        compaction: Optional[str] = None,
+        digest_tokens: Optional[int] = None,
+        # Audio pipeline options
+        in_memory_audio: bool = False,
+        streaming_audio: bool = False,
+        vad: bool = False,
+        parallel_workers: int = 0,
+        quantize_whisper: bool = False,
+        cache_dir: Optional[str] = None,
+        llm_cache_ttl: Optional[float] = None,
+        warm_start: bool = False,
+        checkpoint: bool = False,
+        executor: Optional[Executor] = None
     ):
         """
         Initialize the video assistant.
@@ -45,21 +73,88 @@ class VideoAssistant:
             whisper_model: Whisper model size (tiny/base/small/medium/large)
             ollama_model: Ollama model name (default: llama3.1) - used if use_api=False
             output_dir: Directory for output files
-            ollama_timeout: Timeout for Ollama requests in seconds (default: 600 = 10 min)
+            ollama_timeout: Timeout for Ollama requests in seconds until throughput has been
+                            measured; then each request gets its own (default: 600 = 10 min)
+            ollama_keep_alive: How long Ollama keeps the model loaded between jobs, e.g.
+                               '1h' or -1 for forever (default: '30m' or OLLAMA_KEEP_ALIVE)
             use_api: Use cloud API instead of local Ollama (default: False)
             api_key: API key for cloud provider (required if use_api=True)
             api_provider: API provider ('openai', 'groq', 'anthropic')
             api_model: Specific model name for API (optional, uses provider default)
+            api_fallbacks: Providers to fail over to, in order, when the API provider
+                           fails or is slow: dicts with 'provider' and 'api_key', and
+                           optionally 'model' and 'api_url'
+            api_rpm: Requests-per-minute limit of the API provider; requests over it
+                     are queued instead of failing with 429 errors
+            api_tpm: Tokens-per-minute limit of the API provider (estimated prompt
+                     tokens plus the output token limit)
+            stream_llm: Stream LLM responses and parse the JSON as it arrives, aborting
+                        malformed output early (time-to-first-token is logged)
+            analysis_mode: 'single' (one LLM generation) or 'sections' (summary, insights
+                           and quiz as three concurrent, smaller generations)
+            structured_output: Constrain the LLM to the result's JSON schema with the
+                               provider's structured-output feature
+            compaction: Compact the transcript before analysis to cut prompt tokens:
+                        None (off), 'light' (hesitations and hallucination loops),
+                        'moderate' (also discourse fillers and restarts) or
+                        'aggressive' (also hedges; may lose some nuance). Subtitles
+                        and the returned transcription are not affected
+            digest_tokens: Send the LLM an extractive digest of transcripts longer than
+                           this many tokens (e.g. 3500): the most central segments by
+                           TF-IDF TextRank, in timeline order. The kept segments are
+                           listed in the result (None = always send everything)
+            in_memory_audio: Decode audio with a single ffmpeg pipe straight to 16 kHz mono
+                             in memory instead of writing a WAV file to temp_audio/
+            streaming_audio: Stream audio to Whisper in overlapping 30 s windows so peak
+                             memory stays flat for multi-hour recordings
+            vad: Skip silence with a voice-activity-detection pre-pass before Whisper
+            parallel_workers: Transcribe silence-split windows in this many CPU worker
+                              processes, each with its own model (default: 0 = serial)
+            quantize_whisper: Run Whisper as an int8 dynamic-quantized model on the CPU
+            cache_dir: Directory for persistent result caches, so re-processing an already
+                       transcribed video skips Whisper and an unchanged transcript skips
+                       the LLM, e.g. '~/.cache/ai_video_assistant' (default: None =
+                       no caching, nothing is written outside output_dir)
+            llm_cache_ttl: Seconds a cached LLM analysis stays valid (None = no expiry)
+            warm_start: Start loading the Whisper model (and the Ollama model) in the
+                        background right away, instead of when the first video is processed
+            checkpoint: Journal each completed 30 s transcription window next to the
+                        cached audio, so an interrupted run resumes where it stopped
+            executor: Where the ``*_async`` methods run audio extraction and Whisper
+                      (default: the event loop's thread pool). Threads share one model,
+                      so inference is serialized; a ProcessPoolExecutor runs it in worker
+                      processes that each keep their own model
         """
         self.whisper_model = whisper_model
         self.ollama_model = ollama_model
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self.use_api = use_api
+        self.executor = executor
         
-        # Initialize components
-        self.audio_extractor = AudioExtractor()
-        self.transcriber = AudioTranscriber(model_size=whisper_model)
+        if compaction is not None and compaction not in COMPACTION_LEVELS:
+            raise ValueError(f"Unknown compaction level: {compaction}. Use one of: {', '.join(COMPACTION_LEVELS)}")
+        self.compaction = compaction
+        self.digest_tokens = digest_tokens
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        
+        # Everything a worker process needs to rebuild the transcription stage
+        self._transcription_settings = {
+            "whisper_model": whisper_model,
+            "vad": vad,
+            "quantize_whisper": quantize_whisper,
+            "cache_dir": cache_dir,
+            "in_memory_audio": in_memory_audio,
+            "streaming_audio": streaming_audio,
+            "parallel_workers": parallel_workers,
+            "checkpoint": checkpoint
+        }
+        self._init_transcription(**self._transcription_settings)
+        
+        if warm_start:
+            self.transcriber.load_model_async()
+        
+        llm_cache_path = str(self.cache_dir / "llm_responses.sqlite") if self.cache_dir else None
         
         # Choose analyzer based on mode
         if use_api:
@@ -68,14 +163,54 @@ class VideoAssistant:
             self.analyzer = APIContentAnalyzer(
                 api_key=api_key,
                 provider=api_provider,
-                model=api_model
+                model=api_model,
+                fallbacks=api_fallbacks,
+                rpm=api_rpm,
+                tpm=api_tpm,
+                stream=stream_llm,
+                analysis_mode=analysis_mode,
+                structured_output=structured_output,
+                cache_path=llm_cache_path,
+                cache_ttl=llm_cache_ttl
             )
         else:
             self.analyzer = OllamaContentAnalyzer(
                 model=ollama_model,
-                timeout=ollama_timeout
+                timeout=ollama_timeout,
+                keep_alive=ollama_keep_alive,
+                preload=warm_start,
+                stream=stream_llm,
+                analysis_mode=analysis_mode,
+                structured_output=structured_output,
+                cache_path=llm_cache_path,
+                cache_ttl=llm_cache_ttl
             )
     
+    def _init_transcription(
+        self,
+        whisper_model: str,
+        vad: bool,
+        quantize_whisper: bool,
+        cache_dir: Optional[str],
+        in_memory_audio: bool,
+        streaming_audio: bool,
+        parallel_workers: int,
+        checkpoint: bool
+    ):
+        """Set up audio extraction and transcription (see ``__init__`` for the arguments)."""
+        self.in_memory_audio = in_memory_audio
+        self.streaming_audio = streaming_audio
+        self.parallel_workers = parallel_workers
+        self.checkpoint = checkpoint
+        
+        self.audio_extractor = AudioExtractor()
+        self.transcriber = AudioTranscriber(
+            model_size=whisper_model,
+            vad=vad,
+            quantize=quantize_whisper,
+            cache_path=str(Path(cache_dir).expanduser() / "transcriptions.sqlite") if cache_dir else None
+        )
+    
     def process_video(
         self,
         video_path: str,
@@ -102,20 +237,124 @@ class VideoAssistant:
                 'quiz': list,
                 'srt_path': str (if generate_subtitles),
                 'docx_path': str (if generate_word_doc),
-                'video_with_subtitles': str (if embed_subtitles)
+                'video_with_subtitles': str (if embed_subtitles),
+                'compaction': dict token reduction report (if compaction is enabled),
+                'digest': dict with the 'kept_segments' the LLM saw and a 'report'
+                          (if the transcript was longer than digest_tokens),
+                'timings': dict of per-stage wall-clock seconds
             }
         """
+        started = time.perf_counter()
+        timings = {}
         video_path = Path(video_path)
         video_name = video_path.stem
         
-        # Step 1: Extract audio
-        audio_path = self.audio_extractor.extract_audio(str(video_path))
+        # Step 1 & 2: Extract audio and transcribe (writing SRT subtitles, optional)
+        srt_path = self.output_dir / f"{video_name}_subtitles.srt" if generate_subtitles else None
+        transcription_result = self._transcribe_video(str(video_path), srt_path=srt_path, timings=timings)
+        
+        # Step 3: Analyze with AI (on the compacted transcript, if enabled)
+        text, segments, reports = self._analysis_input(
+            transcription_result['text'], transcription_result.get('segments'), timings
+        )
+        
+        stage_started = time.perf_counter()
+        analysis = self.analyzer.analyze(text, segments=segments)
+        timings['analysis'] = time.perf_counter() - stage_started
+        analysis = dict(analysis, **reports)
+        
+        return self._build_outputs(
+            video_path, transcription_result, analysis, srt_path,
+            generate_word_doc, embed_subtitles, timings, started
+        )
+    
+    async def process_video_async(
+        self,
+        video_path: str,
+        generate_subtitles: bool = True,
+        generate_word_doc: bool = True,
+        embed_subtitles: bool = False
+    ) -> Dict:
+        """
+        Async version of ``process_video`` that doesn't block the event loop.
+        
+        Audio extraction and Whisper run on the configured executor, the LLM
+        requests run on the event loop (see ``analyze_async``), and the output
+        files are written from a worker thread, so many videos can be in flight
+        in one process.
+        
+        Example:
+            results = await asyncio.gather(*(assistant.process_video_async(p) for p in paths))
+        
+        Returns:
+            Same dictionary as ``process_video``
+        """
+        started = time.perf_counter()
+        video_path = Path(video_path)
+        
+        srt_path = self.output_dir / f"{video_path.stem}_subtitles.srt" if generate_subtitles else None
+        transcription_result, timings = await self._transcribe_video_async(str(video_path), srt_path)
         
-        # Step 2: Transcribe
-        transcription_result = self.transcriber.transcribe(audio_path)
+        text, segments, reports = self._analysis_input(
+            transcription_result['text'], transcription_result.get('segments'), timings
+        )
         
-        # Step 3: Analyze with AI
-        analysis = self.analyzer.analyze(transcription_result['text'])
+        stage_started = time.perf_counter()
+        analysis = await self.analyzer.analyze_async(text, segments=segments)
+        timings['analysis'] = time.perf_counter() - stage_started
+        analysis = dict(analysis, **reports)
+        
+        return await asyncio.to_thread(
+            self._build_outputs,
+            video_path, transcription_result, analysis, srt_path,
+            generate_word_doc, embed_subtitles, timings, started
+        )
+    
+    def _analysis_input(
+        self,
+        text: str,
+        segments: Optional[List[Dict]] = None,
+        timings: Dict = None
+    ) -> Tuple[str, Optional[List[Dict]], Dict]:
+        """
+        Apply the configured compaction and extractive digest to a transcript.
+        
+        Returns:
+            (text, segments) to analyze, and the stage reports ('compaction',
+            'digest') for the result. Stage durations are recorded in timings
+        """
+        timings = {} if timings is None else timings
+        reports = {}
+        
+        if self.compaction:
+            stage_started = time.perf_counter()
+            compacted = compact_transcript(text, segments, self.compaction)
+            text, segments = compacted['text'], compacted['segments'] or None
+            reports['compaction'] = compacted['report']
+            timings['compaction'] = time.perf_counter() - stage_started
+        
+        if self.digest_tokens:
+            digest = extract_digest(text, segments, self.digest_tokens)
+            if digest['report']['segments_kept'] < digest['report']['segments_total']:
+                text, segments = digest['text'], digest['segments'] if segments else None
+                reports['digest'] = {'kept_segments': digest['segments'], 'report': digest['report']}
+                timings['digest'] = digest['report']['seconds']
+        
+        return text, segments, reports
+    
+    def _build_outputs(
+        self,
+        video_path: Path,
+        transcription_result: Dict,
+        analysis: Dict,
+        srt_path: Optional[Path],
+        generate_word_doc: bool,
+        embed_subtitles: bool,
+        timings: Dict,
+        started: float
+    ) -> Dict:
+        """Assemble the result of ``process_video`` and write the optional output files."""
+        video_name = video_path.stem
         
         # Build result
         result = {
@@ -128,24 +367,29 @@ class VideoAssistant:
             'quiz': analysis['quiz']
         }
         
-        # Step 4: Generate SRT subtitles (optional)
-        if generate_subtitles:
-            srt_path = self.output_dir / f"{video_name}_subtitles.srt"
-            generate_srt(transcription_result['segments'], str(srt_path))
+        for stage in ('compaction', 'digest'):
+            if analysis.get(stage):
+                result[stage] = analysis[stage]
+        
+        if srt_path:
             result['srt_path'] = str(srt_path)
         
-        # Step 5: Generate Word document (optional)
+        # Step 4: Generate Word document (optional)
         if generate_word_doc:
             docx_path = self.output_dir / f"{video_name}_analysis.docx"
             generate_word_document(result, str(docx_path))
             result['docx_path'] = str(docx_path)
         
-        # Step 6: Embed subtitles in video (optional)
-        if embed_subtitles and generate_subtitles:
+        # Step 5: Embed subtitles in video (optional)
+        if embed_subtitles and srt_path:
             output_video = self.output_dir / f"{video_name}_with_subtitles.mp4"
             self._embed_subtitles(str(video_path), result['srt_path'], str(output_video))
             result['video_with_subtitles'] = str(output_video)
         
+        timings['total'] = time.perf_counter() - started
+        result['timings'] = timings
+        self._log_timings(timings)
+        
         return result
     
     def transcribe_only(self, video_path: str) -> Dict:
@@ -159,13 +403,51 @@ class VideoAssistant:
                 'segments': list
             }
         """
-        audio_path = self.audio_extractor.extract_audio(video_path)
-        return self.transcriber.transcribe(audio_path)
+        return self._transcribe_video(video_path)
+    
+    async def transcribe_only_async(self, video_path: str) -> Dict:
+        """
+        Async version of ``transcribe_only``; extraction and Whisper run on the configured executor.
+        
+        Returns:
+            {
+                'text': str,
+                'language': str,
+                'segments': list
+            }
+        """
+        transcription, _ = await self._transcribe_video_async(video_path)
+        return transcription
+    
+    def transcribe_clips(self, video_paths: List[str], batch_size: int = 8) -> List[Dict]:
+        """
+        Transcribe many short clips (e.g. 30-90 s snippets) in batched forward passes.
+        
+        Returns:
+            List of {'text', 'language', 'segments'} dicts, one per clip
+        """
+        clips = [self.audio_extractor.load_audio(path) for path in video_paths]
+        return self.transcriber.transcribe_batch(clips, batch_size=batch_size)
     
     def analyze_text(self, text: str) -> Dict:
         """
         Analyze pre-existing text (no video processing).
         
+        Returns:
+            {
+                'summary': str,
+                'insights': list,
+                'quiz': list,
+                'compaction' / 'digest': dict (as for ``process_video``, if they applied)
+            }
+        """
+        text, _, reports = self._analysis_input(text)
+        return dict(self.analyzer.analyze(text), **reports)
+    
+    async def analyze_text_async(self, text: str) -> Dict:
+        """
+        Async version of ``analyze_text``; the LLM requests don't block the event loop.
+        
         Returns:
             {
                 'summary': str,
@@ -173,7 +455,28 @@ class VideoAssistant:
                 'quiz': list
             }
         """
-        return self.analyzer.analyze(text)
+        text, _, reports = self._analysis_input(text)
+        return dict(await self.analyzer.analyze_async(text), **reports)
+    
+    def regenerate_section(self, result: Dict, section: str, text: str = None) -> Dict:
+        """
+        Regenerate one section ('summary', 'insights' or 'quiz') of a result, keeping the rest.
+        
+        Args:
+            result: A ``process_video`` or ``analyze_text`` result
+            section: Section to regenerate
+            text: The analyzed text (default: result['transcription'])
+        
+        Returns:
+            A copy of result with the new section. Output files are not rewritten
+        """
+        if text is None:
+            text, segments = result['transcription'], result.get('segments')
+        else:
+            segments = None
+        # Same input as the original analysis, so its cache entry is the one updated
+        text, segments, _ = self._analysis_input(text, segments)
+        return self.analyzer.regenerate_section(text, result, section, segments=segments)
     
     def generate_subtitles_from_video(self, video_path: str, output_path: str = None) -> str:
         """
@@ -182,16 +485,140 @@ class VideoAssistant:
         Returns:
             Path to SRT file
         """
-        audio_path = self.audio_extractor.extract_audio(video_path)
-        transcription = self.transcriber.transcribe(audio_path)
-        
         if not output_path:
             video_name = Path(video_path).stem
             output_path = self.output_dir / f"{video_name}_subtitles.srt"
         
-        generate_srt(transcription['segments'], str(output_path))
+        self._transcribe_video(video_path, srt_path=output_path)
         return str(output_path)
     
+    def transcribe_stream(self, video_path: str, srt_path: str = None):
+        """
+        Transcribe a video and yield segments as each 30 s window is decoded.
+        
+        Audio is streamed from ffmpeg in bounded memory. If srt_path is given,
+        subtitles are written to disk incrementally as segments arrive.
+        
+        Example:
+            for segment in assistant.transcribe_stream("lecture.mp4", "lecture.srt"):
+                print(f"[{segment['start']:.0f}s] {segment['text']}")
+        
+        Yields:
+            Segment dicts with 'start', 'end' and 'text' keys
+        """
+        windows = self.audio_extractor.stream_audio(video_path)
+        segments = self.transcriber.transcribe_stream(windows)
+        if srt_path:
+            return write_srt_stream(segments, str(srt_path))
+        return segments
+    
+    def _transcribe_video(self, video_path: str, srt_path: str = None, timings: Dict = None) -> Dict:
+        """
+        Extract audio using the configured audio mode and transcribe it.
+        
+        A cached transcription of the same video is looked up first, and on a hit
+        neither the audio nor the model is loaded. Otherwise the Whisper model
+        starts loading on a background thread, so a cold load overlaps with audio
+        decoding. If srt_path is given, SRT subtitles are written too; in
+        streaming mode they are written incrementally while transcription runs.
+        Stage durations are recorded in timings, if given.
+        """
+        timings = {} if timings is None else timings
+        cold_start = self.transcriber.model is None
+        
+        checkpoint_path = self.audio_extractor.checkpoint_path(video_path) if self.checkpoint else None
+        
+        # Parallel transcription caches by audio hash, which needs the extracted audio
+        source_key = None
+        if self.transcriber.cache and not self.parallel_workers:
+            # Moviepy WAV and ffmpeg PCM decoding may differ slightly, so they aren't shared
+            source_key = self.audio_extractor.cache_key(
+                video_path,
+                decoder="moviepy" if not (self.in_memory_audio or self.streaming_audio) else "pcm",
+                sample_rate=SAMPLE_RATE
+            )
+            if self.streaming_audio:
+                mode = "stream"
+            else:
+                mode = "transcribe-checkpointed" if checkpoint_path else "transcribe"
+            cached = self.transcriber.cached_transcription(source_key, mode)
+            if cached is not None:
+                logger.info(f"✅ Using cached transcription for {Path(video_path).name}")
+                if srt_path:
+                    generate_srt(cached['segments'], str(srt_path))
+                return cached
+        
+        # Parallel workers load their own models
+        if not self.parallel_workers:
+            self.transcriber.load_model_async()
+        
+        if self.streaming_audio:
+            stage_started = time.perf_counter()
+            windows = self.audio_extractor.stream_audio(video_path)
+            stream = self.transcriber.transcribe_stream(windows, checkpoint_path=checkpoint_path)
+            segments = list(write_srt_stream(stream, str(srt_path)) if srt_path else stream)
+            timings['transcription'] = time.perf_counter() - stage_started
+            self._record_model_load(timings, cold_start)
+            transcription = {
+                "text": "".join(segment["text"] for segment in segments).strip(),
+                "language": stream.language or "unknown",
+                "segments": segments
+            }
+            if source_key:
+                self.transcriber.cache_transcription(source_key, transcription, "stream")
+            return transcription
+        
+        # Step 1: Extract audio
+        stage_started = time.perf_counter()
+        if self.parallel_workers or self.in_memory_audio:
+            audio = self.audio_extractor.load_audio(video_path)
+        else:
+            audio = self.audio_extractor.extract_audio(video_path)
+        timings['audio_extraction'] = time.perf_counter() - stage_started
+        
+        # Step 2: Transcribe (waits for the background model load if it's still running)
+        stage_started = time.perf_counter()
+        if self.parallel_workers:
+            transcription = self.transcriber.transcribe_parallel(audio, workers=self.parallel_workers)
+        else:
+            transcription = self.transcriber.transcribe(audio, checkpoint_path=checkpoint_path, source_key=source_key)
+        timings['transcription'] = time.perf_counter() - stage_started
+        self._record_model_load(timings, cold_start)
+        
+        if srt_path:
+            generate_srt(transcription['segments'], str(srt_path))
+        return transcription
+    
+    async def _transcribe_video_async(self, video_path: str, srt_path: Path = None) -> Tuple[Dict, Dict]:
+        """Run ``_transcribe_video`` on the configured executor; returns (transcription, timings)."""
+        loop = asyncio.get_running_loop()
+        srt_path = str(srt_path) if srt_path else None
+        
+        if isinstance(self.executor, ProcessPoolExecutor):
+            return await loop.run_in_executor(
+                self.executor, _transcribe_in_process, self._transcription_settings, video_path, srt_path
+            )
+        
+        timings = {}
+        transcription = await loop.run_in_executor(
+            self.executor, self._transcribe_video, video_path, srt_path, timings
+        )
+        return transcription, timings
+    
+    def _record_model_load(self, timings: Dict, cold_start: bool):
+        """Record the model load time and how much of it overlapped audio extraction."""
+        if not cold_start or self.parallel_workers or self.transcriber.load_seconds is None:
+            return
+        
+        timings['model_load'] = self.transcriber.load_seconds
+        # The load started together with extraction, so they ran side by side
+        timings['overlap_saved'] = min(self.transcriber.load_seconds, timings.get('audio_extraction', 0.0))
+    
+    def _log_timings(self, timings: Dict):
+        """Log per-stage timings for a processed video."""
+        stages = ", ".join(f"{stage}: {seconds:.1f}s" for stage, seconds in timings.items())
+        logger.info(f"⏱️  Stage timings: {stages}")
+    
     def _embed_subtitles(self, video_path: str, srt_path: str, output_path: str):
         """Embed SRT subtitles into video using FFmpeg."""
         try:
@@ -215,6 +642,29 @@ class VideoAssistant:
         subprocess.run(cmd, check=True, capture_output=True)
 
 
+# Transcription stage of each worker process, keyed by its settings
+_PROCESS_ASSISTANTS: Dict[tuple, VideoAssistant] = {}
+
+
+def _transcribe_in_process(settings: Dict, video_path: str, srt_path: str = None) -> Tuple[Dict, Dict]:
+    """
+    Executor task for ``VideoAssistant._transcribe_video_async`` with a process pool.
+    
+    The audio extractor and Whisper model are built on the first task with given
+    settings and reused by later tasks in the same process.
+    """
+    key = tuple(sorted(settings.items()))
+    assistant = _PROCESS_ASSISTANTS.get(key)
+    if assistant is None:
+        assistant = VideoAssistant.__new__(VideoAssistant)
+        assistant._init_transcription(**settings)
+        _PROCESS_ASSISTANTS[key] = assistant
+    
+    timings = {}
+    transcription = assistant._transcribe_video(video_path, srt_path=srt_path, timings=timings)
+    return transcription, timings
+
+
 # Convenience functions for quick usage
 
 def process_video(video_path: str, **kwargs) -> Dict:
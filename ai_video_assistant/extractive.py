@@ -0,0 +1,209 @@
+"""
+Extractive pre-summarization for the AI-Powered Video Lecture Assistant.
+Ranks transcript segments with TF-IDF TextRank (sparse, vectorized NumPy) and
+keeps the most central ones, in timeline order, within a token budget, so a
+very long lecture reaches the LLM as a dense digest instead of in full.
+"""
+
+import re
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from .chunking import _text_segments, estimate_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Default digest size: leaves room for the prompt and the answer in an 8k context
+DEFAULT_DIGEST_TOKENS = 3500
+
+# TextRank damping factor and power-iteration limits
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+# Segments with fewer content words than this are never selected on their own
+MIN_CONTENT_WORDS = 3
+
+# Placed between kept segments that weren't adjacent in the lecture
+GAP_MARKER = " ... "
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before being
+below between both but by can can't could couldn't did didn't do does doesn't doing don't down during
+each few for from further get gets getting go goes going gonna got had hadn't has hasn't have haven't
+having he he'd he'll he's her here here's hers herself him himself his how how's i i'd i'll i'm i've if
+in into is isn't it it's its itself just know let's like me more most much mustn't my myself no nor
+not now of off okay on once one only or other ought our ours ourselves out over own really right same
+say see shan't she she'd she'll she's should shouldn't so some such than that that's the their theirs
+them themselves then there there's these they they'd they'll they're they've thing things think this
+those through to too um uh under until up us very want was wasn't way we we'd we'll we're we've well
+were weren't what what's when when's where where's which while who who's whom why why's will with
+won't would wouldn't yeah yes you you'd you'll you're you've your yours yourself yourselves
+""".split())
+
+_WORD_RE = re.compile(r"[a-z][a-z'-]*[a-z]|[a-z]")
+
+
+def _term_matrix(texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Sparse TF-IDF matrix of the texts, with L2-normalized rows.
+    
+    Returns:
+        (rows, cols, values, vocabulary size) in coordinate format; rows with no
+        content words have no entries
+    """
+    vocabulary: Dict[str, int] = {}
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        for word in _WORD_RE.findall(text.lower()):
+            if word not in STOPWORDS:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(word, len(vocabulary)))
+    
+    n_terms = len(vocabulary)
+    if not rows:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0), n_terms
+    
+    # Collapse repeated (row, term) pairs into counts
+    pairs, counts = np.unique(np.asarray(rows, np.int64) * n_terms + np.asarray(cols, np.int64), return_counts=True)
+    rows, cols = np.divmod(pairs, n_terms)
+    
+    document_frequency = np.bincount(cols, minlength=n_terms)
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1.0
+    values = (1.0 + np.log(counts)) * idf[cols]
+    
+    norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=len(texts)))
+    values /= norms[rows]
+    return rows, cols, values, n_terms
+
+
+def textrank_scores(texts: List[str]) -> np.ndarray:
+    """
+    TextRank centrality of each text under TF-IDF cosine similarity.
+    
+    The n x n similarity matrix S = X X^T is never built: each power iteration
+    multiplies by X^T and then X, so the cost is linear in the number of words.
+    
+    Args:
+        texts: Sentences or transcript segments
+    
+    Returns:
+        Scores summing to 1 (uniform if no two texts share a content word)
+    """
+    n = len(texts)
+    if n == 0:
+        return np.zeros(0)
+    
+    rows, cols, values, n_terms = _term_matrix(texts)
+    
+    def similarity(vector: np.ndarray) -> np.ndarray:
+        """(S - I) @ vector: cosine similarity to every other text."""
+        projected = np.bincount(cols, weights=values * vector[rows], minlength=n_terms)
+        product = np.bincount(rows, weights=values * projected[cols], minlength=n)
+        has_terms = np.bincount(rows, minlength=n) > 0
+        return product - vector * has_terms  # Rows are unit length: drop self-similarity
+    
+    degree = similarity(np.ones(n))
+    if not np.any(degree > 1e-12):
+        return np.full(n, 1.0 / n)
+    # Texts with no similar text give their weight to everyone (dangling nodes)
+    dangling = degree <= 1e-12
+    inverse_degree = np.where(dangling, 0.0, 1.0 / np.where(dangling, 1.0, degree))
+    
+    scores = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        spread = similarity(scores * inverse_degree) + scores[dangling].sum() / n
+        updated = (1 - DAMPING) / n + DAMPING * spread
+        converged = np.abs(updated - scores).sum() < TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores / scores.sum()
+
+
+def extract_digest(
+    text: str,
+    segments: Optional[List[Dict]] = None,
+    max_tokens: int = DEFAULT_DIGEST_TOKENS
+) -> Dict:
+    """
+    Keep the highest-ranked segments of a transcript within a token budget.
+    
+    Segments are ranked with TF-IDF TextRank, picked best-first while they fit
+    the budget, and returned in timeline order.
+    
+    Args:
+        text: Full transcription text (used when segments is empty)
+        segments: Whisper segments ({'start', 'end', 'text'}); sentences of the
+                  text are ranked when not given
+        max_tokens: Token budget of the digest (estimated)
+    
+    Returns:
+        {
+            'text': str (kept segments in order, '...' where segments were left out),
+            'segments': list of kept segments, each a copy with its 'index' in
+                        ``segments`` (or in the sentences of the text), so
+                        answers can be traced back to the lecture timeline,
+            'report': {
+                'original_tokens', 'digest_tokens', 'segments_total',
+                'segments_kept', 'seconds'
+            }
+        }
+    """
+    started = time.perf_counter()
+    pieces = list(enumerate(segments or []))
+    pieces = [(i, s) for i, s in pieces if s.get("text", "").strip()] or list(enumerate(_text_segments(text)))
+    positions = [i for i, _ in pieces]
+    pieces = [piece for _, piece in pieces]
+    texts = [piece["text"].strip() for piece in pieces]
+    # Each segment's share of the digest, separator included
+    tokens = np.array([estimate_tokens(t + GAP_MARKER) for t in texts], dtype=np.int64)
+    original_tokens = estimate_tokens(" ".join(texts))
+    
+    if int(tokens.sum()) <= max_tokens:
+        keep = np.arange(len(pieces))
+    else:
+        scores = textrank_scores(texts)
+        content_words = np.array([
+            sum(word not in STOPWORDS for word in _WORD_RE.findall(t.lower())) for t in texts
+        ])
+        scores[content_words < MIN_CONTENT_WORDS] = -1.0
+        
+        # Best-first while it fits; smaller segments further down can still fill gaps
+        order = np.argsort(-scores, kind="stable")
+        order = order[scores[order] >= 0]
+        fits = np.zeros(len(pieces), dtype=bool)
+        used = 0
+        for index in order:
+            if used + tokens[index] <= max_tokens:
+                fits[index] = True
+                used += tokens[index]
+        keep = np.flatnonzero(fits)
+    
+    kept = [dict(pieces[i], index=positions[i]) for i in keep]
+    parts = []
+    previous = None
+    for segment in kept:
+        if parts:
+            parts.append(GAP_MARKER if segment["index"] != previous + 1 else " ")
+        parts.append(segment["text"].strip())
+        previous = segment["index"]
+    digest = "".join(parts)
+    
+    report = {
+        "original_tokens": original_tokens,
+        "digest_tokens": estimate_tokens(digest),
+        "segments_total": len(pieces),
+        "segments_kept": len(kept),
+        "seconds": time.perf_counter() - started
+    }
+    if len(kept) < len(pieces):
+        logger.info(
+            f"📝 Extractive digest: kept {len(kept):,} of {len(pieces):,} segments, "
+            f"~{original_tokens:,} → ~{report['digest_tokens']:,} tokens ({report['seconds']:.2f}s)"
+        )
+    
+    return {"text": digest, "segments": kept, "report": report}
@@ -0,0 +1,376 @@
+"""
+Provider failover for the AI-Powered Video Lecture Assistant.
+Routes LLM requests over an ordered list of providers: a request that fails
+moves on to the next provider, a request that is slower than the provider's
+recent p95 latency is hedged with the next one (first answer wins), and a
+provider that keeps failing is skipped for a cool-down period.
+"""
+
+import math
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Latencies kept per provider and request kind
+LATENCY_WINDOW = 50
+
+# Successful requests needed before the hedge delay follows the measured p95
+MIN_LATENCY_SAMPLES = 5
+
+# Hedge delay while too few latencies are known, and the lower bound after
+DEFAULT_HEDGE_DELAY = 15.0
+MIN_HEDGE_DELAY = 1.0
+
+
+class RouteState:
+    """Latency history and circuit breaker of one provider."""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: Dict[Hashable, Deque[float]] = {}
+        self.failures = 0
+        self.open_until = 0.0
+        self.requests = 0
+        self.wins = 0
+        self.hedges = 0
+    
+    def is_open(self, now: float) -> bool:
+        """Whether the circuit is open (the provider is being skipped)."""
+        return now < self.open_until
+    
+    def percentile(self, kind: Hashable, percentile: float) -> Optional[float]:
+        """Nearest-rank latency percentile for a request kind, or None with too few samples."""
+        samples = self.latencies.get(kind)
+        if not samples or len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[max(0, math.ceil(percentile / 100 * len(ordered)) - 1)]
+
+
+class ProviderRouter:
+    """
+    Sends each request to an ordered list of routes (one per provider / model).
+    
+    The first route whose circuit is closed gets the request. If it fails, the
+    next route is tried straight away; if it hasn't answered within its hedge
+    delay, the next route gets the same request too and the first answer wins.
+    A route that fails ``failure_threshold`` times in a row is skipped for
+    ``cooldown`` seconds, then gets one trial request (half-open).
+    
+    Errors that say the answer itself was unusable (ValueError, e.g. malformed
+    JSON) don't count against a route's circuit: another request to the same
+    provider may well succeed.
+    """
+    
+    def __init__(
+        self,
+        routes: List[Any],
+        names: List[str],
+        hedge: bool = True,
+        hedge_delay: float = None,
+        hedge_percentile: float = 95.0,
+        max_hedge_delay: float = None,
+        failure_threshold: int = 3,
+        cooldown: float = 60.0
+    ):
+        """
+        Initialize the ProviderRouter.
+        
+        Args:
+            routes: Route objects passed to the request function, in priority order
+            names: Display name of each route (e.g. 'openai/gpt-4o-mini')
+            hedge: Send a slow request to the next route as well
+            hedge_delay: Fixed hedge delay in seconds (default: the route's recent
+                         latency percentile for the same kind of request)
+            hedge_percentile: Latency percentile used as the hedge delay
+            max_hedge_delay: Upper bound for the hedge delay (e.g. the request timeout)
+            failure_threshold: Consecutive failures that open a route's circuit
+            cooldown: Seconds an open circuit skips its route
+        """
+        if len(routes) != len(names):
+            raise ValueError("Every route needs a name")
+        self.routes = list(routes)
+        self.states = [RouteState(name) for name in names]
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self.max_hedge_delay = max_hedge_delay
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+    
+    def _candidates(self) -> List[int]:
+        """Route indices to try, in order: closed circuits first, then open ones by reopening time."""
+        now = time.time()
+        with self._lock:
+            closed = [i for i, state in enumerate(self.states) if not state.is_open(now)]
+            skipped = sorted((i for i in range(len(self.states)) if i not in closed), key=lambda i: self.states[i].open_until)
+        
+        if skipped:
+            logger.info(f"⚡ Skipping circuit-broken provider(s): {', '.join(self.states[i].name for i in skipped)}")
+        # With every circuit open, still try the one that reopens first rather than fail outright
+        return closed or skipped[:1]
+    
+    def _hedge_delay(self, index: int, kind: Hashable) -> float:
+        """Seconds to wait for a route before hedging its request."""
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        
+        with self._lock:
+            delay = self.states[index].percentile(kind, self.hedge_percentile)
+        delay = DEFAULT_HEDGE_DELAY if delay is None else max(delay, MIN_HEDGE_DELAY)
+        if self.max_hedge_delay is not None:
+            delay = min(delay, self.max_hedge_delay)
+        return delay
+    
+    def _record_success(self, index: int, kind: Hashable, seconds: float):
+        """Note a successful request: its latency, and a closed circuit."""
+        with self._lock:
+            state = self.states[index]
+            state.latencies.setdefault(kind, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+            if state.failures >= self.failure_threshold:
+                logger.info(f"✅ Provider {state.name} recovered, circuit closed")
+            state.failures = 0
+            state.open_until = 0.0
+    
+    def _record_failure(self, index: int, error: Exception):
+        """Note a failed request, opening the route's circuit after too many in a row."""
+        if isinstance(error, ValueError):
+            return  # The provider answered; the answer was unusable
+        
+        with self._lock:
+            state = self.states[index]
+            state.failures += 1
+            if state.failures >= self.failure_threshold:
+                state.open_until = time.time() + self.cooldown
+                logger.warning(
+                    f"⚡ Provider {state.name} failed {state.failures} times in a row, "
+                    f"skipping it for {self.cooldown:.0f}s"
+                )
+    
+    def _timed(
+        self,
+        index: int,
+        request: Callable[[Any, threading.Event], Any],
+        kind: Hashable,
+        cancelled: threading.Event
+    ) -> Any:
+        """Run a request on one route, recording the outcome."""
+        with self._lock:
+            self.states[index].requests += 1
+        started = time.perf_counter()
+        try:
+            result = request(self.routes[index], cancelled)
+        except Exception as e:
+            # Lost a hedge race and was abandoned: neither a success nor a failure
+            if not cancelled.is_set():
+                self._record_failure(index, e)
+            raise
+        self._record_success(index, kind, time.perf_counter() - started)
+        return result
+    
+    async def _timed_async(self, index: int, request: Callable[[Any], Awaitable[Any]], kind: Hashable) -> Any:
+        """Async version of ``_timed``."""
+        with self._lock:
+            self.states[index].requests += 1
+        started = time.perf_counter()
+        try:
+            result = await request(self.routes[index])
+        except asyncio.CancelledError:
+            raise  # Lost a hedge race: neither a success nor a failure
+        except Exception as e:
+            self._record_failure(index, e)
+            raise
+        self._record_success(index, kind, time.perf_counter() - started)
+        return result
+    
+    def _won(self, index: int, hedged: bool) -> Tuple[Any, str]:
+        """Count a win; returns (route, name)."""
+        with self._lock:
+            state = self.states[index]
+            state.wins += 1
+        if hedged or index:
+            logger.info(f"🏁 Answer taken from {state.name}")
+        return self.routes[index], state.name
+    
+    def _log_hedge(self, index: int, next_index: int, delay: float):
+        """Count and log a hedged request."""
+        with self._lock:
+            self.states[next_index].hedges += 1
+        logger.info(
+            f"🏁 {self.states[index].name} hasn't answered after {delay:.1f}s, "
+            f"hedging with {self.states[next_index].name}"
+        )
+    
+    def _log_failover(self, index: int, error: Exception, next_index: Optional[int]):
+        """Log a failed request and where it goes next."""
+        if next_index is None:
+            logger.warning(f"⚠️  {self.states[index].name} failed: {error}")
+        else:
+            logger.warning(f"⚠️  {self.states[index].name} failed ({error}), failing over to {self.states[next_index].name}")
+    
+    @staticmethod
+    def _final_error(errors: List[Exception]) -> Exception:
+        """The exception raised once every route has failed."""
+        # Unusable answers are raised as they are, so the caller can request again
+        if len(errors) == 1 or isinstance(errors[-1], ValueError):
+            return errors[-1]
+        return Exception(f"All providers failed: {'; '.join(str(error) for error in errors)}")
+    
+    def call(
+        self,
+        request: Callable[[Any, threading.Event], Any],
+        kind: Hashable = None,
+        hedge: bool = True
+    ) -> Tuple[Any, Any, str]:
+        """
+        Send a request, failing over and hedging across routes.
+        
+        Hedged requests run on worker threads. Threads can't be interrupted, so
+        a request that loses the race is told to stop through its ``cancelled``
+        event and is left to wind down in the background.
+        
+        Args:
+            request: ``request(route, cancelled) -> result``; raises on failure.
+                     ``cancelled`` is a threading.Event set once another route's
+                     answer has won: the request should stop waiting or reading,
+                     release what it holds and raise. It must not write shared
+                     state such as per-call stats, which would race the winner
+            kind: Requests of the same kind share latency statistics (e.g. the
+                  output token limit, since it drives generation time)
+            hedge: Allow hedging for this request (e.g. not when streamed fields
+                   are reported through a callback)
+        
+        Returns:
+            (result, route that produced it, route name)
+        """
+        candidates = self._candidates()
+        hedge = hedge and self.hedge
+        pool = ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix="provider")
+        pending = {}
+        cancel_events = {}
+        errors = []
+        launched = 0
+        
+        def launch():
+            nonlocal launched
+            index = candidates[launched]
+            cancelled = threading.Event()
+            future = pool.submit(self._timed, index, request, kind, cancelled)
+            pending[future] = index
+            cancel_events[future] = cancelled
+            launched += 1
+        
+        try:
+            launch()
+            while pending:
+                can_hedge = hedge and launched < len(candidates)
+                delay = self._hedge_delay(candidates[launched - 1], kind) if can_hedge else None
+                done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+                
+                if not done:
+                    self._log_hedge(candidates[launched - 1], candidates[launched], delay)
+                    launch()
+                    continue
+                
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        errors.append(e)
+                        next_index = candidates[launched] if not pending and launched < len(candidates) else None
+                        self._log_failover(index, e, next_index)
+                        if next_index is not None:
+                            launch()
+                        continue
+                    route, name = self._won(index, launched > 1)
+                    return result, route, name
+            
+            raise self._final_error(errors)
+        finally:
+            for future in pending:
+                cancel_events[future].set()
+            pool.shutdown(wait=False)
+    
+    async def call_async(
+        self,
+        request: Callable[[Any], Awaitable[Any]],
+        kind: Hashable = None,
+        hedge: bool = True
+    ) -> Tuple[Any, Any, str]:
+        """
+        Async version of ``call``: ``request(route)`` returns an awaitable, and
+        the requests that lose a hedge race are cancelled.
+        """
+        candidates = self._candidates()
+        hedge = hedge and self.hedge
+        pending = {}
+        errors = []
+        launched = 0
+        
+        def launch():
+            nonlocal launched
+            index = candidates[launched]
+            pending[asyncio.ensure_future(self._timed_async(index, request, kind))] = index
+            launched += 1
+        
+        try:
+            launch()
+            while pending:
+                can_hedge = hedge and launched < len(candidates)
+                delay = self._hedge_delay(candidates[launched - 1], kind) if can_hedge else None
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                
+                if not done:
+                    self._log_hedge(candidates[launched - 1], candidates[launched], delay)
+                    launch()
+                    continue
+                
+                for task in done:
+                    index = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        errors.append(e)
+                        next_index = candidates[launched] if not pending and launched < len(candidates) else None
+                        self._log_failover(index, e, next_index)
+                        if next_index is not None:
+                            launch()
+                        continue
+                    route, name = self._won(index, launched > 1)
+                    return result, route, name
+            
+            raise self._final_error(errors)
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Per-route counters and state.
+        
+        Returns:
+            {name: {'requests', 'wins', 'hedges', 'failures', 'circuit_open',
+            'p95' (per request kind, None until enough samples)}}
+        """
+        now = time.time()
+        with self._lock:
+            return {
+                state.name: {
+                    "requests": state.requests,
+                    "wins": state.wins,
+                    "hedges": state.hedges,
+                    "failures": state.failures,
+                    "circuit_open": state.is_open(now),
+                    "p95": {kind: state.percentile(kind, 95.0) for kind in state.latencies}
+                }
+                for state in self.states
+            }
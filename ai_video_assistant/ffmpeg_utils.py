@@ -83,6 +83,32 @@ def setup_ffmpeg():
     except Exception as e:
         raise RuntimeError(f"Error setting up ffmpeg: {e}")
 
+_FFMPEG_EXE = None
+
+def get_ffmpeg_exe():
+    """
+    Resolve the ffmpeg executable to invoke directly (e.g. for piping audio).
+    
+    Prefers the system ffmpeg and falls back to imageio_ffmpeg's bundled binary.
+    The result is cached for the lifetime of the process.
+    
+    Returns:
+        str: Path to ffmpeg executable
+    
+    Raises:
+        RuntimeError: If ffmpeg cannot be found
+    """
+    global _FFMPEG_EXE
+    if _FFMPEG_EXE is None:
+        _FFMPEG_EXE = check_system_ffmpeg()
+        if _FFMPEG_EXE is None:
+            try:
+                import imageio_ffmpeg
+                _FFMPEG_EXE = imageio_ffmpeg.get_ffmpeg_exe()
+            except ImportError:
+                _raise_ffmpeg_not_found(platform.system())
+    return _FFMPEG_EXE
+
 def _raise_ffmpeg_not_found(system):
     """
     Raise a helpful error message with platform-specific installation instructions.
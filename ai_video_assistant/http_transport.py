@@ -0,0 +1,525 @@
+"""
+Shared HTTP transport for the AI-Powered Video Lecture Assistant.
+Keeps one pooled keep-alive requests.Session per base URL, caps concurrent
+requests per provider, holds requests back to the provider's rate limit and
+retries 429/5xx responses with exponential backoff and jitter (or as long as
+Retry-After says, up to a limit), so analyzers don't pay a TCP/TLS handshake
+on every call.
+AsyncHTTPTransport does the same on an asyncio event loop using httpx.
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .rate_limit import get_rate_limiter, retry_after_seconds
+
+try:
+    import httpx
+except ImportError:  # Optional: only needed for non-blocking async analysis
+    httpx = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable via environment
+DEFAULT_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("HTTP_MAX_CONCURRENCY", "8"))
+# Longest Retry-After honoured; a response asking for more is returned instead
+# of retried, so the caller can fail over rather than block a worker
+DEFAULT_MAX_RETRY_AFTER = float(os.getenv("HTTP_MAX_RETRY_AFTER", "60"))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# How often a cancellable request waiting for a concurrency slot checks its event
+SLOT_POLL_SECONDS = 0.1
+
+
+class RequestCancelled(Exception):
+    """A request was abandoned through its ``cancelled`` event (e.g. it lost a hedge race)."""
+
+
+def _check_cancelled(cancelled: Optional[threading.Event], provider: str):
+    """Raise RequestCancelled if the request's event is set."""
+    if cancelled is not None and cancelled.is_set():
+        raise RequestCancelled(f"{provider} request abandoned")
+
+
+class BaseHTTPTransport:
+    """Pool, concurrency and retry settings shared by the sync and async transports."""
+    
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_retry_after: float = DEFAULT_MAX_RETRY_AFTER
+    ):
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+    
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff: uniform in [0, min(max, base * 2**attempt)]."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+    
+    def retry_delay(self, response, attempt: int, provider: str = None) -> Optional[float]:
+        """
+        Seconds to wait before retrying: the response's Retry-After if it has one, else backoff.
+        
+        Returns None (don't retry) if Retry-After asks for more than ``max_retry_after``.
+        """
+        retry_after = retry_after_seconds(response.headers)
+        if retry_after is None:
+            return self.backoff_delay(attempt)
+        if retry_after > self.max_retry_after:
+            logger.warning(
+                f"⚠️  {provider or 'Server'} asked to retry in {retry_after:.0f}s, "
+                f"over the {self.max_retry_after:.0f}s limit: not retrying"
+            )
+            return None
+        return retry_after
+    
+    def pause_seconds(self, response) -> Optional[float]:
+        """How long a 429 response pauses its provider: Retry-After, at most ``max_retry_after``."""
+        retry_after = retry_after_seconds(response.headers)
+        return None if retry_after is None else min(retry_after, self.max_retry_after)
+
+
+class HTTPTransport(BaseHTTPTransport):
+    """
+    Pooled HTTP client shared by the content analyzers.
+    
+    Sessions are keyed by scheme and host, so every request to the same
+    endpoint reuses warm connections. Each provider gets a semaphore that
+    bounds how many of its requests are in flight at once.
+    """
+    
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_retry_after: float = DEFAULT_MAX_RETRY_AFTER
+    ):
+        """
+        Initialize the HTTPTransport.
+        
+        Args:
+            pool_size: Keep-alive connections kept per base URL
+            max_concurrency: Default limit on in-flight requests per provider
+            max_retries: Retries for 429/5xx responses before giving up
+            backoff_base: First backoff delay in seconds (doubled on each retry)
+            backoff_max: Upper bound for a single backoff delay in seconds
+            max_retry_after: Longest Retry-After waited for; a response asking
+                             for more is returned without retrying
+        """
+        super().__init__(pool_size, max_concurrency, max_retries, backoff_base, backoff_max, max_retry_after)
+        
+        self._sessions: Dict[str, requests.Session] = {}
+        self._limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+    
+    def session(self, url: str) -> requests.Session:
+        """Return the pooled session for the base URL of ``url``, creating it on first use."""
+        parts = urlsplit(url)
+        base_url = f"{parts.scheme}://{parts.netloc}"
+        
+        with self._lock:
+            session = self._sessions.get(base_url)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount(base_url, adapter)
+                self._sessions[base_url] = session
+            return session
+    
+    def set_concurrency(self, provider: str, limit: int):
+        """Limit how many requests to ``provider`` may be in flight at once."""
+        with self._lock:
+            self._limits[provider] = threading.BoundedSemaphore(limit)
+    
+    @contextmanager
+    def _slot(self, provider: str, cancelled: Optional[threading.Event] = None):
+        """Hold one of the provider's concurrency slots (stop waiting for it if cancelled)."""
+        with self._lock:
+            semaphore = self._limits.get(provider)
+            if semaphore is None:
+                semaphore = self._limits[provider] = threading.BoundedSemaphore(self.max_concurrency)
+        
+        while not semaphore.acquire(timeout=SLOT_POLL_SECONDS if cancelled is not None else None):
+            _check_cancelled(cancelled, provider)
+        try:
+            yield
+        finally:
+            semaphore.release()
+    
+    @staticmethod
+    def _sleep(delay: float, cancelled: Optional[threading.Event], provider: str):
+        """Back off before a retry, unless the request is cancelled meanwhile."""
+        if cancelled is None:
+            time.sleep(delay)
+        elif cancelled.wait(delay):
+            raise RequestCancelled(f"{provider} request abandoned")
+    
+    def request(
+        self,
+        method: str,
+        url: str,
+        provider: str = None,
+        max_retries: int = None,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        tokens: int = 0,
+        cancelled: Optional[threading.Event] = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Send a request over the pooled session, retrying rate-limit and server errors.
+        
+        The request first waits for the provider's rate limit (see
+        ``rate_limit.set_rate_limit``). Connection errors and timeouts are raised
+        straight away; only responses with a retryable status are retried, after
+        the Retry-After time if the response gives one (a response asking for more
+        than ``max_retry_after`` seconds is returned as is). A 429 pauses every
+        queued request to the provider. The concurrency slot is released while waiting.
+        
+        Args:
+            method: HTTP method
+            url: Full request URL
+            provider: Concurrency and rate-limit key (default: the URL's host)
+            max_retries: Override the transport's retry count
+            retry_statuses: Status codes that trigger a retry
+            tokens: Estimated tokens of the request, for the tokens-per-minute limit
+            cancelled: Abandon the request once this event is set: it stops waiting
+                       for the rate limit, a concurrency slot or a retry, and a
+                       response that arrives afterwards is closed unread
+            **kwargs: Passed on to ``requests.Session.request``
+        
+        Returns:
+            The final response (its status is not checked)
+        
+        Raises:
+            RequestCancelled: If ``cancelled`` was set
+        """
+        provider = provider or urlsplit(url).netloc
+        max_retries = self.max_retries if max_retries is None else max_retries
+        session = self.session(url)
+        limiter = get_rate_limiter(provider)
+        
+        attempt = 0
+        while True:
+            if not limiter.acquire(tokens, cancelled):
+                raise RequestCancelled(f"{provider} request abandoned")
+            with self._slot(provider, cancelled):
+                response = session.request(method, url, **kwargs)
+            
+            if response.status_code == 429:
+                limiter.throttled(self.pause_seconds(response), tokens)
+            if cancelled is not None and cancelled.is_set():
+                response.close()
+                raise RequestCancelled(f"{provider} request abandoned")
+            if response.status_code not in retry_statuses or attempt >= max_retries:
+                return response
+            
+            delay = self.retry_delay(response, attempt, provider)
+            if delay is None:
+                return response
+            logger.warning(
+                f"⚠️  {provider} returned {response.status_code}, "
+                f"retrying in {delay:.1f}s ({attempt + 1}/{max_retries})"
+            )
+            response.close()
+            self._sleep(delay, cancelled, provider)
+            attempt += 1
+    
+    @contextmanager
+    def stream(
+        self,
+        method: str,
+        url: str,
+        provider: str = None,
+        max_retries: int = None,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        tokens: int = 0,
+        cancelled: Optional[threading.Event] = None,
+        **kwargs
+    ):
+        """
+        Like ``request``, but for streamed responses: yields the response with its
+        body unread, and holds the provider's concurrency slot until the caller
+        is done reading it. A caller passing ``cancelled`` should also check it
+        while reading.
+        
+        Usage:
+            with transport.stream("POST", url, json=payload) as response:
+                for line in response.iter_lines():
+                    ...
+        """
+        provider = provider or urlsplit(url).netloc
+        max_retries = self.max_retries if max_retries is None else max_retries
+        session = self.session(url)
+        limiter = get_rate_limiter(provider)
+        
+        attempt = 0
+        while True:
+            if not limiter.acquire(tokens, cancelled):
+                raise RequestCancelled(f"{provider} request abandoned")
+            with self._slot(provider, cancelled):
+                response = session.request(method, url, stream=True, **kwargs)
+                
+                if response.status_code == 429:
+                    limiter.throttled(self.pause_seconds(response), tokens)
+                if cancelled is not None and cancelled.is_set():
+                    response.close()
+                    raise RequestCancelled(f"{provider} request abandoned")
+                retry = response.status_code in retry_statuses and attempt < max_retries
+                delay = self.retry_delay(response, attempt, provider) if retry else None
+                if delay is None:
+                    try:
+                        yield response
+                    finally:
+                        response.close()
+                    return
+                
+                response.close()
+            
+            logger.warning(
+                f"⚠️  {provider} returned {response.status_code}, "
+                f"retrying in {delay:.1f}s ({attempt + 1}/{max_retries})"
+            )
+            self._sleep(delay, cancelled, provider)
+            attempt += 1
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request (see ``request``)."""
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request (see ``request``)."""
+        return self.request("POST", url, **kwargs)
+    
+    def close(self):
+        """Close every pooled session."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+class AsyncHTTPTransport(BaseHTTPTransport):
+    """
+    Non-blocking counterpart of HTTPTransport for asyncio code (requires httpx).
+    
+    httpx clients and asyncio semaphores belong to one event loop, so each
+    running loop gets its own pooled clients and provider limits.
+    """
+    
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_retry_after: float = DEFAULT_MAX_RETRY_AFTER
+    ):
+        """
+        Initialize the AsyncHTTPTransport.
+        
+        Args:
+            pool_size: Keep-alive connections kept per base URL
+            max_concurrency: Limit on in-flight requests per provider
+            max_retries: Retries for 429/5xx responses before giving up
+            backoff_base: First backoff delay in seconds (doubled on each retry)
+            backoff_max: Upper bound for a single backoff delay in seconds
+            max_retry_after: Longest Retry-After waited for; a response asking
+                             for more is returned without retrying
+        
+        Raises:
+            ImportError: If httpx is not installed
+        """
+        if httpx is None:
+            raise ImportError("AsyncHTTPTransport requires httpx: pip install httpx")
+        
+        super().__init__(pool_size, max_concurrency, max_retries, backoff_base, backoff_max, max_retry_after)
+        
+        self._loops: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    
+    def _loop_state(self) -> Dict:
+        """Clients and semaphores of the running event loop."""
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = {"clients": {}, "limits": {}}
+        return state
+    
+    def client(self, url: str) -> "httpx.AsyncClient":
+        """Return the pooled client for the base URL of ``url`` on the running loop."""
+        parts = urlsplit(url)
+        base_url = f"{parts.scheme}://{parts.netloc}"
+        
+        clients = self._loop_state()["clients"]
+        client = clients.get(base_url)
+        if client is None:
+            limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            client = clients[base_url] = httpx.AsyncClient(limits=limits)
+        return client
+    
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        """The running loop's concurrency limit for ``provider``."""
+        limits = self._loop_state()["limits"]
+        semaphore = limits.get(provider)
+        if semaphore is None:
+            semaphore = limits[provider] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+    
+    async def _backoff(self, provider: str, response: "httpx.Response", delay: float, attempt: int, max_retries: int):
+        """Log and sleep before the next retry."""
+        logger.warning(
+            f"⚠️  {provider} returned {response.status_code}, retrying in {delay:.1f}s ({attempt + 1}/{max_retries})"
+        )
+        await asyncio.sleep(delay)
+    
+    async def request(
+        self,
+        method: str,
+        url: str,
+        provider: str = None,
+        max_retries: int = None,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        tokens: int = 0,
+        **kwargs
+    ) -> "httpx.Response":
+        """
+        Send a request, waiting for the rate limit and retrying rate-limit and
+        server errors (see HTTPTransport.request).
+        
+        Args:
+            method: HTTP method
+            url: Full request URL
+            provider: Concurrency and rate-limit key (default: the URL's host)
+            max_retries: Override the transport's retry count
+            retry_statuses: Status codes that trigger a retry
+            tokens: Estimated tokens of the request, for the tokens-per-minute limit
+            **kwargs: Passed on to ``httpx.AsyncClient.request``
+        
+        Returns:
+            The final response (its status is not checked)
+        """
+        provider = provider or urlsplit(url).netloc
+        max_retries = self.max_retries if max_retries is None else max_retries
+        client = self.client(url)
+        limiter = get_rate_limiter(provider)
+        
+        attempt = 0
+        while True:
+            await limiter.acquire_async(tokens)
+            async with self._semaphore(provider):
+                response = await client.request(method, url, **kwargs)
+            
+            if response.status_code == 429:
+                limiter.throttled(self.pause_seconds(response), tokens)
+            if response.status_code not in retry_statuses or attempt >= max_retries:
+                return response
+            
+            delay = self.retry_delay(response, attempt, provider)
+            if delay is None:
+                return response
+            await self._backoff(provider, response, delay, attempt, max_retries)
+            attempt += 1
+    
+    async def post(self, url: str, **kwargs) -> "httpx.Response":
+        """Send a POST request (see ``request``)."""
+        return await self.request("POST", url, **kwargs)
+    
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        provider: str = None,
+        max_retries: int = None,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        tokens: int = 0,
+        **kwargs
+    ):
+        """
+        Yield a streamed response with its body unread, holding the provider's
+        concurrency slot until the caller is done reading it.
+        """
+        provider = provider or urlsplit(url).netloc
+        max_retries = self.max_retries if max_retries is None else max_retries
+        client = self.client(url)
+        limiter = get_rate_limiter(provider)
+        
+        attempt = 0
+        while True:
+            await limiter.acquire_async(tokens)
+            async with self._semaphore(provider):
+                request = client.build_request(method, url, **kwargs)
+                response = await client.send(request, stream=True)
+                
+                if response.status_code == 429:
+                    limiter.throttled(self.pause_seconds(response), tokens)
+                retry = response.status_code in retry_statuses and attempt < max_retries
+                delay = self.retry_delay(response, attempt, provider) if retry else None
+                if delay is None:
+                    try:
+                        yield response
+                    finally:
+                        await response.aclose()
+                    return
+                
+                await response.aclose()
+            
+            await self._backoff(provider, response, delay, attempt, max_retries)
+            attempt += 1
+    
+    async def aclose(self):
+        """Close the running loop's pooled clients."""
+        clients = self._loop_state()["clients"]
+        for client in clients.values():
+            await client.aclose()
+        clients.clear()
+
+
+_TRANSPORT = HTTPTransport()
+_ASYNC_TRANSPORT = None
+
+
+def get_transport() -> HTTPTransport:
+    """Return the process-wide HTTP transport."""
+    return _TRANSPORT
+
+
+def get_async_transport():
+    """
+    Return the process-wide async HTTP transport.
+    
+    Returns:
+        The AsyncHTTPTransport, or None if httpx is not installed (callers then
+        fall back to running the blocking transport in a thread)
+    """
+    global _ASYNC_TRANSPORT
+    if httpx is None:
+        return None
+    if _ASYNC_TRANSPORT is None:
+        _ASYNC_TRANSPORT = AsyncHTTPTransport()
+    return _ASYNC_TRANSPORT
@@ -0,0 +1,308 @@
+"""
+JSON helpers for the AI-Powered Video Lecture Assistant.
+Pulls the JSON object out of free-form LLM responses, either all at once or
+incrementally while a response is streamed, and repairs the malformed JSON
+models commonly produce.
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, List, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Python literals models sometimes write instead of JSON ones
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def extract_json(response_text: str) -> Dict:
+    """
+    Parse the JSON object in an LLM response.
+    
+    Handles responses wrapped in markdown code blocks or surrounded by prose.
+    
+    Args:
+        response_text: Raw model output
+    
+    Returns:
+        The parsed object
+    
+    Raises:
+        json.JSONDecodeError: If no valid JSON object is found
+    """
+    response_text = response_text.strip()
+    
+    # Sometimes the model might wrap JSON in markdown code blocks
+    if "```json" in response_text:
+        response_text = response_text.split("```json")[1].split("```")[0].strip()
+    elif "```" in response_text:
+        response_text = response_text.split("```")[1].split("```")[0].strip()
+    
+    # Find the first { and last } to extract JSON
+    start_idx = response_text.find("{")
+    end_idx = response_text.rfind("}") + 1
+    
+    if start_idx != -1 and end_idx > start_idx:
+        response_text = response_text[start_idx:end_idx]
+    
+    return json.loads(response_text)
+
+
+def repair_json(response_text: str) -> Dict:
+    """
+    Best-effort parse of a malformed or truncated JSON object.
+    
+    Fixes what models commonly get wrong: prose or code fences around the
+    object, comments, trailing commas, single-quoted strings, raw newlines in
+    strings, Python literals (True/False/None), mismatched closing brackets and
+    output cut off before the end (the last incomplete member is dropped and
+    open brackets are closed).
+    
+    Args:
+        response_text: Raw model output
+    
+    Returns:
+        The parsed object
+    
+    Raises:
+        json.JSONDecodeError: If nothing parseable remains
+    """
+    start = response_text.find("{")
+    if start == -1:
+        raise json.JSONDecodeError("No JSON object found", response_text, 0)
+    
+    out: List[str] = []
+    stack: List[str] = []
+    safe = None  # (output length, open brackets) after the last complete member
+    quote = None
+    escape = False
+    i = start
+    
+    while i < len(response_text):
+        char = response_text[i]
+        i += 1
+        
+        if quote:
+            if escape:
+                escape = False
+                if char == "'":
+                    out[-1] = "'"  # \' is not a JSON escape
+                    continue
+                out.append(char)
+            elif char == "\\":
+                escape = True
+                out.append(char)
+            elif char == quote:
+                quote = None
+                out.append('"')
+            elif char == '"':
+                out.append('\\"')  # Double quote inside a single-quoted string
+            elif char in "\n\r\t":
+                out.append({"\n": "\\n", "\r": "\\r", "\t": "\\t"}[char])
+            else:
+                out.append(char)
+            continue
+        
+        if char in "\"'":
+            quote = char
+            out.append('"')
+        elif char in "{[":
+            stack.append(char)
+            out.append(char)
+        elif char in "}]":
+            _drop_trailing_comma(out)
+            opener = stack.pop()
+            out.append("}" if opener == "{" else "]")
+            if not stack:
+                break  # Ignore anything after the object
+            safe = (len(out), list(stack))
+        elif char == ",":
+            _drop_trailing_comma(out)
+            safe = (len(out), list(stack))
+            out.append(char)
+        elif char == "/" and response_text[i:i + 1] in ("/", "*"):
+            # Comment: skip to the end of the line / block
+            end = "\n" if response_text[i] == "/" else "*/"
+            found = response_text.find(end, i + 1)
+            i = len(response_text) if found == -1 else found + len(end)
+        elif char.isalpha():
+            word_end = i
+            while word_end < len(response_text) and response_text[word_end].isalpha():
+                word_end += 1
+            word = char + response_text[i:word_end]
+            if response_text[word_end:].lstrip().startswith(":"):
+                out.append(json.dumps(word))  # Unquoted key
+            else:
+                out.append(_LITERALS.get(word, word))
+            i = word_end
+        else:
+            out.append(char)
+    
+    if not stack:
+        return json.loads("".join(out))
+    
+    # Truncated: close what's open, or fall back to the last complete member
+    if quote:
+        if escape:
+            out.pop()
+        out.append('"')
+    try:
+        return json.loads(_close("".join(out), stack))
+    except json.JSONDecodeError:
+        if safe is None:
+            raise
+        length, open_brackets = safe
+        return json.loads(_close("".join(out[:length]), open_brackets))
+
+
+def _drop_trailing_comma(out: List[str]):
+    """Remove a comma (and whitespace after it) at the end of the repaired output."""
+    end = len(out)
+    while end and out[end - 1].isspace():
+        end -= 1
+    if end and out[end - 1] == ",":
+        del out[end - 1:]
+
+
+def _close(text: str, stack: List[str]) -> str:
+    """Close the open brackets of truncated JSON text."""
+    text = text.rstrip().rstrip(",:")
+    return text + "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+
+
+def parse_llm_json(response_text: str) -> Tuple[Dict, bool]:
+    """
+    Parse the JSON object in an LLM response, repairing it if needed.
+    
+    Args:
+        response_text: Raw model output
+    
+    Returns:
+        (parsed object, whether it had to be repaired)
+    
+    Raises:
+        json.JSONDecodeError: If the response can't be parsed even after repair
+    """
+    try:
+        return extract_json(response_text), False
+    except json.JSONDecodeError as e:
+        result = repair_json(response_text)
+        logger.warning(f"🔧 Repaired malformed JSON response ({e.msg})")
+        return result, True
+
+
+class MalformedJSONError(ValueError):
+    """Raised by IncrementalJSONParser as soon as the streamed text can't be valid JSON."""
+
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for a JSON object streamed token by token.
+    
+    Text before the opening brace (prose, a ```json fence) is skipped. Every
+    top-level field is parsed as soon as its value is complete and reported
+    through ``on_field``, so e.g. the summary is available long before the quiz
+    has been generated. Text that can't be part of a valid object raises
+    MalformedJSONError right away instead of after the full response.
+    """
+    
+    # Characters allowed outside strings (numbers, true/false/null, separators)
+    _BARE_CHARS = set(" \t\r\n:-+.0123456789eEtrufalsn")
+    _CLOSERS = {"}": "{", "]": "["}
+    
+    def __init__(self, on_field: Callable[[str, Any], None] = None, max_preamble: int = 1000):
+        """
+        Initialize the IncrementalJSONParser.
+        
+        Args:
+            on_field: Called with (key, value) for each completed top-level field
+            max_preamble: Characters tolerated before the opening brace
+        """
+        self.on_field = on_field
+        self.max_preamble = max_preamble
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        
+        self._preamble = 0
+        self._buf = []  # Characters from the opening brace on
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._member_start = 1
+    
+    def feed(self, text: str):
+        """
+        Consume the next piece of streamed text.
+        
+        Raises:
+            MalformedJSONError: If the text can't continue a valid JSON object
+        """
+        for char in text:
+            if self.done:
+                return
+            
+            if not self._stack:
+                if char == "{":
+                    self._stack.append("{")
+                    self._buf.append(char)
+                    continue
+                self._preamble += 1
+                if self._preamble > self.max_preamble:
+                    raise MalformedJSONError(f"No JSON object in the first {self.max_preamble} characters")
+                continue
+            
+            self._buf.append(char)
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._stack.append(char)
+            elif char in "}]":
+                if self._stack[-1] != self._CLOSERS[char]:
+                    raise MalformedJSONError(f"Unexpected '{char}' at offset {len(self._buf) - 1}")
+                self._stack.pop()
+                if not self._stack:
+                    self._end_member(len(self._buf) - 1)
+                    self.done = True
+            elif char == "," and len(self._stack) == 1:
+                self._end_member(len(self._buf) - 1)
+            elif char not in self._BARE_CHARS and char != ",":
+                raise MalformedJSONError(f"Unexpected '{char}' at offset {len(self._buf) - 1}")
+    
+    def _end_member(self, end: int):
+        """Parse the top-level member that ends at ``end`` and report it."""
+        member = "".join(self._buf[self._member_start:end]).strip()
+        self._member_start = end + 1
+        if not member:
+            return
+        
+        try:
+            parsed = json.loads("{" + member + "}", strict=False)
+        except json.JSONDecodeError as e:
+            raise MalformedJSONError(f"Invalid field {member[:40]!r}...: {e.msg}")
+        
+        for key, value in parsed.items():
+            self.fields[key] = value
+            if self.on_field:
+                self.on_field(key, value)
+    
+    def result(self) -> Dict:
+        """
+        Return the parsed object.
+        
+        Raises:
+            MalformedJSONError: If the stream ended before the object was complete
+        """
+        if not self.done:
+            raise MalformedJSONError("Response ended before the JSON object was complete")
+        return dict(self.fields)
@@ -0,0 +1,180 @@
+"""
+Process-wide Whisper model registry for the AI-Powered Video Lecture Assistant.
+Keeps loaded models warm across AudioTranscriber / VideoAssistant instances so
+repeated calls in one process don't pay the load cost again.
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Default memory budget for cached models, overridable via environment
+DEFAULT_MEMORY_BUDGET_MB = int(os.getenv("WHISPER_MODEL_BUDGET_MB", "4096"))
+
+ModelKey = Tuple[str, str, str]
+
+
+def _model_bytes(model) -> int:
+    """Estimate the memory held by a model's weights (including packed int8 weights)."""
+    total = 0
+    for value in model.state_dict().values():
+        tensors = value if isinstance(value, tuple) else (value,)
+        total += sum(t.numel() * t.element_size() for t in tensors if hasattr(t, "element_size"))
+    return total
+
+
+def _load_whisper_model(model_size: str, device: str, dtype: str):
+    """Load a Whisper model with the given weight dtype ('fp32' or CPU-only 'int8')."""
+    if dtype == "int8":
+        from .quantization import load_quantized_model
+        return load_quantized_model(model_size)
+    
+    import whisper
+    return whisper.load_model(model_size, device=device)
+
+
+class _Entry:
+    """A loaded model with its reference count and estimated size."""
+    
+    def __init__(self, model, nbytes: int):
+        self.model = model
+        self.nbytes = nbytes
+        self.refs = 0
+
+
+class ModelRegistry:
+    """
+    Reference-counted cache of loaded Whisper models.
+    
+    Models are keyed by (model size, device, weight dtype). A model stays loaded
+    while any transcriber holds a reference, and after the last release it is
+    kept warm until the memory budget forces least-recently-used eviction.
+    """
+    
+    def __init__(self, memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB):
+        """
+        Initialize the ModelRegistry.
+        
+        Args:
+            memory_budget_mb: Total size of loaded models to aim for. Unreferenced
+                              models are evicted (oldest first) once it is exceeded
+        """
+        self.memory_budget_bytes = memory_budget_mb * 1024 * 1024
+        self._entries: "OrderedDict[ModelKey, _Entry]" = OrderedDict()
+        self._key_locks: Dict[ModelKey, threading.Lock] = {}
+        self._lock = threading.RLock()
+    
+    def acquire(self, model_size: str, device: str, dtype: str = "fp32"):
+        """
+        Get a loaded model, loading it on first use, and take a reference to it.
+        
+        Concurrent callers asking for the same key wait for a single load.
+        
+        Args:
+            model_size: Whisper model size (tiny/base/small/medium/large)
+            device: Torch device the model lives on ('cpu', 'cuda')
+            dtype: Weight dtype of the loaded model
+        
+        Returns:
+            The loaded Whisper model
+        """
+        key = (model_size, device, dtype)
+        
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refs += 1
+                    self._entries.move_to_end(key)
+                    logger.info(f"♻️  Reusing loaded Whisper model '{model_size}' ({device}, {dtype})")
+                    return entry.model
+            
+            # Load outside the registry lock so other keys aren't blocked
+            model = _load_whisper_model(model_size, device, dtype)
+            
+            with self._lock:
+                entry = _Entry(model, _model_bytes(model))
+                entry.refs = 1
+                self._entries[key] = entry
+                self._evict()
+            
+            return model
+    
+    def release(self, model_size: str, device: str, dtype: str = "fp32"):
+        """
+        Drop a reference taken by ``acquire``.
+        
+        The model stays loaded for reuse unless the memory budget is exceeded.
+        """
+        key = (model_size, device, dtype)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.refs > 0:
+                entry.refs -= 1
+                self._evict()
+    
+    def set_memory_budget(self, memory_budget_mb: int):
+        """Change the memory budget and evict immediately if it is now exceeded."""
+        with self._lock:
+            self.memory_budget_bytes = memory_budget_mb * 1024 * 1024
+            self._evict()
+    
+    def clear(self):
+        """Unload every model that is not currently referenced."""
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry.refs == 0]:
+                del self._entries[key]
+    
+    def stats(self) -> Dict:
+        """
+        Describe the loaded models.
+        
+        Returns:
+            Dictionary with total 'bytes', the 'budget_bytes' and per-model
+            'models' entries ({'key', 'refs', 'bytes'}) in LRU order
+        """
+        with self._lock:
+            return {
+                "bytes": sum(entry.nbytes for entry in self._entries.values()),
+                "budget_bytes": self.memory_budget_bytes,
+                "models": [
+                    {"key": key, "refs": entry.refs, "bytes": entry.nbytes}
+                    for key, entry in self._entries.items()
+                ]
+            }
+    
+    def _evict(self):
+        """Evict unreferenced models, least recently used first, until within budget."""
+        total = sum(entry.nbytes for entry in self._entries.values())
+        
+        for key in list(self._entries):
+            if total <= self.memory_budget_bytes:
+                break
+            entry = self._entries[key]
+            if entry.refs == 0:
+                del self._entries[key]
+                total -= entry.nbytes
+                logger.info(f"Evicted Whisper model {key} from the model registry")
+        
+        if total > self.memory_budget_bytes:
+            logger.warning(
+                f"⚠️  Models in use ({total / 1024 ** 2:.0f} MB) exceed the registry budget "
+                f"({self.memory_budget_bytes / 1024 ** 2:.0f} MB)"
+            )
+
+
+_REGISTRY = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide model registry."""
+    return _REGISTRY
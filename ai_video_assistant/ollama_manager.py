@@ -0,0 +1,398 @@
+"""
+Ollama model lifecycle management for the AI-Powered Video Lecture Assistant.
+Caches the server status check, preloads models with a keep_alive so they stay
+resident between jobs, sizes num_ctx to each prompt and collects the load /
+eval timings Ollama reports with every response, from which per-request
+timeouts are estimated.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+import requests
+
+from .http_transport import HTTPTransport, get_transport
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable via environment
+DEFAULT_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+DEFAULT_MAX_NUM_CTX = int(os.getenv("OLLAMA_MAX_NUM_CTX", "32768"))
+
+# Smallest context window requested
+MIN_NUM_CTX = 2048
+
+# Seconds a status check is reused before /api/tags is asked again
+STATUS_TTL = 300.0
+
+# Extra tokens on top of the prompt estimate (template, tokenizer differences)
+NUM_CTX_MARGIN = 256
+
+# Adaptive timeouts: smoothing of the throughput averages, how far a request may
+# overrun its expected duration, and fixed slack / floor in seconds
+THROUGHPUT_ALPHA = 0.3
+TIMEOUT_SAFETY = 2.0
+TIMEOUT_SLACK = 15.0
+MIN_TIMEOUT = 30.0
+
+# Ollama reports durations in nanoseconds
+_NS = 1e9
+
+
+def ollama_timings(response: Dict) -> Dict:
+    """
+    Convert the metadata of a final Ollama generate response to seconds and counts.
+    
+    Returns:
+        Dictionary with whichever of 'total_seconds', 'load_seconds',
+        'prompt_tokens', 'prompt_eval_seconds', 'eval_tokens', 'eval_seconds'
+        and 'tokens_per_second' the response carried
+    """
+    timings = {}
+    for field, name in (
+        ("total_duration", "total_seconds"),
+        ("load_duration", "load_seconds"),
+        ("prompt_eval_duration", "prompt_eval_seconds"),
+        ("eval_duration", "eval_seconds")
+    ):
+        if response.get(field) is not None:
+            timings[name] = response[field] / _NS
+    
+    if response.get("prompt_eval_count") is not None:
+        timings["prompt_tokens"] = response["prompt_eval_count"]
+    if response.get("eval_count") is not None:
+        timings["eval_tokens"] = response["eval_count"]
+        if timings.get("eval_seconds"):
+            timings["tokens_per_second"] = response["eval_count"] / timings["eval_seconds"]
+    return timings
+
+
+class OllamaModelManager:
+    """
+    Tracks the state of one Ollama server and the models loaded on it.
+    
+    The status check is cached, so constructing analyzers is cheap. Ollama
+    restarts a model's runner whenever ``num_ctx`` changes, so context sizes are
+    rounded up to powers of two and never shrink below the size a model is
+    already loaded with.
+    """
+    
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        transport: HTTPTransport = None,
+        keep_alive: str = DEFAULT_KEEP_ALIVE,
+        max_num_ctx: int = DEFAULT_MAX_NUM_CTX,
+        status_ttl: float = STATUS_TTL
+    ):
+        """
+        Initialize the OllamaModelManager.
+        
+        Args:
+            base_url: Ollama API base URL
+            transport: Pooled HTTP transport (default: the shared process-wide one)
+            keep_alive: How long Ollama keeps a model loaded after its last request
+                        (Ollama duration string such as '30m', or -1 for forever)
+            max_num_ctx: Largest context window requested; longer prompts are truncated
+            status_ttl: Seconds a status check is reused
+        """
+        self.base_url = base_url
+        self.transport = transport or get_transport()
+        self.keep_alive = keep_alive
+        self.max_num_ctx = max_num_ctx
+        self.status_ttl = status_ttl
+        self.timings: Dict[str, Dict] = {}
+        self.throughput: Dict[str, Dict] = {}
+        self._status: Optional[Dict] = None
+        self._checked_models = set()
+        self._num_ctx: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def status(self, refresh: bool = False) -> Dict:
+        """
+        Ask Ollama which models are installed, reusing a recent answer.
+        
+        Args:
+            refresh: Ignore the cached answer
+        
+        Returns:
+            Dictionary with 'reachable', installed 'models' and the 'checked' time
+        """
+        with self._lock:
+            status = self._status
+        if not refresh and status and time.time() - status["checked"] < self.status_ttl:
+            return status
+        
+        # Fetched without the lock: a slow or unreachable server must not block
+        # callers that only need the timings or context sizes
+        status = self._fetch_status()
+        with self._lock:
+            # Keep whichever concurrent check is the most recent
+            if self._status is None or status["checked"] >= self._status["checked"]:
+                self._status = status
+                self._checked_models.clear()
+            return self._status
+    
+    def _fetch_status(self) -> Dict:
+        """Query /api/tags and log what was found."""
+        status = {"reachable": False, "models": [], "checked": time.time()}
+        try:
+            # Test connection to Ollama
+            logger.info("🔍 Checking Ollama connection...")
+            response = self.transport.get(f"{self.base_url}/api/tags", provider="ollama", max_retries=0, timeout=5)
+            
+            if response.status_code == 200:
+                logger.info("✅ Ollama is running and connected")
+                status["reachable"] = True
+                status["models"] = [m['name'] for m in response.json().get('models', [])]
+                
+                if status["models"]:
+                    logger.info(f"📦 Available models: {', '.join(status['models'])}")
+                else:
+                    logger.warning("⚠️  No models installed in Ollama")
+            else:
+                logger.warning(f"⚠️  Ollama responded with status code: {response.status_code}")
+        
+        except requests.exceptions.ConnectionError:
+            logger.error("❌ Cannot connect to Ollama")
+            logger.error("💡 Make sure Ollama is running:")
+            logger.error("   - Start with: ollama serve")
+            logger.error("   - Or check if it's running in the background")
+        except requests.exceptions.Timeout:
+            logger.warning("⚠️  Ollama connection timed out (might be starting up)")
+        except Exception as e:
+            logger.warning(f"⚠️  Could not check Ollama status: {str(e)}")
+        
+        return status
+    
+    def check_model(self, model: str) -> bool:
+        """
+        Check (from the cached status) that a model is installed, logging hints if not.
+        
+        Returns:
+            True if the model is installed (False also when Ollama is unreachable)
+        """
+        status = self.status()
+        available_models = status["models"]
+        
+        # Handle both 'llama3.1' and 'llama3.1:latest' formats
+        found = any(
+            model in available_model or available_model.startswith(model + ':')
+            for available_model in available_models
+        )
+        
+        with self._lock:
+            if model in self._checked_models:
+                return found
+            self._checked_models.add(model)
+        
+        if found:
+            logger.info(f"✅ Model '{model}' is available")
+        elif status["reachable"]:
+            logger.warning(f"⚠️  Model '{model}' not found in Ollama")
+            logger.warning(f"💡 Install it with: ollama pull {model}")
+            if available_models:
+                logger.info(f"💡 Or use one of: {', '.join(available_models)}")
+        return found
+    
+    def num_ctx_for(self, model: str, prompt_tokens: int, output_tokens: int) -> int:
+        """
+        Pick the context window for a request.
+        
+        Args:
+            model: Ollama model name
+            prompt_tokens: Estimated prompt length
+            output_tokens: Output token limit (num_predict)
+        
+        Returns:
+            A power of two between MIN_NUM_CTX and max_num_ctx that fits the
+            request, or the model's current context if that is already larger
+        """
+        needed = prompt_tokens + output_tokens + NUM_CTX_MARGIN
+        num_ctx = MIN_NUM_CTX
+        while num_ctx < needed and num_ctx < self.max_num_ctx:
+            num_ctx *= 2
+        num_ctx = min(num_ctx, self.max_num_ctx)
+        
+        if needed > num_ctx:
+            logger.warning(
+                f"⚠️  Prompt needs ~{needed:,} tokens of context but max_num_ctx is {self.max_num_ctx:,}; "
+                "Ollama will truncate it"
+            )
+        
+        with self._lock:
+            # Shrinking would restart the runner just to save memory
+            num_ctx = max(num_ctx, self._num_ctx.get(model, 0))
+            self._num_ctx[model] = num_ctx
+        return num_ctx
+    
+    def preload(self, model: str, num_ctx: int = None, keep_alive: str = None, timeout: int = 600) -> Dict:
+        """
+        Load a model into memory ahead of the first request.
+        
+        Args:
+            model: Ollama model name
+            num_ctx: Context window to load it with (default: what the manager
+                     last used for this model, else MIN_NUM_CTX)
+            keep_alive: Override the manager's keep_alive
+            timeout: Request timeout in seconds
+        
+        Returns:
+            Timings reported by Ollama (see ``ollama_timings``)
+        """
+        with self._lock:
+            num_ctx = num_ctx or self._num_ctx.get(model, MIN_NUM_CTX)
+            self._num_ctx[model] = max(num_ctx, self._num_ctx.get(model, 0))
+        
+        logger.info(f"🚀 Preloading Ollama model '{model}' (num_ctx {num_ctx:,}, keep_alive {keep_alive or self.keep_alive})...")
+        # A generate request without a prompt only loads the model
+        payload = {
+            "model": model,
+            "keep_alive": keep_alive or self.keep_alive,
+            "options": {"num_ctx": num_ctx}
+        }
+        response = self.transport.post(f"{self.base_url}/api/generate", provider="ollama", json=payload, timeout=timeout)
+        response.raise_for_status()
+        
+        timings = self.record_timings(model, response.json())
+        logger.info(f"✅ Ollama model '{model}' loaded in {timings.get('load_seconds', 0):.1f}s")
+        return timings
+    
+    def preload_async(self, model: str, num_ctx: int = None) -> threading.Thread:
+        """Start ``preload`` on a background thread (failures are logged, not raised)."""
+        def load():
+            try:
+                self.preload(model, num_ctx)
+            except Exception as e:
+                logger.warning(f"⚠️  Could not preload Ollama model '{model}': {str(e)}")
+        
+        thread = threading.Thread(target=load, name="ollama-preload", daemon=True)
+        thread.start()
+        return thread
+    
+    def record_timings(self, model: str, response: Dict) -> Dict:
+        """
+        Store the timings of a final generate response as the model's latest.
+        
+        Returns:
+            The converted timings (see ``ollama_timings``)
+        """
+        timings = ollama_timings(response)
+        if timings.get("load_seconds", 0) > 1.0:
+            logger.info(f"🧊 Ollama (re)loaded '{model}' for this request in {timings['load_seconds']:.1f}s")
+        with self._lock:
+            self.timings[model] = timings
+            self._update_throughput(model, timings)
+        return timings
+    
+    def record_timeout(self, model: str, prompt_tokens: int, output_tokens: int, seconds: float):
+        """
+        Learn from a generate request that timed out.
+        
+        It ran for ``seconds`` without finishing, so the model was at least
+        ``seconds / expected`` times slower than its averages: rates scaled down
+        by that factor are folded in as a sample, and the next timeouts grow.
+        
+        Args:
+            model: Ollama model name
+            prompt_tokens: Estimated prompt length of the request
+            output_tokens: Tokens its timeout allowed for (as in ``timeout_for``)
+            seconds: How long the request ran before it timed out
+        """
+        expected = self.expected_seconds(model, prompt_tokens, output_tokens)
+        if expected is None or seconds <= expected:
+            return
+        
+        slowdown = expected / seconds
+        with self._lock:
+            averages = self.throughput.get(model, {})
+            rates = {
+                name: averages[name] * slowdown
+                for name in ("prompt_tokens_per_second", "eval_tokens_per_second")
+                if name in averages
+            }
+            self._fold_rates(model, rates)
+        logger.info(f"🐢 '{model}' timed out after {seconds:.0f}s (expected ~{expected:.0f}s), lowering its throughput estimate")
+    
+    def _update_throughput(self, model: str, timings: Dict):
+        """Fold one response's rates into the model's moving averages (lock held)."""
+        rates = {}
+        if timings.get("prompt_tokens") and timings.get("prompt_eval_seconds"):
+            rates["prompt_tokens_per_second"] = timings["prompt_tokens"] / timings["prompt_eval_seconds"]
+        if timings.get("tokens_per_second"):
+            rates["eval_tokens_per_second"] = timings["tokens_per_second"]
+        if timings.get("load_seconds", 0) > 1.0:
+            # Only real loads: a resident model reports a few milliseconds
+            rates["load_seconds"] = timings["load_seconds"]
+        self._fold_rates(model, rates)
+    
+    def _fold_rates(self, model: str, rates: Dict[str, float]):
+        """Update the model's moving averages with one sample of each rate (lock held)."""
+        averages = self.throughput.setdefault(model, {})
+        for name, value in rates.items():
+            previous = averages.get(name)
+            averages[name] = value if previous is None else THROUGHPUT_ALPHA * value + (1 - THROUGHPUT_ALPHA) * previous
+    
+    def expected_seconds(self, model: str, prompt_tokens: int, output_tokens: int = 0) -> Optional[float]:
+        """
+        Estimate how long a generate request takes from the measured throughput.
+        
+        Args:
+            model: Ollama model name
+            prompt_tokens: Estimated prompt length
+            output_tokens: Tokens to generate (0 = time to the first token only)
+        
+        Returns:
+            Seconds (including a model load, if one has been seen), or None until
+            both prompt-eval and eval throughput have been measured
+        """
+        with self._lock:
+            averages = dict(self.throughput.get(model, {}))
+        
+        prompt_rate = averages.get("prompt_tokens_per_second")
+        eval_rate = averages.get("eval_tokens_per_second")
+        if not prompt_rate or not eval_rate:
+            return None
+        return averages.get("load_seconds", 0.0) + prompt_tokens / prompt_rate + output_tokens / eval_rate
+    
+    def timeout_for(self, model: str, prompt_tokens: int, output_tokens: int, default: float) -> float:
+        """
+        Timeout for a generate request: its expected duration with a safety margin.
+        
+        Args:
+            model: Ollama model name
+            prompt_tokens: Estimated prompt length
+            output_tokens: Tokens to wait for (the output limit for a whole response,
+                           0 when the timeout only covers the first streamed token)
+            default: Timeout to use until throughput has been measured
+        
+        Returns:
+            Seconds, at least MIN_TIMEOUT
+        """
+        expected = self.expected_seconds(model, prompt_tokens, output_tokens)
+        if expected is None:
+            return default
+        return max(MIN_TIMEOUT, expected * TIMEOUT_SAFETY + TIMEOUT_SLACK)
+    
+    def loaded_num_ctx(self) -> Dict[str, int]:
+        """Context window each model was last requested with."""
+        with self._lock:
+            return dict(self._num_ctx)
+
+
+_MANAGERS: Dict[str, OllamaModelManager] = {}
+_MANAGERS_LOCK = threading.Lock()
+
+
+def get_ollama_manager(base_url: str = "http://localhost:11434") -> OllamaModelManager:
+    """Return the process-wide manager of an Ollama server."""
+    with _MANAGERS_LOCK:
+        manager = _MANAGERS.get(base_url)
+        if manager is None:
+            manager = _MANAGERS[base_url] = OllamaModelManager(base_url)
+        return manager
+
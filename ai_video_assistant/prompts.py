@@ -0,0 +1,220 @@
+"""
+Prompt templates for the AI-Powered Video Lecture Assistant.
+Shared map / reduce prompts used when a long transcription is analyzed in
+chunks and the per-chunk notes are combined into the final learning aids, and
+per-section prompts used when summary, insights and quiz are generated separately.
+"""
+
+from typing import Dict, List, Optional
+
+# Bump whenever prompt wording changes, so cached LLM responses aren't reused
+PROMPT_VERSION = 2
+
+MAP_SYSTEM_INSTRUCTION = """You are an expert educational assistant. You will be given one part of a longer lecture transcription. Extract compact study notes from this part only, as a single, valid JSON object.
+
+Rules:
+
+Summary: 2-3 sentences covering what this part teaches.
+
+Key points: 3-6 distinct facts, definitions, or concepts from this part, one sentence each.
+
+Questions: 1-2 multiple-choice questions about this part, each with 4 options and the correct_answer (which must be one of the options).
+
+Relevance: Everything must come from the provided text. Do not introduce external information."""
+
+MAP_OUTPUT_FORMAT = """{
+  "summary": "What this part covers...",
+  "key_points": [
+    "A key fact or definition.",
+    "..."
+  ],
+  "questions": [
+    {
+      "question": "A question about this part?",
+      "options": ["Option A", "Option B", "Option C", "Option D"],
+      "correct_answer": "Option B"
+    }
+  ]
+}"""
+
+
+def build_map_prompt(label: str, text: str) -> str:
+    """
+    Create the per-chunk extraction prompt.
+    
+    Args:
+        label: Chunk label, e.g. 'Part 2/5 (12:30-25:10)'
+        text: Chunk transcription text (or condensed notes)
+    
+    Returns:
+        Formatted prompt string
+    """
+    return f"""Here is {label} of an educational lecture. Extract study notes from it based on the rules.
+
+Text:
+
+{text}
+
+
+Output Format:
+
+Provide your response as a single, valid JSON object using this exact schema:
+
+{MAP_OUTPUT_FORMAT}
+
+IMPORTANT: Return ONLY the JSON object, nothing else."""
+
+
+def format_notes(label: str, notes: Dict) -> str:
+    """Render one chunk's extracted notes as plain text for the reduce prompt."""
+    lines = [f"{label}:", f"Summary: {notes.get('summary', '').strip()}"]
+    
+    key_points = notes.get("key_points") or []
+    if key_points:
+        lines.append("Key points:")
+        lines.extend(f"- {point}" for point in key_points)
+    
+    questions = notes.get("questions") or []
+    if questions:
+        lines.append("Candidate questions:")
+        for q in questions:
+            options = q.get("options", [])
+            if isinstance(options, dict):
+                options = list(options.values())
+            lines.append(f"- {q.get('question', '')} Options: {' | '.join(map(str, options))}. Answer: {q.get('correct_answer', '')}")
+    
+    return "\n".join(lines)
+
+
+def build_reduce_prompt(notes: List[str], output_format: str) -> str:
+    """
+    Create the prompt that combines per-chunk notes into the final learning aids.
+    
+    Args:
+        notes: Formatted notes, one per chunk, in lecture order
+        output_format: The analyzer's JSON output schema
+    
+    Returns:
+        Formatted prompt string
+    """
+    joined = "\n\n".join(notes)
+    return f"""The following are study notes extracted, in order, from consecutive parts of one long educational lecture. Treat them as the lecture transcription and provide the summary, key insights, and a 5-question multiple-choice quiz covering the whole lecture, based on the rules. Prefer insights and questions that span the lecture rather than a single part.
+
+Lecture notes:
+
+{joined}
+
+
+Output Format:
+
+Provide your response as a single, valid JSON object using this exact schema:
+
+{output_format}
+
+IMPORTANT: Return ONLY the JSON object, nothing else."""
+
+
+# Sections of the learning aids, each of which can be generated on its own
+SECTIONS = ("summary", "insights", "quiz")
+
+SECTION_RULES = {
+    "summary": "Summary: The summary must be a single, concise paragraph (4-6 sentences) capturing the main argument and topics of the lecture.",
+    "insights": "Insights: The insights must be a list of 5-7 distinct, important facts, definitions, or concepts from the text. Each insight should be a single, clear sentence.",
+    "quiz": """Quiz: The quiz must contain exactly 5 multiple-choice questions.
+
+Quiz Structure: Each question must have:
+  - A question text.
+  - 4 options (as a dictionary with keys A, B, C, D).
+  - The correct_answer (which must be a letter: A, B, C, or D)."""
+}
+
+SECTION_OUTPUT_FORMATS = {
+    "summary": """{
+  "summary": "A single-paragraph summary of the lecture content..."
+}""",
+    "insights": """{
+  "insights": [
+    "The first key insight or definition.",
+    "The second key insight or fact.",
+    "..."
+  ]
+}""",
+    "quiz": """{
+  "quiz": [
+    {
+      "question": "What is the first question?",
+      "options": {
+        "A": "First option",
+        "B": "Second option",
+        "C": "Third option",
+        "D": "Fourth option"
+      },
+      "correct_answer": "B"
+    }
+  ]
+}"""
+}
+
+# Output token budget per section (a full analysis gets 4096)
+SECTION_MAX_TOKENS = {
+    "summary": 512,
+    "insights": 768,
+    "quiz": 1536
+}
+
+SECTION_TASKS = {
+    "summary": "a concise summary",
+    "insights": "the key insights",
+    "quiz": "a 5-question multiple-choice quiz"
+}
+
+
+def section_system_instruction(section: str) -> str:
+    """System instruction for generating one section of the learning aids on its own."""
+    return f"""You are an expert educational assistant and curriculum designer. Your task is to write {SECTION_TASKS[section]} for a provided lecture. The output must be in a single, valid JSON object.
+
+Rules:
+
+{SECTION_RULES[section]}
+
+Relevance: Everything must be 100% derived from the provided lecture. Do not introduce external information."""
+
+
+def build_section_prompt(section: str, transcription: str, notes: Optional[List[str]] = None) -> str:
+    """
+    Create the prompt for one section of the learning aids.
+    
+    Args:
+        section: One of SECTIONS
+        transcription: Full lecture transcription
+        notes: Per-chunk notes of a long transcription (used instead of the text)
+    
+    Returns:
+        Formatted prompt string
+    """
+    if notes:
+        intro = (
+            "The following are study notes extracted, in order, from consecutive parts of one long "
+            f"educational lecture. Treat them as the lecture transcription and provide {SECTION_TASKS[section]} "
+            "covering the whole lecture, based on the rules."
+        )
+        source = "Lecture notes:\n\n" + "\n\n".join(notes)
+    else:
+        intro = (
+            "Here is the transcription from an educational lecture. Please analyze it and provide "
+            f"{SECTION_TASKS[section]} based on the rules."
+        )
+        source = f"Transcription:\n\n{transcription}"
+    
+    return f"""{intro}
+
+{source}
+
+
+Output Format:
+
+Provide your response as a single, valid JSON object using this exact schema:
+
+{SECTION_OUTPUT_FORMATS[section]}
+
+IMPORTANT: Return ONLY the JSON object, nothing else."""
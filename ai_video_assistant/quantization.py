@@ -0,0 +1,100 @@
+"""
+Int8 dynamic quantization for the AI-Powered Video Lecture Assistant.
+Quantizes Whisper's linear layers for faster CPU inference and caches the
+quantized weights on disk so later loads skip the fp32 checkpoint entirely.
+"""
+
+import os
+import logging
+from dataclasses import asdict
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Where quantized models are cached, overridable via environment
+QUANTIZED_CACHE_DIR = Path(
+    os.getenv("WHISPER_QUANTIZED_CACHE", Path.home() / ".cache" / "ai_video_assistant" / "quantized")
+)
+
+
+def quantize_model(model):
+    """
+    Apply dynamic int8 quantization to a Whisper model's linear layers (in place).
+    
+    Whisper uses its own ``Linear`` subclass, which torch's quantizer doesn't
+    recognise, so those layers are first turned back into plain ``nn.Linear``
+    (their forward only differs when mixing dtypes, which never happens on CPU).
+    
+    Args:
+        model: fp32 Whisper model on the CPU
+    
+    Returns:
+        The quantized model
+    """
+    import torch
+    from torch import nn
+    
+    for module in model.modules():
+        if isinstance(module, nn.Linear) and type(module) is not nn.Linear:
+            module.__class__ = nn.Linear
+    
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def _build_quantized_skeleton(dims: dict, model_size: str):
+    """Construct a quantized Whisper model of the given dimensions, ready for load_state_dict."""
+    import whisper
+    from whisper.model import ModelDimensions, Whisper
+    
+    model = Whisper(ModelDimensions(**dims))
+    # Alignment heads (for word timestamps) aren't part of the state dict
+    if model_size in whisper._ALIGNMENT_HEADS:
+        model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_size])
+    return quantize_model(model)
+
+
+def load_quantized_model(model_size: str, cache_dir: Path = None):
+    """
+    Load an int8-quantized Whisper model, using the on-disk cache when possible.
+    
+    Only tensors are cached (the quantized state dict and the model dimensions),
+    never a pickled module: the cache directory can be set from the environment,
+    so it's read with ``weights_only=True`` and can't run code on load.
+    
+    Args:
+        model_size: Whisper model size (tiny/base/small/medium/large)
+        cache_dir: Directory for cached quantized models (default: QUANTIZED_CACHE_DIR)
+    
+    Returns:
+        Quantized Whisper model on the CPU
+    """
+    import torch
+    import whisper
+    
+    cache_dir = Path(cache_dir or QUANTIZED_CACHE_DIR)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    # The packed int8 weights are tied to the torch and whisper versions that wrote them
+    versions = f"whisper{whisper.__version__}-torch{torch.__version__}".replace("+", "_")
+    cache_path = cache_dir / f"{model_size}-int8-{versions}.state.pt"
+    
+    if cache_path.exists():
+        logger.info(f"Loading cached int8 Whisper weights: {cache_path}")
+        try:
+            checkpoint = torch.load(cache_path, map_location="cpu", weights_only=True)
+            model = _build_quantized_skeleton(checkpoint["dims"], model_size)
+            model.load_state_dict(checkpoint["model_state_dict"])
+            return model.eval()
+        except Exception as e:
+            logger.warning(f"⚠️  Could not load cached quantized weights ({e}), rebuilding them")
+    
+    logger.info(f"Quantizing Whisper model '{model_size}' to int8 (first run only)...")
+    model = quantize_model(whisper.load_model(model_size, device="cpu"))
+    
+    partial_path = cache_path.with_suffix(".partial")
+    torch.save({"dims": asdict(model.dims), "model_state_dict": model.state_dict()}, partial_path)
+    os.replace(partial_path, cache_path)
+    logger.info(f"Cached quantized model: {cache_path}")
+    
+    return model
@@ -0,0 +1,284 @@
+"""
+Per-provider rate limiting for the AI-Powered Video Lecture Assistant.
+Token buckets enforce each provider's requests-per-minute and tokens-per-minute
+budgets before a request is sent, so batch jobs queue at the provider's limit
+instead of running into 429 errors, and Retry-After advice pauses every queued
+request for that provider, not just the one that was rejected.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Waits shorter than this are not logged
+LOG_WAIT_SECONDS = 1.0
+
+
+class TokenBucket:
+    """
+    Refills ``per_minute`` units per minute, up to a minute's worth.
+    
+    Takes are reservations: the level may go negative, and the caller waits
+    until the refill covers its share. Callers are served in the order they
+    reserved.
+    """
+    
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+    
+    def reserve(self, amount: float, now: float) -> float:
+        """Take ``amount`` units; returns the seconds until they are covered."""
+        self.level = min(self.per_minute, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        # A request bigger than the whole budget would never fit: let it use a full bucket
+        self.level -= min(amount, self.per_minute)
+        return max(0.0, -self.level / self.rate)
+    
+    def refund(self, amount: float):
+        """Give back units that weren't used."""
+        self.level = min(self.per_minute, self.level + min(amount, self.per_minute))
+
+
+class ProviderRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budget of one provider.
+    
+    Shared by every thread and event loop in the process: sync callers use
+    ``acquire`` and async callers ``acquire_async``.
+    """
+    
+    def __init__(self, provider: str, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        """
+        Initialize the ProviderRateLimiter.
+        
+        Args:
+            provider: Provider name (for logs)
+            rpm: Requests per minute (None = unlimited)
+            tpm: Tokens per minute, prompt plus output limit (None = unlimited)
+        """
+        self.provider = provider
+        self._lock = threading.Lock()
+        self.paused_until = 0.0
+        self._metrics = {
+            "requests": 0,
+            "queued": 0,
+            "queue_depth": 0,
+            "max_queue_depth": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "throttled": 0
+        }
+        self.set_limits(rpm, tpm)
+    
+    def set_limits(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        """Replace the budgets (None = unlimited)."""
+        with self._lock:
+            self.rpm = rpm
+            self.tpm = tpm
+            self._requests = TokenBucket(rpm) if rpm else None
+            self._tokens = TokenBucket(tpm) if tpm else None
+    
+    def _reserve(self, tokens: int) -> float:
+        """Reserve one request and its tokens; returns the seconds to wait before sending."""
+        now = time.monotonic()
+        with self._lock:
+            delay = 0.0
+            if self._requests:
+                delay = self._requests.reserve(1, now)
+            if self._tokens and tokens:
+                delay = max(delay, self._tokens.reserve(tokens, now))
+            delay = max(delay, self.paused_until - now)
+            
+            self._metrics["requests"] += 1
+            if delay > 0:
+                self._metrics["queued"] += 1
+                self._metrics["queue_depth"] += 1
+                self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], self._metrics["queue_depth"])
+                if delay >= LOG_WAIT_SECONDS:
+                    logger.info(
+                        f"🚦 {self.provider} rate limit: request queued for {delay:.1f}s "
+                        f"({self._metrics['queue_depth']} waiting)"
+                    )
+            return delay
+    
+    def _pause_remaining(self) -> float:
+        """Seconds left of a Retry-After pause that started while a caller was waiting."""
+        with self._lock:
+            return self.paused_until - time.monotonic()
+    
+    def _waited(self, started: float):
+        """Record a finished wait."""
+        waited = time.monotonic() - started
+        with self._lock:
+            self._metrics["queue_depth"] -= 1
+            self._metrics["wait_seconds_total"] += waited
+            self._metrics["wait_seconds_max"] = max(self._metrics["wait_seconds_max"], waited)
+    
+    def acquire(self, tokens: int = 0, cancelled: Optional[threading.Event] = None) -> bool:
+        """
+        Wait until a request of ``tokens`` estimated tokens fits the budgets.
+        
+        Args:
+            tokens: Estimated prompt tokens plus the output token limit
+            cancelled: Stop waiting once this event is set; the reservation is
+                       given back, since the request won't be sent
+        
+        Returns:
+            True when the request may be sent, False if it was cancelled first
+        """
+        delay = self._reserve(tokens)
+        if delay <= 0:
+            return True
+        started = time.monotonic()
+        try:
+            while delay > 0:
+                if cancelled is None:
+                    time.sleep(delay)
+                elif cancelled.wait(delay):
+                    self.release(tokens)
+                    return False
+                delay = self._pause_remaining()
+        finally:
+            self._waited(started)
+        return True
+    
+    async def acquire_async(self, tokens: int = 0):
+        """
+        Async version of ``acquire``.
+        
+        A waiter whose task is cancelled gives its reservation back before the
+        cancellation propagates.
+        """
+        delay = self._reserve(tokens)
+        if delay <= 0:
+            return
+        started = time.monotonic()
+        try:
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = self._pause_remaining()
+        except asyncio.CancelledError:
+            self.release(tokens)
+            raise
+        finally:
+            self._waited(started)
+    
+    def release(self, tokens: int = 0):
+        """Give back the reservation of a request that wasn't sent, or that the provider didn't count."""
+        with self._lock:
+            self._release(tokens)
+    
+    def _release(self, tokens: int):
+        """``release`` with the lock held."""
+        if self._requests:
+            self._requests.refund(1)
+        if self._tokens and tokens:
+            self._tokens.refund(tokens)
+    
+    def throttled(self, retry_after: Optional[float], tokens: int = 0):
+        """
+        Record a 429 response: pause the provider for ``retry_after`` seconds.
+        
+        The rejected request's reservation is refunded, since the provider
+        didn't count it; the retry reserves again.
+        """
+        with self._lock:
+            self._metrics["throttled"] += 1
+            self._release(tokens)
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+    
+    def settle(self, estimated: int, actual: int):
+        """Correct a token reservation once the provider has reported the real usage."""
+        with self._lock:
+            if not self._tokens or not actual:
+                return
+            if actual < estimated:
+                self._tokens.refund(estimated - actual)
+            else:
+                self._tokens.reserve(actual - estimated, time.monotonic())
+    
+    def metrics(self) -> Dict:
+        """
+        Queue and wait-time counters.
+        
+        Returns:
+            Dictionary with 'rpm', 'tpm', 'requests', 'queued' (requests that had
+            to wait), 'queue_depth' (waiting now), 'max_queue_depth',
+            'wait_seconds_total', 'wait_seconds_max', 'wait_seconds_avg' (over
+            queued requests) and 'throttled' (429 responses)
+        """
+        with self._lock:
+            metrics = dict(self._metrics, rpm=self.rpm, tpm=self.tpm)
+        metrics["wait_seconds_avg"] = metrics["wait_seconds_total"] / metrics["queued"] if metrics["queued"] else 0.0
+        return metrics
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Seconds a 429 / 503 response asks the client to wait, if it says.
+    
+    Understands ``Retry-After`` (seconds or an HTTP date) and OpenAI's
+    ``retry-after-ms``.
+    """
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_LIMITERS: Dict[str, ProviderRateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> ProviderRateLimiter:
+    """
+    Return the process-wide rate limiter of a provider.
+    
+    New limiters start with the budgets in the ``<PROVIDER>_RPM`` and
+    ``<PROVIDER>_TPM`` environment variables (e.g. GROQ_TPM=6000), else unlimited.
+    """
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(provider)
+        if limiter is None:
+            prefix = provider.upper().replace("-", "_").replace(".", "_").replace(":", "_")
+            rpm = os.getenv(f"{prefix}_RPM")
+            tpm = os.getenv(f"{prefix}_TPM")
+            limiter = _LIMITERS[provider] = ProviderRateLimiter(
+                provider,
+                rpm=float(rpm) if rpm else None,
+                tpm=float(tpm) if tpm else None
+            )
+        return limiter
+
+
+def set_rate_limit(provider: str, rpm: Optional[float] = None, tpm: Optional[float] = None) -> ProviderRateLimiter:
+    """Set a provider's requests-per-minute and tokens-per-minute budgets (None = unlimited)."""
+    limiter = get_rate_limiter(provider)
+    limiter.set_limits(rpm, tpm)
+    logger.info(f"🚦 {provider} rate limit: {rpm or 'unlimited'} requests/min, {tpm or 'unlimited'} tokens/min")
+    return limiter
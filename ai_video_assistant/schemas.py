@@ -0,0 +1,181 @@
+"""
+Result schemas for the AI-Powered Video Lecture Assistant.
+JSON schemas used to constrain LLM output (structured output mode), plus the
+validation that brings every analysis to one canonical shape: quiz options as
+an {'A'..'D'} dictionary and correct answers as option letters.
+"""
+
+import logging
+from typing import Any, Dict
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+OPTION_KEYS = ("A", "B", "C", "D")
+
+QUIZ_QUESTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "question": {"type": "string"},
+        "options": {
+            "type": "object",
+            "properties": {key: {"type": "string"} for key in OPTION_KEYS},
+            "required": list(OPTION_KEYS),
+            "additionalProperties": False
+        },
+        "correct_answer": {"type": "string", "enum": list(OPTION_KEYS)}
+    },
+    "required": ["question", "options", "correct_answer"],
+    "additionalProperties": False
+}
+
+# Counts (5-7 insights, 5 questions) are left to the prompt and validation:
+# not every provider's structured output supports minItems / maxItems
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "insights": {"type": "array", "items": {"type": "string"}},
+        "quiz": {"type": "array", "items": QUIZ_QUESTION_SCHEMA}
+    },
+    "required": ["summary", "insights", "quiz"],
+    "additionalProperties": False
+}
+
+# Per-chunk study notes of map-reduce analysis (see prompts.MAP_OUTPUT_FORMAT)
+NOTES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "key_points": {"type": "array", "items": {"type": "string"}},
+        "questions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "question": {"type": "string"},
+                    "options": {"type": "array", "items": {"type": "string"}},
+                    "correct_answer": {"type": "string"}
+                },
+                "required": ["question", "options", "correct_answer"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["summary", "key_points", "questions"],
+    "additionalProperties": False
+}
+
+
+def section_schema(section: str) -> Dict:
+    """Schema of a single-section response, e.g. {"quiz": [...]}."""
+    return {
+        "type": "object",
+        "properties": {section: ANALYSIS_SCHEMA["properties"][section]},
+        "required": [section],
+        "additionalProperties": False
+    }
+
+
+def validate_analysis(result: Dict):
+    """
+    Validate an analysis result and normalize its quiz (in place).
+    
+    Args:
+        result: The parsed JSON result
+    
+    Raises:
+        ValueError: If the result structure is invalid
+    """
+    for section in ("summary", "insights", "quiz"):
+        validate_section(section, result)
+
+
+def validate_section(section: str, result: Dict):
+    """
+    Validate one section ('summary', 'insights' or 'quiz') of a result (in place).
+    
+    Raises:
+        ValueError: If the section is missing or invalid
+    """
+    if section not in result:
+        raise ValueError(f"Missing required key in response: {section}")
+    
+    if section == "summary" and not isinstance(result["summary"], str):
+        raise ValueError("Summary must be a string")
+    
+    if section == "insights" and (not isinstance(result["insights"], list) or len(result["insights"]) < 5):
+        raise ValueError("Insights must be a list with at least 5 items")
+    
+    if section == "quiz":
+        if not isinstance(result["quiz"], list) or len(result["quiz"]) != 5:
+            raise ValueError("Quiz must contain exactly 5 questions")
+        for i, question in enumerate(result["quiz"]):
+            normalize_question(question, i + 1)
+
+
+def normalize_question(question: Any, number: int):
+    """
+    Bring a quiz question to the canonical shape (in place).
+    
+    Options given as a list become a dictionary keyed A-D, and correct_answer
+    becomes the letter of the matching option, whether the model answered with
+    a letter, 'B. text', the option text or an option index.
+    
+    Args:
+        question: One quiz question
+        number: 1-based question number (for messages)
+    
+    Raises:
+        ValueError: If fields are missing, there aren't 4 options or the answer
+                    matches none of them
+    """
+    if not isinstance(question, dict) or not all(k in question for k in ("question", "options", "correct_answer")):
+        raise ValueError(f"Quiz question {number} is missing required fields")
+    
+    # Convert options to dict format if it's a list
+    options = question["options"]
+    if isinstance(options, list):
+        options = {chr(65 + idx): opt for idx, opt in enumerate(options)}  # 65 is 'A'
+        question["options"] = options
+    
+    if not isinstance(options, dict) or len(options) != 4:
+        raise ValueError(f"Quiz question {number} must have exactly 4 options")
+    
+    correct_answer = question["correct_answer"]
+    
+    # An option index (0-3)
+    if isinstance(correct_answer, int) and 0 <= correct_answer < len(options):
+        question["correct_answer"] = list(options)[correct_answer]
+        logger.warning(f"Quiz question {number}: Converted answer index to option {question['correct_answer']}")
+        return
+    
+    correct_answer = str(correct_answer).strip()
+    
+    # A letter (A/B/C/D)
+    if len(correct_answer) == 1 and correct_answer.upper() in options:
+        question["correct_answer"] = correct_answer.upper()
+        return
+    
+    # A letter and period (e.g., "B. text")
+    if len(correct_answer) > 2 and correct_answer[0].isalpha() and correct_answer[1] == '.':
+        key = correct_answer[0].upper()
+        if key in options:
+            question["correct_answer"] = key
+            logger.warning(f"Quiz question {number}: Extracted key '{key}' from answer")
+            return
+    
+    # The full option text (case-insensitive, with or without a letter prefix)
+    normalized_correct = correct_answer.lower()
+    for key, value in options.items():
+        value = str(value).strip()
+        value_without_prefix = value.split('. ', 1)[-1] if '. ' in value else value
+        if normalized_correct in (value.lower(), value_without_prefix.lower()):
+            question["correct_answer"] = key
+            logger.warning(f"Quiz question {number}: Matched answer text to option {key}")
+            return
+    
+    logger.error(f"Quiz question {number} validation failed:")
+    logger.error(f"  Correct answer: '{correct_answer}'")
+    logger.error(f"  Options: {options}")
+    raise ValueError(f"Quiz question {number}: correct_answer must be one of the options")
@@ -0,0 +1,138 @@
+"""
+Streaming helpers for the AI-Powered Video Lecture Assistant.
+Decodes streamed LLM responses (Ollama NDJSON and server-sent events) and
+parses the JSON answer incrementally while it arrives.
+"""
+
+import json
+import time
+import logging
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, Tuple
+
+import requests
+from urllib3.exceptions import ReadTimeoutError
+
+from .json_utils import IncrementalJSONParser
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _iter_lines(response: requests.Response) -> Iterator[bytes]:
+    """
+    ``response.iter_lines()``, raising a stalled stream as a read timeout.
+    
+    Requests wraps a read timeout in the middle of a body in a ConnectionError,
+    which would otherwise be reported as "cannot connect" and never retried.
+    """
+    try:
+        yield from response.iter_lines()
+    except requests.exceptions.ConnectionError as e:
+        if e.args and isinstance(e.args[0], ReadTimeoutError):
+            raise requests.exceptions.ReadTimeout(e.args[0], response=response) from e
+        raise
+
+
+def iter_ndjson(response: requests.Response) -> Iterator[Dict]:
+    """Yield one decoded object per line of a newline-delimited JSON stream."""
+    for line in _iter_lines(response):
+        if line:
+            yield json.loads(line)
+
+
+def iter_sse(response: requests.Response) -> Iterator[Dict]:
+    """Yield the decoded JSON ``data:`` payload of each server-sent event."""
+    for line in _iter_lines(response):
+        if not line.startswith(b"data:"):
+            continue  # Blank separators, comments, event: lines
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            return
+        yield json.loads(data)
+
+
+async def aiter_ndjson(response) -> AsyncIterator[Dict]:
+    """Async ``iter_ndjson`` for a streamed httpx response."""
+    async for line in response.aiter_lines():
+        if line.strip():
+            yield json.loads(line)
+
+
+async def aiter_sse(response) -> AsyncIterator[Dict]:
+    """Async ``iter_sse`` for a streamed httpx response."""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        yield json.loads(data)
+
+
+class _StreamCollector:
+    """Accumulates streamed text deltas, feeding them to an IncrementalJSONParser."""
+    
+    def __init__(self, on_field: Callable[[str, Any], None], started: float):
+        self.started = started or time.perf_counter()
+        self.stats = {"ttft": None, "duration": None, "chars": 0}
+        self.parser = IncrementalJSONParser(on_field)
+        self.pieces = []
+    
+    def add(self, delta: str) -> bool:
+        """Consume one delta; returns True once the JSON object is complete."""
+        if not delta:
+            return False
+        if self.stats["ttft"] is None:
+            self.stats["ttft"] = time.perf_counter() - self.started
+        self.pieces.append(delta)
+        self.stats["chars"] += len(delta)
+        self.parser.feed(delta)
+        return self.parser.done
+    
+    def finish(self) -> Tuple[str, Dict]:
+        self.stats["duration"] = time.perf_counter() - self.started
+        return "".join(self.pieces), self.stats
+
+
+def collect_json_stream(
+    deltas: Iterable[str],
+    on_field: Callable[[str, Any], None] = None,
+    started: float = None
+) -> Tuple[str, Dict]:
+    """
+    Read streamed text deltas into a complete JSON answer.
+    
+    The text is parsed as it arrives: top-level fields are reported through
+    ``on_field`` as soon as they are complete, reading stops once the object is
+    closed, and malformed output aborts the stream immediately.
+    
+    Args:
+        deltas: Text pieces in arrival order
+        on_field: Called with (key, value) for each completed top-level field
+        started: ``time.perf_counter()`` when the request was sent (default: now)
+    
+    Returns:
+        (response_text, stats) where stats has 'ttft' (seconds to the first
+        token), 'duration' (seconds) and 'chars'
+    
+    Raises:
+        MalformedJSONError: If the streamed text can't be a valid JSON object
+    """
+    collector = _StreamCollector(on_field, started)
+    for delta in deltas:
+        if collector.add(delta):
+            break  # Ignore anything the model adds after the object
+    return collector.finish()
+
+
+async def collect_json_stream_async(
+    deltas: AsyncIterable[str],
+    on_field: Callable[[str, Any], None] = None,
+    started: float = None
+) -> Tuple[str, Dict]:
+    """Async version of ``collect_json_stream`` for an async iterable of deltas."""
+    collector = _StreamCollector(on_field, started)
+    async for delta in deltas:
+        if collector.add(delta):
+            break  # Ignore anything the model adds after the object
+    return collector.finish()
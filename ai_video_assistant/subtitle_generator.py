@@ -5,7 +5,7 @@ Generates SRT subtitle files from Whisper timestamped transcriptions.
 
 import logging
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -63,6 +63,38 @@ def generate_srt(segments: List[Dict], output_path: str) -> str:
     return str(output_path)
 
 
+def write_srt_stream(segments: Iterable[Dict], output_path: str) -> Iterator[Dict]:
+    """
+    Write SRT subtitles incrementally while passing segments through.
+    
+    Each segment is written and flushed to disk as soon as it arrives, so
+    subtitles for a long recording appear while transcription is still running.
+    
+    Args:
+        segments: Iterable of segments with 'start', 'end', and 'text' keys
+                  (e.g. ``AudioTranscriber.transcribe_stream``)
+        output_path: Path to save the SRT file
+    
+    Yields:
+        Each segment, after it has been written
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for i, segment in enumerate(segments, 1):
+            start_time = format_timestamp(segment['start'])
+            end_time = format_timestamp(segment['end'])
+            text = segment['text'].strip()
+            
+            f.write(f"{i}\n{start_time} --> {end_time}\n{text}\n\n")
+            f.flush()
+            
+            yield segment
+    
+    logger.info(f"SRT subtitle file created: {output_path}")
+
+
 def get_current_subtitle(segments: List[Dict], current_time: float) -> str:
     """
     Get the subtitle text for a given timestamp.
@@ -4,10 +4,22 @@ Uses OpenAI Whisper to transcribe audio files to text.
 """
 
 import os
+import json
+import time
+import hashlib
 import whisper
 import logging
+import weakref
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 from .ffmpeg_utils import setup_ffmpeg
+from .cache import SQLiteCache, make_key
+from .model_registry import get_model_registry
+from .vad import detect_speech, compact_audio, remap_segments, split_on_silence
 
 # Check for CUDA GPU support at module load time
 try:
@@ -41,11 +53,283 @@ except Exception as e:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Characters of previous text passed as the prompt for the next window
+PROMPT_TAIL_CHARS = 200
+
+# Overlap between consecutive windows cut from an in-memory signal, so words at
+# a cut are decoded whole by one of the two windows (same as stream_audio)
+WINDOW_OVERLAP_SECONDS = 5.0
+
+# Torch threads given to each process in parallel transcription
+THREADS_PER_WORKER = 4
+
+# Whisper's fallback schedule and quality thresholds (same defaults as model.transcribe)
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+# Candidates sampled per window at temperatures above 0 (the CLI's --best_of default)
+BEST_OF = 5
+
+# One lock per loaded model: Whisper installs kv-cache hooks on the model for the
+# duration of a decode, so two threads must not run inference on it at once
+_INFERENCE_LOCKS = weakref.WeakKeyDictionary()
+_INFERENCE_LOCKS_GUARD = threading.Lock()
+
+
+def _offset_segments(segments: List[dict], offset: float) -> List[dict]:
+    """Shift Whisper segments (and their word timings) by offset seconds."""
+    shifted = []
+    for segment in segments:
+        segment = dict(segment)
+        segment["start"] = segment["start"] + offset
+        segment["end"] = segment["end"] + offset
+        if "seek" in segment:
+            segment["seek"] = segment["seek"] + int(round(offset * 100))
+        if segment.get("words"):
+            segment["words"] = [
+                {**word, "start": word["start"] + offset, "end": word["end"] + offset}
+                for word in segment["words"]
+            ]
+        shifted.append(segment)
+    return shifted
+
+
+def _inference_lock(model) -> threading.Lock:
+    """Lock serializing inference on a (possibly shared) Whisper model."""
+    with _INFERENCE_LOCKS_GUARD:
+        lock = _INFERENCE_LOCKS.get(model)
+        if lock is None:
+            lock = _INFERENCE_LOCKS[model] = threading.Lock()
+        return lock
+
+
+def _audio_hash(audio: Union[str, np.ndarray]) -> str:
+    """Hash the full content of an audio file or sample array."""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(audio, np.ndarray):
+        digest.update(np.ascontiguousarray(audio).data)
+    else:
+        with open(audio, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _array_windows(audio: np.ndarray, overlap_seconds: float = WINDOW_OVERLAP_SECONDS) -> Iterator[Tuple[float, np.ndarray]]:
+    """Cut an in-memory signal into overlapping 30 s (offset_seconds, samples) windows."""
+    window = whisper.audio.N_SAMPLES
+    hop = window - int(overlap_seconds * whisper.audio.SAMPLE_RATE)
+    start = 0
+    while True:
+        yield start / whisper.audio.SAMPLE_RATE, audio[start:start + window]
+        # Stop once a window reaches the end; a tail inside it would be all overlap
+        if start + window >= len(audio):
+            return
+        start += hop
+
+
+def _segments_from_tokens(result, tokenizer, offset: float, duration: float) -> List[dict]:
+    """
+    Split one decoded 30 s window into timestamped segments.
+    
+    Args:
+        result: whisper DecodingResult decoded with timestamps
+        tokenizer: Tokenizer used for decoding
+        offset: Start of the window in the source audio (seconds)
+        duration: Length of actual (unpadded) audio in the window (seconds)
+    
+    Returns:
+        Whisper-style segment dicts on the source timeline
+    """
+    time_precision = whisper.audio.CHUNK_LENGTH / whisper.audio.N_FRAMES * 2  # 0.02 s per timestamp token
+    segments = []
+    start = None
+    text_tokens = []
+    
+    def close(end: float):
+        segments.append({
+            "seek": int(round(offset * 100)),
+            "start": offset + min(start or 0.0, duration),
+            "end": offset + min(end, duration),
+            "text": tokenizer.decode(text_tokens),
+            "tokens": list(text_tokens),
+            "temperature": result.temperature,
+            "avg_logprob": result.avg_logprob,
+            "compression_ratio": result.compression_ratio,
+            "no_speech_prob": result.no_speech_prob
+        })
+    
+    for token in result.tokens:
+        if token >= tokenizer.timestamp_begin:
+            time = (token - tokenizer.timestamp_begin) * time_precision
+            if text_tokens:
+                close(time)
+                text_tokens = []
+                start = None
+            else:
+                start = time
+        elif token < tokenizer.eot:
+            text_tokens.append(token)
+    
+    # Text without a closing timestamp runs to the end of the audio
+    if text_tokens:
+        close(duration)
+    
+    return segments
+
+
+class _SegmentStitcher:
+    """
+    Merges segments from consecutive, possibly overlapping windows into one timeline.
+    
+    Where two windows overlap, segments are assigned to the window whose
+    midpoint side they fall on: the earlier window keeps segments centred before
+    the middle of the overlap, the later window keeps the rest. Segments from
+    the latest window are held back until the next window arrives, since only
+    then is the overlap known.
+    """
+    
+    def __init__(self):
+        self.pending = []
+        self.pending_end = None
+        self.next_id = 0
+    
+    def add(self, offset: float, window_end: float, segments: List[dict]) -> List[dict]:
+        """
+        Add a window's segments (already on the global timeline).
+        
+        Args:
+            offset: Start time of the window in seconds
+            window_end: End time of the window in seconds
+            segments: Segments decoded from the window
+        
+        Returns:
+            Segments from earlier windows that are now final
+        """
+        if self.pending_end is not None and self.pending_end > offset:
+            boundary = (offset + self.pending_end) / 2
+        else:
+            boundary = offset
+        
+        midpoint = lambda segment: (segment["start"] + segment["end"]) / 2
+        committed = [segment for segment in self.pending if midpoint(segment) < boundary]
+        
+        self.pending = [segment for segment in segments if midpoint(segment) >= boundary]
+        self.pending_end = window_end
+        return self._number(committed)
+    
+    def flush(self) -> List[dict]:
+        """Return the remaining held-back segments once all windows are in."""
+        committed, self.pending = self.pending, []
+        return self._number(committed)
+    
+    def _number(self, segments: List[dict]) -> List[dict]:
+        for segment in segments:
+            segment["id"] = self.next_id
+            self.next_id += 1
+        return segments
+    
+    def state(self) -> dict:
+        """Snapshot the stitcher so a checkpointed run can resume from it."""
+        return {"pending": self.pending, "pending_end": self.pending_end, "next_id": self.next_id}
+    
+    def restore(self, state: dict):
+        """Restore a snapshot taken with ``state``."""
+        self.pending = state["pending"]
+        self.pending_end = state["pending_end"]
+        self.next_id = state["next_id"]
+
+
+class _CheckpointJournal:
+    """
+    Append-only JSONL journal of completed transcription windows.
+    
+    The first line records the parameters of the run; every later line holds
+    the segments committed by one window plus the state needed to continue
+    after it. A journal written with different parameters is discarded, and a
+    line cut short by a crash is ignored.
+    """
+    
+    def __init__(self, path: str, params: dict):
+        self.path = Path(path)
+        self.params = params
+    
+    def load(self) -> List[dict]:
+        """Return the completed window records, or [] if there's nothing to resume."""
+        if not self.path.exists():
+            return []
+        
+        records = []
+        with open(self.path, encoding='utf-8') as f:
+            for i, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # Partially written last line
+                if i == 0:
+                    if record != {"params": self.params}:
+                        logger.warning("⚠️  Checkpoint was written with different settings, starting over")
+                        return []
+                    continue
+                records.append(record)
+        
+        return records
+    
+    def append(self, record: dict):
+        """Durably append one window record (writes the header first if needed)."""
+        new = not self.path.exists() or self.path.stat().st_size == 0
+        with open(self.path, 'a', encoding='utf-8') as f:
+            if new:
+                f.write(json.dumps({"params": self.params}, default=float) + "\n")
+            f.write(json.dumps(record, default=float) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def remove(self):
+        """Delete the journal: to start a fresh one, or once the run has completed."""
+        self.path.unlink(missing_ok=True)
+
+
+class TranscriptionStream:
+    """
+    Iterator over transcribed segments, returned by ``AudioTranscriber.transcribe_stream``.
+    
+    The detected (or requested) language is available as ``language`` once the
+    first window has been decoded.
+    """
+    
+    def __init__(self, segments: Iterator[dict], options: dict):
+        self._segments = segments
+        self._options = options
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> dict:
+        return next(self._segments)
+    
+    @property
+    def language(self) -> str:
+        return self._options.get("language")
+    
+    def close(self):
+        """Stop transcribing (releases the underlying audio stream)."""
+        self._segments.close()
+
 
 class AudioTranscriber:
     """Transcribes audio files using OpenAI Whisper."""
     
-    def __init__(self, model_size: str = "base"):
+    def __init__(
+        self,
+        model_size: str = "base",
+        vad: bool = False,
+        device: str = None,
+        quantize: bool = False,
+        cache_path: str = None,
+        cache_max_mb: int = 512
+    ):
         """
         Initialize the AudioTranscriber.
         
@@ -56,25 +340,114 @@ class AudioTranscriber:
                        - small: better accuracy
                        - medium: high accuracy
                        - large: best accuracy, slowest
+            vad: Run a voice-activity-detection pre-pass and only transcribe speech.
+                 Skips silence (faster, fewer hallucinations); timestamps are mapped
+                 back to the original timeline
+            device: Torch device to run on ('cpu', 'cuda', 'mps'). If None, uses CUDA when available
+            quantize: Run an int8 dynamic-quantized model on the CPU. Faster than fp32
+                      on CPU-only machines; the quantized weights are cached on disk
+            cache_path: SQLite file for caching transcription results, keyed by audio
+                        content hash, model and decode options. None disables caching
+            cache_max_mb: Size cap for the result cache (least recently used entries
+                          are evicted)
         """
         self.model_size = model_size
+        self.vad = vad
+        self.quantize = quantize
+        
+        if quantize:
+            if device not in (None, "cpu"):
+                logger.warning(f"⚠️  Int8 quantization is CPU-only, ignoring device '{device}'")
+            self.device = "cpu"
+            self.dtype = "int8"
+        else:
+            self.device = device or ("cuda" if CUDA_AVAILABLE else "cpu")
+            self.dtype = "fp32"
         self.model = None
+        self.load_seconds = None
+        self._model_ref = None
+        self._load_lock = threading.Lock()
+        self._load_future = None
+        self.cache = SQLiteCache(cache_path, max_size_mb=cache_max_mb) if cache_path else None
         logger.info(f"Initializing Whisper with model size: {model_size}")
     
     def load_model(self):
-        """Load the Whisper model."""
-        if self.model is None:
-            logger.info(f"Loading Whisper model '{self.model_size}'...")
-            self.model = whisper.load_model(self.model_size)
-            logger.info("Model loaded successfully")
+        """
+        Load the Whisper model.
+        
+        Models come from the process-wide registry, so transcribers with the same
+        model size and device share one warm copy instead of reloading it.
+        """
+        # A background load started by load_model_async holds the lock, so this waits for it
+        with self._load_lock:
+            if self.model is None:
+                logger.info(f"Loading Whisper model '{self.model_size}'...")
+                started = time.perf_counter()
+                registry = get_model_registry()
+                self.model = registry.acquire(self.model_size, self.device, self.dtype)
+                # Hand the reference back when this transcriber is garbage collected
+                self._model_ref = weakref.finalize(
+                    self, registry.release, self.model_size, self.device, self.dtype
+                )
+                self.load_seconds = time.perf_counter() - started
+                logger.info(f"Model loaded successfully ({self.load_seconds:.1f}s)")
     
-    def transcribe(self, audio_path: str, language: str = None) -> dict:
+    def load_model_async(self) -> Future:
+        """
+        Start loading the Whisper model on a background thread.
+        
+        Lets the model load overlap with other work such as audio extraction.
+        Any later ``load_model`` (and so ``transcribe``) call waits for it.
+        
+        Returns:
+            Future that resolves to the loaded model
+        """
+        if self._load_future is None or (self.model is None and self._load_future.done()):
+            future = Future()
+            
+            def load():
+                try:
+                    self.load_model()
+                    future.set_result(self.model)
+                except BaseException as e:
+                    logger.error(f"Background model load failed: {str(e)}")
+                    future.set_exception(e)
+            
+            threading.Thread(target=load, name="whisper-model-loader", daemon=True).start()
+            self._load_future = future
+        
+        return self._load_future
+    
+    def release_model(self):
+        """Release this transcriber's reference to the shared model."""
+        with self._load_lock:
+            if self._model_ref is not None:
+                self._model_ref()
+                self._model_ref = None
+            self.model = None
+    
+    def transcribe(
+        self,
+        audio_path: Union[str, np.ndarray],
+        language: str = None,
+        checkpoint_path: str = None,
+        source_key: str = None
+    ) -> dict:
         """
         Transcribe an audio file to text.
         
         Args:
-            audio_path: Path to the audio file
+            audio_path: Path to the audio file, or a 16 kHz mono float32 array
+                        (e.g. from ``AudioExtractor.load_audio``)
             language: Language code (e.g., 'en', 'es', 'fr'). If None, auto-detect
+            checkpoint_path: Journal file for resumable transcription. The audio is
+                             decoded in overlapping 30 s windows and every completed window is
+                             saved, so re-invoking after a crash resumes from the last
+                             completed window with identical output
+            source_key: Content key of the audio's source (e.g. ``AudioExtractor.cache_key``
+                        of the video). The result is cached under it instead of the
+                        audio hash, so ``cached_transcription`` can find it before
+                        the audio has been extracted
         
         Returns:
             Dictionary containing:
@@ -85,45 +458,572 @@ class AudioTranscriber:
         Raises:
             FileNotFoundError: If the audio file doesn't exist
         """
-        audio_path = Path(audio_path)
+        if isinstance(audio_path, np.ndarray):
+            audio = audio_path
+            source_name = f"in-memory audio ({len(audio) / whisper.audio.SAMPLE_RATE:.1f}s)"
+        else:
+            audio_path = Path(audio_path)
+            
+            if not audio_path.exists():
+                raise FileNotFoundError(f"Audio file not found: {audio_path}")
+            
+            audio = str(audio_path)
+            source_name = audio_path.name
         
-        if not audio_path.exists():
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        # Decode options for the device (also part of the cache key)
+        options = self._decode_options(language)
+        
+        mode = "transcribe-checkpointed" if checkpoint_path else "transcribe"
+        cache_key, audio_hash = self._cache_lookup_key(audio, mode, options, source_key)
+        cached = self.cache.get(cache_key) if self.cache else None
+        if cached is not None:
+            logger.info(f"✅ Using cached transcription for {source_name}")
+            return cached
         
         # Load model if not already loaded
         self.load_model()
+        self._log_device()
         
-        logger.info(f"Transcribing audio file: {audio_path.name}")
+        logger.info(f"Transcribing audio: {source_name}")
         
         try:
-            # Transcribe the audio with appropriate device
-            if DEVICE_TYPE == "cuda":
-                logger.info("🚀 Using GPU acceleration (CUDA)")
-                options = {"fp16": True}
-            elif DEVICE_TYPE == "mps":
-                logger.info("� Using GPU acceleration (Apple Metal)")
-                options = {"fp16": False}  # Metal doesn't support FP16
+            if checkpoint_path:
+                result = self._transcribe_checkpointed(audio, options, checkpoint_path)
             else:
-                logger.info("💻 Using CPU (slower, but works everywhere)")
-                options = {"fp16": False}
-            
-            if language:
-                options["language"] = language
-            
-            result = self.model.transcribe(str(audio_path), **options)
+                result = self._run_model(audio, **options)
             
             logger.info("✅ Transcription completed successfully")
             
-            return {
+            output = {
                 "text": result["text"].strip(),
                 "language": result.get("language", "unknown"),
                 "segments": result.get("segments", [])
             }
+            
+            if self.cache:
+                self.cache.set(cache_key, output, tag=audio_hash or _audio_hash(audio))
+            
+            return output
+        
+        except Exception as e:
+            logger.error(f"Error during transcription: {str(e)}")
+            raise
+    
+    def cached_transcription(self, source_key: str, mode: str = "transcribe", language: str = None) -> Optional[dict]:
+        """
+        Look up a transcription cached under the content key of its source.
+        
+        Lets a caller skip audio extraction and the model load altogether when the
+        result is already known.
+        
+        Args:
+            source_key: Key the result was cached under (see ``transcribe``)
+            mode: 'transcribe', 'transcribe-checkpointed' or 'stream'
+            language: Language code the transcription was requested with
+        
+        Returns:
+            The cached result, or None on a miss (or without a cache)
+        """
+        if not self.cache:
+            return None
+        return self.cache.get(self._source_cache_key(source_key, mode, self._decode_options(language)))
+    
+    def cache_transcription(self, source_key: str, output: dict, mode: str = "stream", language: str = None):
+        """Cache a transcription produced outside ``transcribe`` (e.g. a stream) under its source key."""
+        if self.cache:
+            self.cache.set(self._source_cache_key(source_key, mode, self._decode_options(language)), output, tag=source_key)
+    
+    def transcribe_windows(
+        self,
+        windows: Iterable[Tuple[float, np.ndarray]],
+        language: str = None,
+        checkpoint_path: str = None
+    ) -> dict:
+        """
+        Transcribe audio delivered as a stream of (possibly overlapping) windows.
+        
+        Consumes ``AudioExtractor.stream_audio`` so only one window is held in
+        memory at a time. Each window is decoded with the tail of the previous
+        text as its prompt, segments are shifted onto the global timeline and
+        duplicates in overlap regions are dropped.
+        
+        Args:
+            windows: Iterable of (offset_seconds, samples) tuples of 16 kHz mono float32 audio
+            language: Language code (e.g., 'en', 'es', 'fr'). If None, detected
+                      on the first window and reused for the rest
+            checkpoint_path: Journal file for resuming after a crash (see ``transcribe``).
+                             The same windows must be supplied on resume
+        
+        Returns:
+            Dictionary with the same shape as ``transcribe``
+        """
+        logger.info("Transcribing streamed audio windows...")
+        
+        stream = self.transcribe_stream(windows, language, checkpoint_path=checkpoint_path)
+        segments = list(stream)
+        
+        logger.info("✅ Transcription completed successfully")
+        
+        return {
+            "text": "".join(segment["text"] for segment in segments).strip(),
+            "language": stream.language or "unknown",
+            "segments": segments
+        }
+    
+    def transcribe_stream(
+        self,
+        audio_path: Union[str, np.ndarray, Iterable[Tuple[float, np.ndarray]]],
+        language: str = None,
+        checkpoint_path: str = None
+    ) -> TranscriptionStream:
+        """
+        Transcribe audio and yield segments as soon as each 30 s window is decoded.
+        
+        Lets downstream consumers (SRT writing, progress UIs, analysis) start
+        before the whole file is done. Segments have the same 'start', 'end'
+        and 'text' fields as those returned by ``transcribe``.
+        
+        Args:
+            audio_path: Path to the audio file, a 16 kHz mono float32 array, or an
+                        iterable of (offset_seconds, samples) windows such as
+                        ``AudioExtractor.stream_audio``. Overlapping windows are
+                        de-duplicated, which delays each window's segments until
+                        the next window is decoded
+            language: Language code (e.g., 'en', 'es', 'fr'). If None, detected
+                      on the first window and reused for the rest
+            checkpoint_path: Journal file for resuming after a crash (see ``transcribe``).
+                             Segments of already completed windows are replayed first
+        
+        Returns:
+            TranscriptionStream yielding Whisper segment dicts on the global
+            timeline, in order
+        """
+        if isinstance(audio_path, (str, Path)):
+            if not Path(audio_path).exists():
+                raise FileNotFoundError(f"Audio file not found: {audio_path}")
+            audio_path = whisper.load_audio(str(audio_path))
+        if isinstance(audio_path, np.ndarray):
+            audio_path = _array_windows(audio_path)
+        
+        self.load_model()
+        self._log_device()
+        options = self._decode_options(language)
+        
+        segments = self._iter_window_segments(audio_path, options, True, checkpoint_path)
+        return TranscriptionStream(segments, options)
+    
+    def _iter_window_segments(
+        self,
+        windows: Iterable[Tuple[float, np.ndarray]],
+        options: dict,
+        overlapping: bool = True,
+        checkpoint_path: str = None
+    ) -> Iterator[dict]:
+        """
+        Decode windows one by one and yield final segments on the global timeline.
+        
+        Each window is prompted with the tail of the text before it. The detected
+        language is stored in ``options`` so later windows reuse it.
+        
+        Args:
+            windows: Iterable of (offset_seconds, samples) tuples
+            options: Whisper decode options (updated with the detected language)
+            overlapping: Whether windows overlap. If not, each window's segments
+                         are final as soon as it is decoded
+            checkpoint_path: Journal to resume from and record completed windows in
+        """
+        stitcher = _SegmentStitcher()
+        history = ""  # Tail of the committed text
+        journal = None
+        completed = []
+        
+        if checkpoint_path:
+            journal = _CheckpointJournal(checkpoint_path, {
+                "model_size": self.model_size,
+                "dtype": self.dtype,
+                "vad": self.vad,
+                "options": dict(options),
+                "overlapping": overlapping
+            })
+            completed = journal.load()
+            if completed:
+                last = completed[-1]
+                stitcher.restore(last["stitcher"])
+                history = last["history"]
+                if last["language"]:
+                    options.setdefault("language", last["language"])
+                logger.info(f"⏩ Resuming transcription after window {len(completed)} from checkpoint")
+            else:
+                journal.remove()
+        
+        try:
+            # Replay what the interrupted run had already produced
+            for record in completed:
+                yield from record["committed"]
+            
+            for index, (offset, samples) in enumerate(windows):
+                if index < len(completed):
+                    continue
+                
+                prompt = history + "".join(segment["text"] for segment in stitcher.pending)
+                result = self._run_model(
+                    samples,
+                    initial_prompt=prompt[-PROMPT_TAIL_CHARS:] or None,
+                    **options
+                )
+                
+                # Keep the language consistent across windows
+                options.setdefault("language", result.get("language"))
+                
+                window_end = offset + len(samples) / whisper.audio.SAMPLE_RATE
+                window_segments = _offset_segments(result.get("segments", []), offset)
+                committed = stitcher.add(offset, window_end, window_segments)
+                if not overlapping:
+                    committed += stitcher.flush()
+                
+                history = (history + "".join(segment["text"] for segment in committed))[-PROMPT_TAIL_CHARS:]
+                
+                if journal:
+                    journal.append({
+                        "window": index,
+                        "committed": committed,
+                        "stitcher": stitcher.state(),
+                        "history": history,
+                        "language": options.get("language")
+                    })
+                
+                logger.info(f"Window {index + 1} done ({window_end / 60:.1f} min transcribed)")
+                yield from committed
+            
+            yield from stitcher.flush()
+            
+            if journal:
+                journal.remove()
         
         except Exception as e:
             logger.error(f"Error during transcription: {str(e)}")
             raise
     
+    def _transcribe_checkpointed(self, audio: Union[str, np.ndarray], options: dict, checkpoint_path: str) -> dict:
+        """
+        Transcribe in overlapping 30 s windows, journaling each completed window.
+        
+        The overlap is de-duplicated by ``_SegmentStitcher``, so words at a window
+        boundary aren't cut in half as they would be with back-to-back windows.
+        """
+        if not isinstance(audio, np.ndarray):
+            audio = whisper.load_audio(audio)
+        
+        segments = list(self._iter_window_segments(_array_windows(audio), options, True, checkpoint_path))
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "language": options.get("language") or "unknown",
+            "segments": segments
+        }
+    
+    def transcribe_parallel(
+        self,
+        audio_path: Union[str, np.ndarray],
+        language: str = None,
+        workers: int = None,
+        window_seconds: float = None,
+        overlap_seconds: float = 1.0
+    ) -> dict:
+        """
+        Transcribe long audio on several CPU cores at once.
+        
+        The audio is split into windows at silence boundaries and the windows
+        are transcribed in a process pool where every worker holds its own
+        CPU copy of the model. Segments are shifted back onto the global
+        timeline and duplicates in the overlap after each cut are dropped.
+        
+        Args:
+            audio_path: Path to the audio file, or a 16 kHz mono float32 array
+            language: Language code (e.g., 'en', 'es', 'fr'). If None, detected
+                      once on the first 30 s and used for every window
+            workers: Number of worker processes (default: CPU count / 4)
+            window_seconds: Target window length. Defaults to two windows per
+                            worker, between 1 and 10 minutes
+            overlap_seconds: Audio included after each cut for de-duplication
+        
+        Returns:
+            Dictionary with the same shape as ``transcribe``
+        """
+        if isinstance(audio_path, np.ndarray):
+            audio = audio_path
+        else:
+            audio_path = Path(audio_path)
+            
+            if not audio_path.exists():
+                raise FileNotFoundError(f"Audio file not found: {audio_path}")
+            
+            audio = whisper.load_audio(str(audio_path))
+        
+        duration = len(audio) / whisper.audio.SAMPLE_RATE
+        cpu_count = os.cpu_count() or 1
+        workers = workers or max(1, cpu_count // THREADS_PER_WORKER)
+        
+        if window_seconds is None:
+            window_seconds = min(600.0, max(60.0, duration / (workers * 2)))
+        
+        windows = split_on_silence(audio, window_seconds, overlap_seconds)
+        workers = min(workers, len(windows))
+        threads = max(1, cpu_count // workers)
+        
+        logger.info(
+            f"Transcribing {duration / 60:.1f} min of audio in {len(windows)} windows "
+            f"on {workers} worker processes ({threads} threads each)..."
+        )
+        
+        options = {"fp16": False}  # Workers always run on CPU
+        if language:
+            options["language"] = language
+        
+        cache_key, audio_hash = self._cache_lookup_key(audio, "parallel", options)
+        cached = self.cache.get(cache_key) if self.cache else None
+        if cached is not None:
+            logger.info("✅ Using cached transcription")
+            return cached
+        
+        started = time.perf_counter()
+        
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_parallel_worker,
+                initargs=(self.model_size, self.vad, self.quantize, threads)
+            ) as pool:
+                if "language" not in options:
+                    first_window = audio[:whisper.audio.N_SAMPLES]
+                    options["language"] = pool.submit(_parallel_detect_language, first_window).result()
+                    logger.info(f"Detected language: {options['language']}")
+                
+                futures = [
+                    pool.submit(_parallel_transcribe_window, audio[start:end], options)
+                    for start, end in windows
+                ]
+                
+                stitcher = _SegmentStitcher()
+                segments = []
+                for (start, end), future in zip(windows, futures):
+                    offset = start / whisper.audio.SAMPLE_RATE
+                    window_segments = _offset_segments(future.result(), offset)
+                    segments.extend(stitcher.add(offset, end / whisper.audio.SAMPLE_RATE, window_segments))
+                segments.extend(stitcher.flush())
+            
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"✅ Parallel transcription completed in {elapsed:.1f}s "
+                f"({duration / max(elapsed, 1e-9):.1f}x real time)"
+            )
+            
+            output = {
+                "text": "".join(segment["text"] for segment in segments).strip(),
+                "language": options["language"] or "unknown",
+                "segments": segments
+            }
+            
+            if self.cache:
+                self.cache.set(cache_key, output, tag=audio_hash)
+            
+            return output
+        
+        except Exception as e:
+            logger.error(f"Error during parallel transcription: {str(e)}")
+            raise
+    
+    def transcribe_batch(
+        self,
+        audio_paths: List[Union[str, np.ndarray]],
+        language: str = None,
+        batch_size: int = 8
+    ) -> List[dict]:
+        """
+        Transcribe many short clips, decoding several 30 s windows per forward pass.
+        
+        Every clip is cut into 30 s windows whose log-mel spectrograms are padded
+        to Whisper's full window, and windows from all clips are decoded together
+        in batches. Windows that fail Whisper's quality checks are re-decoded at
+        higher temperatures, as ``transcribe`` does.
+        
+        Args:
+            audio_paths: Paths to audio files, or 16 kHz mono float32 arrays
+            language: Language code (e.g., 'en', 'es', 'fr'). If None, detected per window
+            batch_size: Number of 30 s windows decoded per forward pass
+        
+        Returns:
+            List of dictionaries in the same shape as ``transcribe``, one per input
+        """
+        import torch
+        
+        self.load_model()
+        
+        # Cut every clip into 30 s windows: (clip index, offset seconds, samples)
+        windows = []
+        for index, audio in enumerate(audio_paths):
+            if not isinstance(audio, np.ndarray):
+                if not Path(audio).exists():
+                    raise FileNotFoundError(f"Audio file not found: {audio}")
+                audio = whisper.load_audio(str(audio))
+            for start in range(0, max(len(audio), 1), whisper.audio.N_SAMPLES):
+                windows.append((index, start / whisper.audio.SAMPLE_RATE, audio[start:start + whisper.audio.N_SAMPLES]))
+        
+        logger.info(f"Transcribing {len(audio_paths)} clips ({len(windows)} windows) in batches of {batch_size}...")
+        
+        self._log_device()
+        fp16 = self._decode_options(language)["fp16"]
+        n_mels = self.model.dims.n_mels
+        decoded = [None] * len(windows)
+        
+        try:
+            for temperature in FALLBACK_TEMPERATURES:
+                pending = [i for i, result in enumerate(decoded) if result is None or self._needs_fallback(result)]
+                if not pending:
+                    break
+                
+                options = whisper.DecodingOptions(
+                    language=language,
+                    fp16=fp16,
+                    temperature=temperature,
+                    best_of=BEST_OF if temperature > 0 else None
+                )
+                for batch_start in range(0, len(pending), batch_size):
+                    batch = pending[batch_start:batch_start + batch_size]
+                    mel = torch.stack([
+                        whisper.log_mel_spectrogram(whisper.pad_or_trim(windows[i][2]), n_mels)
+                        for i in batch
+                    ]).to(self.model.device)
+                    
+                    with _inference_lock(self.model):
+                        batch_results = whisper.decode(self.model, mel, options)
+                    for i, result in zip(batch, batch_results):
+                        decoded[i] = result
+            
+            results = [{"text": "", "language": language or "unknown", "segments": []} for _ in audio_paths]
+            tokenizers = {}
+            
+            for (index, offset, samples), result in zip(windows, decoded):
+                clip = results[index]
+                if clip["language"] == "unknown":
+                    clip["language"] = result.language
+                
+                # Skip windows Whisper considers silent, as transcribe() does
+                if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+                    continue
+                
+                if result.language not in tokenizers:
+                    tokenizers[result.language] = whisper.tokenizer.get_tokenizer(
+                        self.model.is_multilingual,
+                        num_languages=self.model.num_languages,
+                        language=result.language,
+                        task="transcribe"
+                    )
+                
+                duration = len(samples) / whisper.audio.SAMPLE_RATE
+                for segment in _segments_from_tokens(result, tokenizers[result.language], offset, duration):
+                    segment["id"] = len(clip["segments"])
+                    clip["segments"].append(segment)
+            
+            for clip in results:
+                clip["text"] = "".join(segment["text"] for segment in clip["segments"]).strip()
+            
+            logger.info("✅ Batch transcription completed successfully")
+            return results
+        
+        except Exception as e:
+            logger.error(f"Error during batch transcription: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _needs_fallback(result) -> bool:
+        """Check a decoded window against Whisper's temperature-fallback thresholds."""
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+            return False  # Silent window, a retry won't help
+        return result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD
+    
+    def invalidate_cache(self, audio_path: Union[str, np.ndarray] = None) -> int:
+        """
+        Drop cached transcriptions.
+        
+        Args:
+            audio_path: Audio whose cached results should be removed (any model or
+                        options). If None, clears the whole cache
+        
+        Returns:
+            Number of cache entries removed
+        """
+        if not self.cache:
+            return 0
+        if audio_path is None:
+            return self.cache.invalidate()
+        return self.cache.invalidate(tag=_audio_hash(audio_path))
+    
+    def _cache_lookup_key(
+        self,
+        audio: Union[str, np.ndarray],
+        mode: str,
+        options: dict,
+        source_key: str = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Return (cache key, audio hash) for a transcription request, or (None, None)
+        without a cache. The audio isn't hashed when a source key is given.
+        """
+        if not self.cache:
+            return None, None
+        if source_key:
+            return self._source_cache_key(source_key, mode, options), None
+        audio_hash = _audio_hash(audio)
+        key = make_key("transcription", audio_hash, self.model_size, self.dtype, self.vad, mode, options)
+        return key, audio_hash
+    
+    def _source_cache_key(self, source_key: str, mode: str, options: dict) -> str:
+        """Cache key of a transcription identified by its source instead of its audio."""
+        return make_key("transcription-source", source_key, self.model_size, self.dtype, self.vad, mode, options)
+    
+    def _run_model(self, audio: Union[str, np.ndarray], **options) -> dict:
+        """Run Whisper on audio, transcribing only detected speech when VAD is enabled."""
+        if not self.vad:
+            with _inference_lock(self.model):
+                return self.model.transcribe(audio, **options)
+        
+        if isinstance(audio, str):
+            audio = whisper.load_audio(audio)
+        
+        spans = detect_speech(audio)
+        speech = compact_audio(audio, spans)
+        
+        if len(audio):
+            logger.info(f"🔇 VAD kept {len(speech) / len(audio):.0%} of the audio as speech ({len(spans)} regions)")
+        
+        if len(speech) == 0:
+            return {"text": "", "language": options.get("language"), "segments": []}
+        
+        with _inference_lock(self.model):
+            result = self.model.transcribe(speech, **options)
+        result["segments"] = remap_segments(result.get("segments", []), spans)
+        return result
+    
+    def _decode_options(self, language: str = None) -> dict:
+        """Build Whisper decode options for the current device (also part of cache keys)."""
+        # FP16 only on CUDA: Metal and the CPU don't support it
+        options = {"fp16": self.device == "cuda"}
+        
+        if language:
+            options["language"] = language
+        
+        return options
+    
+    def _log_device(self):
+        """Report the device inference is about to run on."""
+        if self.device == "cuda":
+            logger.info("🚀 Using GPU acceleration (CUDA)")
+        elif self.device == "mps":
+            logger.info("� Using GPU acceleration (Apple Metal)")
+        else:
+            logger.info("💻 Using CPU (slower, but works everywhere)")
+    
     def transcribe_to_file(self, audio_path: str, output_path: str = None, language: str = None) -> str:
         """
         Transcribe audio and save to a text file.
@@ -175,6 +1075,33 @@ class AudioTranscriber:
         return timestamped
 
 
+# Per-process state for transcribe_parallel workers
+_WORKER_TRANSCRIBER = None
+
+
+def _init_parallel_worker(model_size: str, vad: bool, quantize: bool, threads: int):
+    """Load a CPU copy of the model once per worker process."""
+    global _WORKER_TRANSCRIBER
+    import torch
+    torch.set_num_threads(threads)
+    
+    _WORKER_TRANSCRIBER = AudioTranscriber(model_size=model_size, vad=vad, device="cpu", quantize=quantize)
+    _WORKER_TRANSCRIBER.load_model()
+
+
+def _parallel_detect_language(samples: np.ndarray) -> str:
+    """Detect the spoken language of a (<= 30 s) window in a worker."""
+    model = _WORKER_TRANSCRIBER.model
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(samples), model.dims.n_mels).to(model.device)
+    _, probs = model.detect_language(mel)
+    return max(probs, key=probs.get)
+
+
+def _parallel_transcribe_window(samples: np.ndarray, options: dict) -> List[dict]:
+    """Transcribe one window in a worker and return its window-relative segments."""
+    return _WORKER_TRANSCRIBER._run_model(samples, **options).get("segments", [])
+
+
 if __name__ == "__main__":
     # Example usage
     transcriber = AudioTranscriber(model_size="base")
@@ -0,0 +1,208 @@
+"""
+Voice activity detection for the AI-Powered Video Lecture Assistant.
+Finds speech regions with a vectorized energy / zero-crossing-rate detector so
+silence can be cut out before Whisper runs, then maps timestamps back onto the
+original timeline.
+"""
+
+import logging
+from typing import Dict, List, Tuple
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """Return (start, end) frame indices of the True runs in a boolean mask."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)), axis=1)
+
+
+def frame_features(audio: np.ndarray, frame_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute per-frame energy and zero-crossing rate.
+    
+    Args:
+        audio: Mono float32 samples
+        frame_length: Samples per (non-overlapping) frame
+    
+    Returns:
+        (energy_db, zcr) arrays with one value per frame
+    """
+    n_frames = len(audio) // frame_length
+    frames = audio[:n_frames * frame_length].reshape(n_frames, frame_length)
+    
+    energy = np.einsum('ij,ij->i', frames, frames) / frame_length
+    energy_db = 10.0 * np.log10(energy + 1e-10)
+    
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_length
+    
+    return energy_db, zcr
+
+
+def detect_speech(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: int = 30,
+    margin_db: float = 12.0,
+    min_energy_db: float = -55.0,
+    zcr_threshold: float = 0.15,
+    min_speech_ms: int = 250,
+    min_silence_ms: int = 700,
+    pad_ms: int = 200
+) -> List[Tuple[int, int]]:
+    """
+    Detect speech regions in an audio signal.
+    
+    A frame counts as speech when its energy is clearly above the estimated
+    noise floor, or moderately above it with a high zero-crossing rate (unvoiced
+    consonants such as "s" and "f"). Short gaps are bridged, short blips are
+    dropped and each region is padded so word onsets are not clipped.
+    
+    Args:
+        audio: Mono float32 samples
+        sample_rate: Sample rate in Hz
+        frame_ms: Analysis frame length in milliseconds
+        margin_db: How far above the noise floor a frame must be to count as speech
+        min_energy_db: Absolute energy below which a frame is never speech
+        zcr_threshold: Zero-crossing rate above which quieter frames count as speech
+        min_speech_ms: Speech regions shorter than this are discarded
+        min_silence_ms: Silences shorter than this are merged into the speech around them
+        pad_ms: Padding added on both sides of each speech region
+    
+    Returns:
+        List of (start_sample, end_sample) speech spans in ascending order
+    """
+    frame_length = int(sample_rate * frame_ms / 1000)
+    energy_db, zcr = frame_features(audio, frame_length)
+    
+    if len(energy_db) == 0:
+        return []
+    
+    # The quietest frames approximate the noise floor of the recording
+    noise_floor = np.percentile(energy_db, 10)
+    loud = energy_db > max(noise_floor + margin_db, min_energy_db)
+    fricative = (energy_db > max(noise_floor + margin_db / 2, min_energy_db)) & (zcr > zcr_threshold)
+    speech = loud | fricative
+    
+    # Bridge short silences
+    min_silence = max(1, min_silence_ms // frame_ms)
+    for start, end in _runs(~speech):
+        if end - start < min_silence and start > 0 and end < len(speech):
+            speech[start:end] = True
+    
+    # Drop short blips
+    min_speech = max(1, min_speech_ms // frame_ms)
+    pad = int(sample_rate * pad_ms / 1000)
+    spans = []
+    for start, end in _runs(speech):
+        if end - start < min_speech:
+            continue
+        start_sample = max(0, start * frame_length - pad)
+        end_sample = min(len(audio), end * frame_length + pad)
+        if spans and start_sample <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], end_sample)
+        else:
+            spans.append((start_sample, end_sample))
+    
+    return spans
+
+
+def compact_audio(audio: np.ndarray, spans: List[Tuple[int, int]]) -> np.ndarray:
+    """Concatenate the speech spans of an audio signal, dropping everything else."""
+    if not spans:
+        return audio[:0]
+    return np.concatenate([audio[start:end] for start, end in spans])
+
+
+def remap_segments(segments: List[Dict], spans: List[Tuple[int, int]], sample_rate: int = SAMPLE_RATE) -> List[Dict]:
+    """
+    Map segment timestamps from the compacted audio back to the original timeline.
+    
+    Args:
+        segments: Whisper segments with times relative to ``compact_audio`` output
+        spans: Speech spans that were used to build the compacted audio
+        sample_rate: Sample rate in Hz
+    
+    Returns:
+        New segment dicts (including word timings, if present) on the original timeline
+    """
+    if not spans:
+        return [dict(segment) for segment in segments]
+    
+    starts = np.array([start for start, _ in spans], dtype=np.float64) / sample_rate
+    lengths = np.array([end - start for start, end in spans], dtype=np.float64) / sample_rate
+    compact_starts = np.concatenate(([0.0], np.cumsum(lengths)[:-1]))
+    
+    def to_original(t: float, side: str) -> float:
+        # Ends that fall exactly on a splice belong to the span before it
+        index = int(np.searchsorted(compact_starts, t, side=side)) - 1
+        index = min(max(index, 0), len(spans) - 1)
+        return float(starts[index] + min(t - compact_starts[index], lengths[index]))
+    
+    remapped = []
+    for segment in segments:
+        segment = dict(segment)
+        segment["start"] = to_original(segment["start"], "right")
+        segment["end"] = to_original(segment["end"], "left")
+        if segment.get("words"):
+            segment["words"] = [
+                {**word, "start": to_original(word["start"], "right"), "end": to_original(word["end"], "left")}
+                for word in segment["words"]
+            ]
+        remapped.append(segment)
+    
+    return remapped
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    window_seconds: float,
+    overlap_seconds: float = 1.0,
+    sample_rate: int = SAMPLE_RATE
+) -> List[Tuple[int, int]]:
+    """
+    Split audio into windows of roughly window_seconds, cutting inside silences.
+    
+    Each cut is placed at the middle of the detected silence closest to the
+    target length (between half and one and a half windows). If there is no
+    silence in that range the cut falls at the target length. Windows extend
+    overlap_seconds past each cut so words straddling it can be de-duplicated.
+    
+    Args:
+        audio: Mono float32 samples
+        window_seconds: Target window length in seconds
+        overlap_seconds: Extra audio included after each cut
+        sample_rate: Sample rate in Hz
+    
+    Returns:
+        List of (start_sample, end_sample) windows covering the whole signal
+    """
+    target = int(window_seconds * sample_rate)
+    overlap = int(overlap_seconds * sample_rate)
+    spans = detect_speech(audio, sample_rate)
+    
+    # Candidate cut points: the middle of every gap between speech regions
+    cuts = np.array(
+        [(end + start) // 2 for (_, end), (start, _) in zip(spans, spans[1:])],
+        dtype=np.int64
+    )
+    
+    windows = []
+    position = 0
+    while len(audio) - position > target * 3 // 2:
+        low, high = position + target // 2, position + target * 3 // 2
+        candidates = cuts[(cuts > low) & (cuts <= high)]
+        if len(candidates):
+            cut = int(candidates[np.argmin(np.abs(candidates - (position + target)))])
+        else:
+            cut = position + target
+        windows.append((position, min(len(audio), cut + overlap)))
+        position = cut
+    
+    windows.append((position, len(audio)))
+    return windows
@@ -0,0 +1,83 @@
+"""
+Benchmark: prompt tokens saved by transcript compaction
+
+Compacts a corpus of transcripts at every compaction level and reports how
+many (estimated) prompt tokens each level removes before LLM analysis.
+
+Transcripts can be plain text (.txt), SRT subtitles (.srt, e.g. the
+*_subtitles.srt files in outputs/) or JSON results with 'text' or
+'transcription' and optional 'segments'.
+
+Usage:
+    python examples/benchmark_compaction.py outputs/*.srt
+    python examples/benchmark_compaction.py lecture1.txt lecture2.json --show moderate
+"""
+
+import re
+import json
+import logging
+import argparse
+from pathlib import Path
+
+from ai_video_assistant.compaction import LEVELS, compact_transcript, corpus_reduction
+
+
+def srt_to_timestamp(stamp: str) -> float:
+    """Convert an SRT timestamp (HH:MM:SS,mmm) to seconds."""
+    hours, minutes, seconds = stamp.replace(",", ".").split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def load_transcript(path: Path) -> dict:
+    """Read a transcript file as {'text', 'segments'}."""
+    content = path.read_text(encoding="utf-8")
+
+    if path.suffix == ".json":
+        data = json.loads(content)
+        return {"text": data.get("text") or data.get("transcription", ""), "segments": data.get("segments")}
+
+    if path.suffix == ".srt":
+        segments = []
+        for block in re.split(r"\n\s*\n", content.strip()):
+            lines = block.strip().splitlines()
+            if len(lines) < 3 or "-->" not in lines[1]:
+                continue
+            start, end = (srt_to_timestamp(stamp.strip()) for stamp in lines[1].split("-->"))
+            segments.append({"start": start, "end": end, "text": " ".join(lines[2:])})
+        return {"text": " ".join(segment["text"] for segment in segments), "segments": segments}
+
+    return {"text": content, "segments": None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the prompt tokens saved by transcript compaction")
+    parser.add_argument("transcripts", nargs="+", help="Transcript files (.txt, .srt or .json)")
+    parser.add_argument("--show", choices=list(LEVELS), help="Print the first transcript compacted at this level")
+    args = parser.parse_args()
+
+    # Per-transcript log lines would drown the table
+    logging.getLogger("ai_video_assistant.compaction").setLevel(logging.WARNING)
+
+    transcripts = [load_transcript(Path(path)) for path in args.transcripts]
+    totals = corpus_reduction(transcripts)
+
+    print()
+    print("=" * 60)
+    print(f"{'level':<12} {'transcripts':>12} {'tokens before':>14} {'after':>10} {'saved':>8}")
+    print("-" * 60)
+    for level, stats in totals.items():
+        print(
+            f"{level:<12} {stats['transcripts']:>12} {stats['original_tokens']:>14,} "
+            f"{stats['compacted_tokens']:>10,} {stats['reduction']:>7.1%}"
+        )
+    print("=" * 60)
+    print("Token counts are estimates (4 characters per token).")
+
+    if args.show:
+        compacted = compact_transcript(transcripts[0]["text"], transcripts[0]["segments"], args.show)
+        print(f"\n--- {args.transcripts[0]} ({args.show}) ---\n")
+        print(compacted["text"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: serial vs. parallel Whisper transcription on CPU
+
+Transcribes the same recording with AudioTranscriber.transcribe (one process)
+and AudioTranscriber.transcribe_parallel (silence-split windows in a process
+pool) and reports the wall-clock speed-up.
+
+transcribe_parallel starts a fresh pool on every call, and each worker loads
+its own copy of the model, so its wall-clock time includes that start-up. The
+start-up is timed on its own with an identical pool, and the speed-up is reported
+both for transcription alone and including model loads on either side.
+
+Usage:
+    python examples/benchmark_parallel.py lecture.mp4
+    python examples/benchmark_parallel.py lecture.mp4 --model small --workers 8
+"""
+
+import os
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from ai_video_assistant import AudioTranscriber
+from ai_video_assistant.audio_extractor import AudioExtractor, SAMPLE_RATE
+from ai_video_assistant.transcriber import THREADS_PER_WORKER, _init_parallel_worker
+
+
+def time_pool_startup(model_size: str, workers: int) -> float:
+    """
+    Seconds to start and shut down the worker pool transcribe_parallel uses.
+    
+    Every worker loads the model in its initializer. Shutting down waits for
+    all of them, so the time covers every load even if one worker picks up
+    more than its share of the trivial tasks.
+    """
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_parallel_worker,
+        initargs=(model_size, False, False, threads)
+    ) as pool:
+        list(pool.map(abs, range(workers)))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare serial and parallel transcription speed")
+    parser.add_argument("video", help="Path to a video or audio file")
+    parser.add_argument("--model", default="base", help="Whisper model size (default: base)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count / 4)")
+    parser.add_argument("--language", default=None, help="Language code (default: auto-detect)")
+    args = parser.parse_args()
+    
+    audio = AudioExtractor().load_audio(args.video)
+    duration = len(audio) / SAMPLE_RATE
+    print(f"🎧 Audio length: {duration / 60:.1f} min\n")
+    
+    # Workers always run on the CPU, so the baseline does too
+    transcriber = AudioTranscriber(model_size=args.model, device="cpu")
+    workers = args.workers or max(1, (os.cpu_count() or 1) // THREADS_PER_WORKER)
+    
+    print("1️⃣ Serial transcription...")
+    started = time.perf_counter()
+    transcriber.load_model()
+    serial_load = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    serial = transcriber.transcribe(audio, language=args.language)
+    serial_time = time.perf_counter() - started
+    print(f"   📦 Model load: {serial_load:.1f}s")
+    print(f"   ⏱️  {serial_time:.1f}s ({duration / serial_time:.1f}x real time)\n")
+    
+    print(f"2️⃣ Parallel transcription ({workers} workers)...")
+    parallel_load = time_pool_startup(args.model, workers)
+    
+    started = time.perf_counter()
+    parallel = transcriber.transcribe_parallel(audio, language=args.language, workers=workers)
+    parallel_total = time.perf_counter() - started
+    parallel_time = max(parallel_total - parallel_load, 1e-9)
+    print(f"   📦 Pool start-up and model loads: {parallel_load:.1f}s")
+    print(f"   ⏱️  {parallel_time:.1f}s without start-up ({duration / parallel_time:.1f}x real time), "
+          f"{parallel_total:.1f}s in total\n")
+    
+    print("=" * 60)
+    print(f"🚀 Speed-up (transcription only):     {serial_time / parallel_time:.2f}x")
+    print(f"🚀 Speed-up (including model loads):  {(serial_load + serial_time) / parallel_total:.2f}x")
+    print(f"📝 Segments: serial {len(serial['segments'])}, parallel {len(parallel['segments'])}")
+    print(f"📝 Words:    serial {len(serial['text'].split())}, parallel {len(parallel['text'].split())}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: fp32 vs. int8-quantized Whisper on CPU
+
+For each model size, transcribes the same recording with the fp32 model and
+with the int8 dynamic-quantized model, and reports load time, real-time
+factor (processing time / audio length, lower is faster) and word error rate.
+
+WER is measured against a reference transcript if one is given, otherwise the
+int8 output is compared with the fp32 output of the same model size.
+
+Usage:
+    python examples/benchmark_quantization.py lecture.mp4
+    python examples/benchmark_quantization.py lecture.mp4 --sizes base small medium
+    python examples/benchmark_quantization.py lecture.mp4 --reference lecture_transcript.txt
+"""
+
+import re
+import time
+import argparse
+
+from ai_video_assistant import AudioTranscriber
+from ai_video_assistant.audio_extractor import AudioExtractor, SAMPLE_RATE
+
+
+def normalize_words(text: str) -> list:
+    """Lower-case and strip punctuation so WER only counts word differences."""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,  # deletion
+                current[j - 1] + 1,  # insertion
+                previous[j - 1] + (ref_word != hyp_word)  # substitution
+            )
+        previous = current
+    
+    return previous[-1] / len(ref)
+
+
+def run(model_size: str, quantize: bool, audio, language: str) -> dict:
+    """Load a model, transcribe the audio and time both steps."""
+    transcriber = AudioTranscriber(model_size=model_size, device="cpu", quantize=quantize)
+    
+    started = time.perf_counter()
+    transcriber.load_model()
+    load_time = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    result = transcriber.transcribe(audio, language=language)
+    transcribe_time = time.perf_counter() - started
+    
+    transcriber.release_model()
+    return {"load": load_time, "time": transcribe_time, "text": result["text"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fp32 and int8 Whisper on CPU")
+    parser.add_argument("video", help="Path to a video or audio file")
+    parser.add_argument("--sizes", nargs="+", default=["tiny", "base", "small", "medium"],
+                        help="Model sizes to benchmark (default: tiny base small medium)")
+    parser.add_argument("--reference", help="Reference transcript (.txt) for WER")
+    parser.add_argument("--language", default="en", help="Language code (default: en)")
+    args = parser.parse_args()
+    
+    audio = AudioExtractor().load_audio(args.video)
+    duration = len(audio) / SAMPLE_RATE
+    reference = open(args.reference, encoding="utf-8").read() if args.reference else None
+    
+    print(f"🎧 Audio length: {duration / 60:.1f} min\n")
+    rows = []
+    
+    for size in args.sizes:
+        print(f"⏳ Benchmarking '{size}'...")
+        fp32 = run(size, False, audio, args.language)
+        int8 = run(size, True, audio, args.language)
+        
+        for mode, stats in (("fp32", fp32), ("int8", int8)):
+            if reference is not None:
+                wer = word_error_rate(reference, stats["text"])
+            else:
+                wer = word_error_rate(fp32["text"], stats["text"])
+            rows.append((size, mode, stats["load"], stats["time"] / duration, wer))
+    
+    print()
+    print("=" * 60)
+    print(f"{'model':<8} {'mode':<6} {'load (s)':>10} {'RTF':>8} {'WER':>8}")
+    print("-" * 60)
+    for size, mode, load_time, rtf, wer in rows:
+        print(f"{size:<8} {mode:<6} {load_time:>10.1f} {rtf:>8.3f} {wer:>7.1%}")
+    print("=" * 60)
+    if reference is None:
+        print("WER is relative to the fp32 output of the same model size.")
+    print("Run twice: the first int8 load includes quantizing and caching the model.")
+
+
+if __name__ == "__main__":
+    main()
@@ -50,6 +50,11 @@ def main():
         default="outputs",
         help="Output directory (default: outputs)"
     )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.getenv("VIDEO_ASSISTANT_CACHE_DIR"),
+        help="Cache transcriptions and analyses here, e.g. ~/.cache/ai_video_assistant (default: no cache)"
+    )
     
     args = parser.parse_args()
     
@@ -97,7 +102,8 @@ def main():
             api_key=api_key,
             api_provider=args.provider,
             api_model=args.model,
-            output_dir=args.output_dir
+            output_dir=args.output_dir,
+            cache_dir=args.cache_dir
         )
         
         # Process video
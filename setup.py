@@ -50,6 +50,7 @@ setup(
     ],
     extras_require={
         "web": ["flask>=3.0.0"],
+        "async": ["httpx>=0.25"],
         "dev": ["pytest>=7.0.0", "black>=23.0.0"],
     },
     entry_points={
@@ -0,0 +1,132 @@
+"""
+SQLite result cache: expiry, LRU eviction and invalidation.
+"""
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from ai_video_assistant import cache as cache_module
+from ai_video_assistant.cache import SQLiteCache, make_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time for the cache module."""
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = SQLiteCache(tmp_path / "cache" / "results.sqlite")
+    yield cache
+    cache.close()
+
+
+def test_round_trip_and_hit_counts(cache):
+    assert cache.get("key") is None
+    cache.set("key", {"text": "héllo", "segments": [1, 2.5]})
+    assert cache.get("key") == {"text": "héllo", "segments": [1, 2.5]}
+    
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"], stats["entries"]) == (1, 1, 0.5, 1)
+    assert stats["bytes"] > 0
+
+
+def test_entries_expire_after_their_ttl(tmp_path, clock):
+    cache = SQLiteCache(tmp_path / "ttl.sqlite", ttl_seconds=60)
+    cache.set("default", 1)
+    cache.set("longer", 2, ttl_seconds=600)
+    
+    clock.value += 59
+    assert cache.get("default") == 1
+    
+    clock.value += 2
+    assert cache.get("default") is None
+    assert cache.get("longer") == 2
+    assert cache.stats()["entries"] == 1  # The expired entry was deleted on lookup
+    
+    clock.value += 600
+    assert cache.get("longer") is None
+    cache.close()
+
+
+def test_entries_without_ttl_never_expire(cache, clock):
+    cache.set("key", 1)
+    clock.value += 1e9
+    assert cache.get("key") == 1
+
+
+def test_expired_entries_are_dropped_when_writing(cache, clock):
+    cache.set("short", "x", ttl_seconds=1)
+    clock.value += 2
+    cache.set("other", "y")
+    assert cache.stats()["entries"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(cache, clock):
+    cache.max_size_bytes = 100
+    value = "x" * 38  # 40 bytes of JSON
+    
+    cache.set("a", value)
+    clock.value += 1
+    cache.set("b", value)
+    clock.value += 1
+    assert cache.get("a") == value  # Now more recent than b
+    clock.value += 1
+    cache.set("c", value)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == value
+    assert cache.get("c") == value
+    assert cache.stats()["bytes"] <= 100
+
+
+def test_invalidate_by_key_tag_or_everything(cache):
+    cache.set("t1", 1, tag="audio-1")
+    cache.set("t2", 2, tag="audio-1")
+    cache.set("t3", 3, tag="audio-2")
+    cache.set("t4", 4)
+    
+    assert cache.invalidate(tag="audio-1") == 2
+    assert cache.invalidate(key="t3") == 1
+    assert cache.get("t4") == 4
+    assert cache.invalidate() == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = tmp_path / "persist.sqlite"
+    first = SQLiteCache(path)
+    first.set("key", [1, 2, 3])
+    first.close()
+    
+    second = SQLiteCache(path)
+    assert second.get("key") == [1, 2, 3]
+    second.close()
+
+
+def test_databases_without_expiry_column_are_migrated(tmp_path):
+    path = tmp_path / "old.sqlite"
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        "CREATE TABLE entries (key TEXT PRIMARY KEY, tag TEXT, value TEXT NOT NULL, "
+        "size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO entries VALUES ('old', NULL, '\"kept\"', 6, 0, 0)")
+    conn.commit()
+    conn.close()
+    
+    cache = SQLiteCache(path, ttl_seconds=60)
+    assert cache.get("old") == "kept"
+    cache.set("new", "value")
+    assert cache.get("new") == "value"
+    cache.close()
+
+
+def test_make_key_is_stable():
+    assert make_key("transcription", {"b": 1, "a": 2}) == make_key("transcription", {"a": 2, "b": 1})
+    assert make_key("transcription", "base") != make_key("transcription", "small")
@@ -0,0 +1,99 @@
+"""
+Transcript compaction: fillers, repeated phrases and duplicate segments.
+"""
+
+import pytest
+
+from ai_video_assistant.compaction import collapse_repeats, compact_transcript, corpus_reduction, strip_fillers
+
+LECTURE = "Um, so the, uh, derivative is, you know, the slope."
+
+
+def test_light_level_only_removes_hesitations():
+    assert strip_fillers(LECTURE, "light") == ("so the derivative is, you know, the slope.", 2)
+
+
+def test_moderate_level_removes_set_apart_discourse_markers():
+    assert strip_fillers(LECTURE, "moderate") == ("so the derivative is the slope.", 3)
+    assert strip_fillers("So, you know, the proof works.", "moderate") == ("the proof works.", 2)
+
+
+def test_markers_used_as_words_are_kept():
+    assert strip_fillers("Like I said, I like it.", "moderate") == ("Like I said, I like it.", 0)
+
+
+def test_hedges_are_removed_only_at_the_aggressive_level():
+    text = "It's basically just a limit, sort of."
+    assert strip_fillers(text, "moderate") == (text, 0)
+    assert strip_fillers(text, "aggressive") == ("It's a limit.", 3)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("The wire is 5 mm thick and the ER visit, uh, was short.", "The wire is 5 mm thick and the ER visit was short."),
+    ("Mm, right. The visit, er, was short.", "right. The visit was short."),
+    ("UM is an acronym here.", "UM is an acronym here."),
+])
+def test_ambiguous_hesitations_only_removed_when_set_apart(text, expected):
+    assert strip_fillers(text, "light")[0] == expected
+
+
+def test_collapse_repeats_keeps_one_copy():
+    assert collapse_repeats("we can we can we can see this") == ("we can see this", 4)
+    assert collapse_repeats("the the the end") == ("the end", 2)
+
+
+def test_collapse_repeats_min_repeats():
+    assert collapse_repeats("going to to the store") == ("going to the store", 1)
+    assert collapse_repeats("going to to the store", min_repeats=3) == ("going to to the store", 0)
+
+
+def test_collapse_repeats_keeps_grammatical_doubles():
+    assert collapse_repeats("I know that that works") == ("I know that that works", 0)
+    assert collapse_repeats("I know that that works", keep_doubles=False) == ("I know that works", 1)
+
+
+def test_compact_transcript_merges_duplicate_segments():
+    segments = [
+        {"start": 0, "end": 2, "text": "Thank you for watching."},
+        {"start": 2, "end": 4, "text": "Thank you for watching."},
+        {"start": 4, "end": 6, "text": "Um, uh."},
+        {"start": 6, "end": 9, "text": "Now the integral."},
+    ]
+    original = [dict(segment) for segment in segments]
+    text = " ".join(segment["text"] for segment in segments)
+    
+    result = compact_transcript(text, segments)
+    
+    assert result["text"] == "Thank you for watching. Now the integral."
+    assert result["segments"] == [
+        {"start": 0, "end": 4, "text": "Thank you for watching."},
+        {"start": 6, "end": 9, "text": "Now the integral."},
+    ]
+    assert segments == original  # The input is not modified
+    
+    report = result["report"]
+    assert report["segments_merged"] == 1
+    assert report["fillers_removed"] == 2
+    assert report["compacted_tokens"] < report["original_tokens"]
+    assert report["reduction"] == pytest.approx(1 - report["compacted_tokens"] / report["original_tokens"])
+
+
+def test_compact_transcript_without_segments_uses_sentences():
+    result = compact_transcript("Um, the point. The point. The point is clear.", level="moderate")
+    assert result["text"] == "the point. The point is clear."
+    assert result["segments"] == []
+    assert result["report"]["segments_merged"] == 1
+
+
+def test_compact_transcript_rejects_unknown_level():
+    with pytest.raises(ValueError, match="Unknown compaction level"):
+        compact_transcript("text", level="extreme")
+
+
+def test_corpus_reduction_totals_each_level():
+    totals = corpus_reduction([{"text": LECTURE}, {"text": "Uh, hello."}], levels=["light", "aggressive"])
+    assert set(totals) == {"light", "aggressive"}
+    for level in totals.values():
+        assert level["transcripts"] == 2
+        assert level["compacted_tokens"] < level["original_tokens"]
+    assert totals["aggressive"]["compacted_tokens"] <= totals["light"]["compacted_tokens"]
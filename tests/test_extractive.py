@@ -0,0 +1,96 @@
+"""
+TF-IDF TextRank ranking and the extractive digest.
+"""
+
+import numpy as np
+import pytest
+
+from ai_video_assistant.chunking import estimate_tokens
+from ai_video_assistant.extractive import DAMPING, GAP_MARKER, _term_matrix, extract_digest, textrank_scores
+
+SENTENCES = [
+    "Gradient descent updates the weights against the gradient of the loss.",
+    "The learning rate scales each gradient descent step on the weights.",
+    "A loss function measures prediction error of the weights.",
+    "Lunch is served in the cafeteria downstairs.",
+    "Momentum smooths gradient descent updates across steps.",
+]
+
+
+def dense_textrank(texts):
+    """Reference TextRank on an explicit n x n similarity matrix."""
+    rows, cols, values, n_terms = _term_matrix(texts)
+    matrix = np.zeros((len(texts), n_terms))
+    matrix[rows, cols] = values
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    
+    n = len(texts)
+    degree = similarity.sum(axis=1)
+    transition = np.where(degree[:, None] > 0, similarity / np.where(degree > 0, degree, 1)[:, None], 1.0 / n)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(200):
+        scores = (1 - DAMPING) / n + DAMPING * transition.T @ scores
+    return scores / scores.sum()
+
+
+def test_textrank_matches_dense_reference():
+    texts = SENTENCES + ["Nothing in common here."]
+    np.testing.assert_allclose(textrank_scores(texts), dense_textrank(texts), atol=1e-5)
+
+
+def test_textrank_ranks_central_sentences_first():
+    scores = textrank_scores(SENTENCES)
+    assert scores.sum() == pytest.approx(1.0)
+    assert scores.argmin() == 3  # Shares no content words with the rest
+    assert scores.argmax() in (0, 1)
+
+
+def test_textrank_without_shared_words_is_uniform():
+    np.testing.assert_allclose(textrank_scores(["alpha beta", "gamma delta", "um uh"]), [1 / 3] * 3)
+    assert textrank_scores([]).size == 0
+
+
+def test_digest_within_budget_keeps_everything():
+    text = " ".join(SENTENCES)
+    result = extract_digest(text, max_tokens=10_000)
+    
+    assert result["text"] == text
+    assert [segment["index"] for segment in result["segments"]] == list(range(len(SENTENCES)))
+    assert result["report"]["segments_kept"] == result["report"]["segments_total"] == len(SENTENCES)
+
+
+def test_digest_keeps_central_segments_in_timeline_order():
+    segments = [{"start": float(i), "end": i + 1.0, "text": text} for i, text in enumerate(SENTENCES)]
+    segments.insert(2, {"start": 1.5, "end": 1.5, "text": "  "})  # Empty segments are skipped
+    budget = estimate_tokens(SENTENCES[0] + GAP_MARKER) + estimate_tokens(SENTENCES[1] + GAP_MARKER)
+    
+    result = extract_digest("", segments, max_tokens=budget)
+    
+    kept = result["segments"]
+    assert [segment["index"] for segment in kept] == sorted(segment["index"] for segment in kept)
+    assert all(segments[segment["index"]]["text"] == segment["text"] for segment in kept)
+    assert 4 not in [segment["index"] for segment in kept]  # The off-topic sentence, after the inserted one
+    assert result["report"]["digest_tokens"] <= budget
+    assert result["report"]["segments_total"] == len(SENTENCES)
+
+
+def test_digest_marks_gaps_between_kept_segments():
+    segments = [{"text": text} for text in [SENTENCES[0], "Lunch is served downstairs today.", SENTENCES[1]]]
+    budget = estimate_tokens(SENTENCES[0] + GAP_MARKER) + estimate_tokens(SENTENCES[1] + GAP_MARKER)
+    
+    result = extract_digest("", segments, max_tokens=budget)
+    
+    assert [segment["index"] for segment in result["segments"]] == [0, 2]
+    assert result["text"] == SENTENCES[0] + GAP_MARKER + SENTENCES[1]
+
+
+def test_digest_skips_segments_with_too_few_content_words():
+    texts = ["Okay, so, yeah.", SENTENCES[0], SENTENCES[1], SENTENCES[4]]
+    # Room for two sentences and the filler, which would fit but says nothing
+    budget = sum(estimate_tokens(text + GAP_MARKER) for text in texts[:3])
+    
+    result = extract_digest("", [{"text": text} for text in texts], max_tokens=budget)
+    
+    kept = [segment["index"] for segment in result["segments"]]
+    assert len(kept) == 2 and 0 not in kept
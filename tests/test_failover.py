@@ -0,0 +1,175 @@
+"""
+Failover, hedging and circuit breaking of APIContentAnalyzer against local
+stub HTTP servers (no network or API keys needed).
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ai_video_assistant.api_analyzer import APIContentAnalyzer
+
+
+class StubServer:
+    """OpenAI-compatible chat completions endpoint with a configurable status and delay."""
+    
+    def __init__(self, answer: str, status: int = 200, delay: float = 0.0):
+        self.answer = answer
+        self.status = status
+        self.delay = delay
+        self.hits = 0
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                stub.hits += 1
+                time.sleep(stub.delay)
+                if stub.status == 200:
+                    body = json.dumps({"choices": [{"message": {"content": stub.answer}}]}).encode()
+                else:
+                    body = json.dumps({"error": {"message": "stub failure"}}).encode()
+                try:
+                    self.send_response(stub.status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    pass  # The client gave up on this request
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1/chat/completions"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stubs():
+    """Factory for stub servers, shut down after the test."""
+    servers = []
+    
+    def make(answer: str, status: int = 200, delay: float = 0.0) -> StubServer:
+        server = StubServer(answer, status, delay)
+        servers.append(server)
+        return server
+    
+    yield make
+    for server in servers:
+        server.close()
+
+
+def make_analyzer(primary: StubServer, *fallbacks: StubServer, **kwargs) -> APIContentAnalyzer:
+    """Analyzer whose routes are the given stubs, in order (models 'm0', 'm1', ...)."""
+    return APIContentAnalyzer(
+        api_key="test",
+        provider="openai",
+        model="m0",
+        api_url=primary.url,
+        fallbacks=[
+            {"provider": "openai", "model": f"m{i}", "api_key": "test", "api_url": stub.url}
+            for i, stub in enumerate(fallbacks, start=1)
+        ],
+        **kwargs
+    )
+
+
+def test_fails_over_in_order(stubs):
+    server_error = stubs("from 0", status=500)
+    rate_limited = stubs("from 1", status=429)
+    healthy = stubs("from 2")
+    analyzer = make_analyzer(server_error, rate_limited, healthy, hedge=False)
+    
+    assert analyzer._call_api("prompt") == "from 2"
+    assert (server_error.hits, rate_limited.hits, healthy.hits) == (1, 1, 1)
+    assert analyzer.last_call_stats["provider"] == "openai/m2"
+
+
+def test_healthy_primary_is_not_hedged(stubs):
+    primary = stubs("from 0", delay=0.05)
+    fallback = stubs("from 1")
+    analyzer = make_analyzer(primary, fallback, hedge_delay=1.0)
+    
+    assert analyzer._call_api("prompt") == "from 0"
+    assert fallback.hits == 0
+
+
+def test_hedge_first_answer_wins(stubs):
+    slow = stubs("from 0", delay=2.0)
+    fast = stubs("from 1")
+    analyzer = make_analyzer(slow, fast, hedge_delay=0.2)
+    
+    started = time.perf_counter()
+    assert analyzer._call_api("prompt") == "from 1"
+    assert time.perf_counter() - started < 1.5
+    assert slow.hits == 1 and fast.hits == 1
+    
+    stats = analyzer.router.stats()
+    assert stats["openai/m1"]["hedges"] == 1
+    assert stats["openai/m1"]["wins"] == 1
+    # Losing a race isn't a failure
+    assert stats["openai/m0"]["failures"] == 0
+
+
+def test_losing_hedge_does_not_overwrite_stats(stubs):
+    slow = stubs("from 0", delay=0.6)
+    fast = stubs("from 1")
+    analyzer = make_analyzer(slow, fast, hedge_delay=0.1)
+    
+    analyzer._call_api("prompt")
+    time.sleep(1.0)  # The losing request has completed by now
+    
+    assert analyzer.last_call_stats["provider"] == "openai/m1"
+    assert analyzer.last_call_stats["duration"] < 0.5
+
+
+def test_circuit_opens_and_half_opens(stubs):
+    primary = stubs("from 0", status=503)
+    fallback = stubs("from 1")
+    analyzer = make_analyzer(primary, fallback, hedge=False, circuit_failures=2, circuit_cooldown=0.5)
+    
+    for _ in range(2):
+        assert analyzer._call_api("prompt") == "from 1"
+    assert analyzer.router.stats()["openai/m0"]["circuit_open"]
+    
+    # Open: the primary is skipped
+    assert analyzer._call_api("prompt") == "from 1"
+    assert primary.hits == 2
+    
+    # Half-open after the cool-down: one trial request, which closes the circuit
+    time.sleep(0.6)
+    primary.status = 200
+    assert analyzer._call_api("prompt") == "from 0"
+    assert primary.hits == 3
+    assert not analyzer.router.stats()["openai/m0"]["circuit_open"]
+
+
+def test_failed_half_open_trial_reopens_circuit(stubs):
+    primary = stubs("from 0", status=500)
+    fallback = stubs("from 1")
+    analyzer = make_analyzer(primary, fallback, hedge=False, circuit_failures=1, circuit_cooldown=0.3)
+    
+    analyzer._call_api("prompt")
+    time.sleep(0.4)
+    assert analyzer._call_api("prompt") == "from 1"
+    assert primary.hits == 2
+    assert analyzer.router.stats()["openai/m0"]["circuit_open"]
+
+
+def test_all_providers_failing_raises(stubs):
+    analyzer = make_analyzer(stubs("", status=500), stubs("", status=429), hedge=False)
+    
+    with pytest.raises(Exception, match="All providers failed"):
+        analyzer._call_api("prompt")
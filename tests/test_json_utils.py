@@ -0,0 +1,59 @@
+"""
+Parsing and repair of the JSON objects LLMs return.
+"""
+
+import json
+
+import pytest
+
+from ai_video_assistant.json_utils import extract_json, parse_llm_json, repair_json
+
+
+def test_extract_json_from_code_fence():
+    text = 'Here you go:\n```json\n{"summary": "S", "insights": ["a"]}\n```\nAnything else?'
+    assert extract_json(text) == {"summary": "S", "insights": ["a"]}
+
+
+def test_extract_json_from_prose():
+    assert extract_json('Sure! {"a": {"b": 1}} Hope this helps.') == {"a": {"b": 1}}
+
+
+def test_extract_json_rejects_invalid_json():
+    with pytest.raises(json.JSONDecodeError):
+        extract_json('{"a": 1,}')
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1, "b": [1, 2,],}', {"a": 1, "b": [1, 2]}),
+    ("{'a': 'it\\'s', 'b': 'say \"hi\"'}", {"a": "it's", "b": 'say "hi"'}),
+    ('{"a": True, "b": None, "c": False}', {"a": True, "b": None, "c": False}),
+    ('{summary: "S"}', {"summary": "S"}),
+    ('{"a": 1 // the count\n, /* note */ "b": 2}', {"a": 1, "b": 2}),
+    ('{"a": "line one\nline two"}', {"a": "line one\nline two"}),
+    ('{"a": [1, 2}', {"a": [1, 2]}),
+    ('```json\n{"a": 1}\n``` and {"b": 2}', {"a": 1}),
+])
+def test_repair_json_fixes_common_defects(text, expected):
+    assert repair_json(text) == expected
+
+
+def test_repair_json_closes_truncated_output():
+    assert repair_json('{"summary": "S", "insights": ["a", "b') == {"summary": "S", "insights": ["a", "b"]}
+
+
+def test_repair_json_drops_incomplete_last_member():
+    assert repair_json('{"summary": "S", "insights": ["a"], "quiz": [{"question": "Q", "opt') == {
+        "summary": "S",
+        "insights": ["a"],
+        "quiz": [{"question": "Q"}]
+    }
+
+
+def test_repair_json_without_object_raises():
+    with pytest.raises(json.JSONDecodeError):
+        repair_json("I can't answer that.")
+
+
+def test_parse_llm_json_reports_repairs():
+    assert parse_llm_json('{"a": 1}') == ({"a": 1}, False)
+    assert parse_llm_json('{"a": 1,}') == ({"a": 1}, True)
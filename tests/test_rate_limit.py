@@ -0,0 +1,179 @@
+"""
+Per-provider RPM/TPM budgets, Retry-After pauses and token settlement.
+"""
+
+import asyncio
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from ai_video_assistant import rate_limit
+from ai_video_assistant.http_transport import HTTPTransport
+from ai_video_assistant.rate_limit import ProviderRateLimiter, TokenBucket, get_rate_limiter, retry_after_seconds
+
+
+def timed(call, *args, **kwargs):
+    started = time.monotonic()
+    result = call(*args, **kwargs)
+    return result, time.monotonic() - started
+
+
+def test_token_bucket_waits_for_the_refill():
+    bucket = TokenBucket(60)  # One unit per second
+    assert bucket.reserve(60, now=bucket.updated) == 0
+    assert bucket.reserve(3, now=bucket.updated) == pytest.approx(3)
+    # Reservations queue up behind each other
+    assert bucket.reserve(2, now=bucket.updated) == pytest.approx(5)
+    # ...and time refills the bucket
+    assert bucket.reserve(1, now=bucket.updated + 10) == pytest.approx(0)
+
+
+def test_token_bucket_caps_oversized_requests_and_refunds():
+    bucket = TokenBucket(60)
+    assert bucket.reserve(1000, now=bucket.updated) == 0  # Uses the whole bucket, not more
+    assert bucket.level == 0
+    bucket.refund(1000)
+    assert bucket.level == 60
+
+
+def test_requests_queue_at_the_token_budget():
+    limiter = ProviderRateLimiter("test", tpm=600)  # 10 tokens per second
+    _, waited = timed(limiter.acquire, 600)
+    assert waited < 0.1
+    
+    _, waited = timed(limiter.acquire, 5)
+    assert 0.4 < waited < 1.0
+    
+    metrics = limiter.metrics()
+    assert metrics["requests"] == 2
+    assert metrics["queued"] == 1
+    assert metrics["queue_depth"] == 0
+    assert metrics["wait_seconds_max"] == pytest.approx(waited, abs=0.05)
+
+
+def test_unlimited_limiter_never_waits():
+    limiter = ProviderRateLimiter("test")
+    for _ in range(100):
+        assert limiter.acquire(10_000)
+    assert limiter.metrics()["queued"] == 0
+
+
+def test_cancelled_wait_gives_the_reservation_back():
+    limiter = ProviderRateLimiter("test", tpm=600)
+    limiter.acquire(600)
+    cancelled = threading.Event()
+    cancelled.set()
+    
+    allowed, waited = timed(limiter.acquire, 300, cancelled)
+    assert not allowed
+    assert waited < 0.1
+    assert limiter._tokens.level > -1  # Only the first request's tokens are taken
+
+
+def test_throttled_pauses_every_request():
+    limiter = ProviderRateLimiter("test", rpm=600)
+    limiter.acquire()
+    limiter.throttled(retry_after=0.3)
+    
+    _, waited = timed(limiter.acquire)
+    assert waited >= 0.25
+    assert limiter.metrics()["throttled"] == 1
+
+
+def test_settle_corrects_the_token_reservation():
+    limiter = ProviderRateLimiter("test", tpm=600)
+    limiter.acquire(500)
+    limiter.settle(500, 100)
+    assert limiter._tokens.level == pytest.approx(500, abs=1)
+    
+    limiter.settle(100, 400)
+    assert limiter._tokens.level == pytest.approx(200, abs=1)
+    
+    # Nothing reported: keep the estimate
+    limiter.settle(100, 0)
+    assert limiter._tokens.level == pytest.approx(200, abs=1)
+
+
+def test_acquire_async_waits():
+    limiter = ProviderRateLimiter("test", tpm=600)
+    limiter.acquire(600)
+    
+    _, waited = timed(asyncio.run, limiter.acquire_async(5))
+    assert 0.4 < waited < 1.0
+
+
+def test_cancelled_async_wait_gives_the_reservation_back():
+    limiter = ProviderRateLimiter("test", tpm=600)
+    limiter.acquire(600)
+    
+    async def cancel_waiter():
+        waiter = asyncio.ensure_future(limiter.acquire_async(300))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+    
+    asyncio.run(cancel_waiter())
+    assert limiter._tokens.level > -1  # Only the first request's tokens are taken
+    assert limiter.metrics()["queue_depth"] == 0
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after-ms": "-250"}, 0.0),
+    ({"retry-after": "20"}, 20.0),
+    ({"retry-after": "-3"}, 0.0),
+    ({"retry-after-ms": "soon", "retry-after": "2"}, 2.0),
+    ({"retry-after": "whenever"}, None),
+    ({}, None),
+])
+def test_retry_after_seconds(headers, expected):
+    assert retry_after_seconds(headers) == expected
+
+
+def test_retry_after_http_date():
+    headers = {"retry-after": formatdate(time.time() + 30, usegmt=True)}
+    assert retry_after_seconds(headers) == pytest.approx(30, abs=2)
+
+
+class RateLimitedSession:
+    """Session whose every request is answered with a 429."""
+    
+    def __init__(self, retry_after: str):
+        self.retry_after = retry_after
+        self.calls = 0
+    
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = 429
+        response.headers["Retry-After"] = self.retry_after
+        return response
+
+
+def test_overlong_retry_after_is_returned_not_waited(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_LIMITERS", {})
+    transport = HTTPTransport(max_retry_after=5)
+    session = RateLimitedSession("86400")
+    monkeypatch.setattr(transport, "session", lambda url: session)
+    
+    response, waited = timed(transport.post, "http://llm.test/v1", provider="slow")
+    
+    assert response.status_code == 429
+    assert session.calls == 1
+    assert waited < 1
+    # The provider is paused for the capped time, not a day
+    assert get_rate_limiter("slow").paused_until - time.monotonic() <= 5
+
+
+def test_limiter_budgets_come_from_the_environment(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_LIMITERS", {})
+    monkeypatch.setenv("MY_PROVIDER_RPM", "30")
+    monkeypatch.setenv("MY_PROVIDER_TPM", "6000")
+    
+    limiter = get_rate_limiter("my-provider")
+    assert (limiter.rpm, limiter.tpm) == (30.0, 6000.0)
+    assert get_rate_limiter("my-provider") is limiter
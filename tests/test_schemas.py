@@ -0,0 +1,62 @@
+"""
+Validation and normalization of analysis results.
+"""
+
+import pytest
+
+from ai_video_assistant.schemas import normalize_question, validate_analysis, validate_section
+
+OPTIONS = {"A": "Paris", "B": "London", "C": "Berlin", "D": "Madrid"}
+
+
+def question(correct_answer, options=None) -> dict:
+    return {"question": "Capital of Germany?", "options": dict(options or OPTIONS), "correct_answer": correct_answer}
+
+
+@pytest.mark.parametrize("answer", ["C", "c", " C ", "C. Berlin", "Berlin", "berlin", 2])
+def test_normalize_question_answer_becomes_letter(answer):
+    q = question(answer)
+    normalize_question(q, 1)
+    assert q["correct_answer"] == "C"
+
+
+def test_normalize_question_matches_text_of_prefixed_options():
+    q = question("Berlin", {"A": "A. Paris", "B": "B. London", "C": "C. Berlin", "D": "D. Madrid"})
+    normalize_question(q, 1)
+    assert q["correct_answer"] == "C"
+
+
+def test_normalize_question_converts_option_list():
+    q = {"question": "Q", "options": ["Paris", "London", "Berlin", "Madrid"], "correct_answer": "Berlin"}
+    normalize_question(q, 1)
+    assert q["options"] == OPTIONS
+    assert q["correct_answer"] == "C"
+
+
+@pytest.mark.parametrize("q, message", [
+    ({"question": "Q", "options": OPTIONS}, "missing required fields"),
+    ("not a question", "missing required fields"),
+    (question("A", {"A": "x", "B": "y", "C": "z"}), "exactly 4 options"),
+    (question("Rome"), "must be one of the options"),
+    (question(7), "must be one of the options"),
+])
+def test_normalize_question_rejects_invalid(q, message):
+    with pytest.raises(ValueError, match=message):
+        normalize_question(q, 3)
+
+
+def test_validate_analysis_normalizes_quiz():
+    result = {"summary": "S", "insights": list("abcde"), "quiz": [question("Berlin") for _ in range(5)]}
+    validate_analysis(result)
+    assert [q["correct_answer"] for q in result["quiz"]] == ["C"] * 5
+
+
+@pytest.mark.parametrize("section, result", [
+    ("summary", {"summary": ["not", "a", "string"]}),
+    ("insights", {"insights": ["too", "few"]}),
+    ("quiz", {"quiz": [question("C")] * 4}),
+    ("quiz", {}),
+])
+def test_validate_section_rejects_invalid(section, result):
+    with pytest.raises(ValueError):
+        validate_section(section, result)
@@ -0,0 +1,151 @@
+"""
+Decoding of streamed LLM responses and incremental JSON parsing.
+"""
+
+import asyncio
+import io
+
+import pytest
+import requests
+from urllib3.exceptions import ReadTimeoutError
+
+from ai_video_assistant.json_utils import IncrementalJSONParser, MalformedJSONError
+from ai_video_assistant.streaming import (
+    aiter_sse,
+    collect_json_stream,
+    collect_json_stream_async,
+    iter_ndjson,
+    iter_sse
+)
+
+ANSWER = '{"summary": "S", "insights": ["a", "b"], "quiz": [{"q": 1}]}'
+
+
+def response(body: bytes) -> requests.Response:
+    """A requests response whose body is read from memory."""
+    result = requests.Response()
+    result.status_code = 200
+    result.raw = io.BytesIO(body)
+    return result
+
+
+class StalledBody:
+    """Raw body that sends some data and then times out, like a stalled server."""
+    
+    def __init__(self, data: bytes):
+        self.data = data
+    
+    def stream(self, chunk_size, decode_content=True):
+        yield self.data
+        raise ReadTimeoutError(None, None, "Read timed out.")
+
+
+def pieces(text: str, size: int = 3):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_parser_reports_fields_as_they_complete():
+    fields = []
+    parser = IncrementalJSONParser(lambda key, value: fields.append((key, value)))
+    
+    parser.feed('Here is the JSON:\n```json\n{"summary": "S, with a comma", ')
+    assert fields == [("summary", "S, with a comma")]
+    
+    parser.feed('"insights": ["a", {"b": "}"}], "n": -1.5e3}')
+    assert parser.done
+    assert parser.result() == {"summary": "S, with a comma", "insights": ["a", {"b": "}"}], "n": -1500.0}
+    assert [key for key, _ in fields] == ["summary", "insights", "n"]
+
+
+def test_parser_ignores_text_after_the_object():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": 1} trailing words')
+    assert parser.result() == {"a": 1}
+
+
+@pytest.mark.parametrize("text", [
+    '{"a": 1]',
+    '{"a": undefined}',
+    "{'a': 1}",
+])
+def test_parser_rejects_malformed_text_immediately(text):
+    with pytest.raises(MalformedJSONError):
+        IncrementalJSONParser().feed(text)
+
+
+def test_parser_rejects_long_preamble():
+    with pytest.raises(MalformedJSONError, match="No JSON object"):
+        IncrementalJSONParser(max_preamble=10).feed("I'm sorry, but I cannot help with that.")
+
+
+def test_parser_result_of_truncated_stream_raises():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": 1, "b": [')
+    with pytest.raises(MalformedJSONError, match="ended before"):
+        parser.result()
+
+
+def test_collect_json_stream_stops_at_the_end_of_the_object():
+    consumed = []
+    
+    def deltas():
+        for piece in pieces(ANSWER) + [" and more", " text"]:
+            consumed.append(piece)
+            yield piece
+    
+    fields = {}
+    text, stats = collect_json_stream(deltas(), fields.__setitem__)
+    
+    assert text == ANSWER
+    assert list(fields) == ["summary", "insights", "quiz"]
+    assert len(consumed) == len(pieces(ANSWER))
+    assert stats["chars"] == len(ANSWER)
+    assert stats["ttft"] is not None and stats["duration"] >= stats["ttft"]
+
+
+def test_collect_json_stream_async():
+    async def deltas():
+        for piece in pieces(ANSWER):
+            yield piece
+    
+    text, stats = asyncio.run(collect_json_stream_async(deltas()))
+    assert text == ANSWER
+    assert stats["chars"] == len(ANSWER)
+
+
+def test_iter_ndjson_skips_blank_lines():
+    body = b'{"response": "a"}\n\n{"response": "b", "done": true}\n'
+    assert list(iter_ndjson(response(body))) == [{"response": "a"}, {"response": "b", "done": True}]
+
+
+def test_iter_sse_decodes_data_lines_until_done():
+    body = (
+        b": keep-alive\n\n"
+        b"event: message\n"
+        b'data: {"n": 1}\n\n'
+        b'data:{"n": 2}\n\n'
+        b"data: [DONE]\n\n"
+        b'data: {"n": 3}\n\n'
+    )
+    assert list(iter_sse(response(body))) == [{"n": 1}, {"n": 2}]
+
+
+def test_aiter_sse():
+    httpx = pytest.importorskip("httpx")
+    stream = httpx.Response(200, content=b'data: {"n": 1}\n\ndata: [DONE]\n\n')
+    
+    async def read():
+        return [event async for event in aiter_sse(stream)]
+    
+    assert asyncio.run(read()) == [{"n": 1}]
+
+
+def test_stalled_stream_raises_read_timeout():
+    stalled = response(b"")
+    stalled.raw = StalledBody(b'data: {"n": 1}\n\n')
+    
+    events = iter_sse(stalled)
+    assert next(events) == {"n": 1}
+    # Requests reports this as a ConnectionError; it must be retried as a timeout
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        next(events)